@@ -0,0 +1,95 @@
+"""
+Benchmark for the admin dashboard rollups
+Builds the same dashboard three ways against the configured database and
+prints the median time of each:
+
+- rollups:   GET /admin/dashboard, reading only dashboard_rollups
+- group by:  one GROUP BY over student_progress JOIN users
+- raw rows:  every progress row loaded and folded in Python (what the admin
+             UI did with the unbounded result lists)
+
+Also checks that the three agree. Run the nightly rebuild first
+(python jobs/rebuild_dashboard_rollups.py) so the rollups exist.
+
+Usage: python benchmark_dashboard.py [repeats]
+"""
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+from core.config import settings
+from core.database import SessionLocal
+from entities.geogebra import GeoGebraContent  # noqa: F401 - needed by the Lesson mapper
+from entities.student_progress import StudentProgress
+from entities.user import User, UserRole
+from services.dashboard_rollups import COUNTERS, contribution, ProgressState, rollup_source_query
+from services.dashboard_service import DashboardService
+
+
+def from_rollups(db):
+    return DashboardService.get_dashboard(db)
+
+
+def from_group_by(db):
+    rows = db.execute(rollup_source_query().order_by("class_name", StudentProgress.lesson_id)).all()
+    return DashboardService.summarize(db, rows)
+
+
+def from_raw_rows(db):
+    rows = db.query(
+        User.class_name, StudentProgress.lesson_id, StudentProgress.progress_percentage,
+        StudentProgress.is_completed, StudentProgress.time_spent, StudentProgress.quiz_score
+    ).join(User, User.id == StudentProgress.user_id).filter(User.role == UserRole.STUDENT).all()
+
+    groups = {}
+    for row in rows:
+        key = (row.class_name or "", row.lesson_id)
+        totals = groups.setdefault(key, [0] * len(COUNTERS))
+        for index, value in enumerate(contribution(ProgressState.of(row))):
+            totals[index] += value
+    rollups = [
+        SimpleNamespace(class_name=class_name, lesson_id=lesson_id, **dict(zip(COUNTERS, totals)))
+        for (class_name, lesson_id), totals in sorted(groups.items())
+    ]
+    return DashboardService.summarize(db, rollups)
+
+
+def timed(fn, db, repeats):
+    timings = []
+    result = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn(db)
+        timings.append(time.perf_counter() - started)
+        db.rollback()  # fresh snapshot per run
+    return statistics.median(timings), result
+
+
+def comparable(dashboard):
+    dashboard = dict(dashboard)
+    dashboard.pop("updated_at", None)
+    return dashboard
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    db = SessionLocal()
+    try:
+        progress_rows = db.query(StudentProgress).count()
+        print(f"{progress_rows} progress rows, at-risk below {settings.DASHBOARD_AT_RISK_SCORE}, {repeats} runs each")
+
+        results = {}
+        for name, fn in (("rollups", from_rollups), ("group by", from_group_by), ("raw rows", from_raw_rows)):
+            median, results[name] = timed(fn, db, repeats)
+            print(f"{name:10} {median * 1000:>10.2f} ms")
+
+        reference = comparable(results["group by"])
+        for name in ("rollups", "raw rows"):
+            print(f"{name} matches group by: {comparable(results[name]) == reference}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Benchmark of image variant sizes
+Renders the variants of every uploaded image (or the given files) into a
+temporary directory and prints, per width, the total bytes a browser would
+download compared with the originals, plus the time spent resizing.
+
+Usage: python benchmark_image_variants.py [image ...]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from core.config import settings
+from services.image_variants import VARIANT_FORMATS, VARIANT_WIDTHS, has_variants, render_variants
+
+
+def main():
+    sources = [Path(arg) for arg in sys.argv[1:]] or sorted(Path("uploads/images").glob("*"))
+    sources = [source for source in sources if source.is_file() and has_variants(source.name)]
+    if not sources:
+        sys.exit("No JPEG/PNG/WebP images found")
+
+    original_bytes = sum(source.stat().st_size for source in sources)
+    totals = {(width, variant_format): 0 for width in VARIANT_WIDTHS for variant_format in VARIANT_FORMATS}
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        for index, source in enumerate(sources):
+            target = Path(directory) / str(index)
+            render_variants(str(source), str(target), VARIANT_WIDTHS, settings.IMAGE_VARIANT_QUALITY)
+            for (width, variant_format) in totals:
+                totals[(width, variant_format)] += (target / f"{width}.{variant_format}").stat().st_size
+        elapsed = time.perf_counter() - started
+
+    print(f"{len(sources)} images, {original_bytes / 1024:.0f} KB original, "
+          f"resized in {elapsed / len(sources) * 1000:.0f} ms per image")
+    for (width, variant_format), size in totals.items():
+        print(f"{width:>5}w {variant_format:5} {size / 1024:>10.0f} KB  {original_bytes / max(size, 1):>6.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Query-count benchmark for the student lesson list (/api/lessons/my-lessons)
+Calls LessonService.get_lessons_with_progress with growing page sizes and
+counts the SQL statements each call sends (a before_cursor_execute listener
+on the engine). Progress is joined onto the lesson page, so the count must
+stay the same whatever the page size; the old per-lesson StudentProgress
+lookup sent one extra query per lesson.
+
+Temporary published lessons (with progress rows for the student on half of
+them) are created so every page is full, and deleted afterwards.
+
+Exits with status 1 if the count grows with the page size.
+
+Usage: python benchmark_my_lessons.py [student_id] [page sizes, e.g. 10,50,100]
+"""
+import json
+import statistics
+import sys
+import threading
+import time
+import uuid
+
+from sqlalchemy import event
+
+from core.database import SessionLocal, engine
+from entities.geogebra import GeoGebraContent  # noqa: F401 - needed by the Lesson mapper
+from entities.lesson import Lesson
+from entities.student_progress import StudentProgress
+from entities.user import User, UserRole
+from services.lesson_service import LessonService
+
+RUNS = 5
+
+
+class StatementCounter:
+    """Counts statements sent through the engine"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        with self._lock:
+            self.count += 1
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+
+
+def create_lessons(db, student_id: int, count: int) -> list:
+    """Published lessons with progress for the student on every other one"""
+    prefix = f"benchmark-my-lessons-{uuid.uuid4().hex[:8]}"
+    lessons = [
+        Lesson(title=f"Benchmark lesson {index + 1}", slug=f"{prefix}-{index}", grade=6,
+               duration=45, order=index, is_published=True)
+        for index in range(count)
+    ]
+    db.add_all(lessons)
+    db.flush()
+    db.add_all([
+        StudentProgress(user_id=student_id, lesson_id=lesson.id, progress_percentage=50.0,
+                        completed_sections=json.dumps([1, 2]), time_spent=300)
+        for lesson in lessons[::2]
+    ])
+    db.commit()
+    return [lesson.id for lesson in lessons]
+
+
+def delete_lessons(db, lesson_ids: list) -> None:
+    db.query(StudentProgress).filter(StudentProgress.lesson_id.in_(lesson_ids)).delete(synchronize_session=False)
+    db.query(Lesson).filter(Lesson.id.in_(lesson_ids)).delete(synchronize_session=False)
+    db.commit()
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[2].split(",")] if len(sys.argv) > 2 else [10, 50, 100]
+    db = SessionLocal()
+    if len(sys.argv) > 1:
+        student_id = int(sys.argv[1])
+    else:
+        student = db.query(User.id).filter(User.role == UserRole.STUDENT).first()
+        if not student:
+            sys.exit("No students found. Please run seed_data.py first.")
+        student_id = student.id
+
+    lesson_ids = create_lessons(db, student_id, max(sizes))
+    counts = {}
+    try:
+        counter = StatementCounter()
+        # Warm up the connection pool so connecting is not counted
+        LessonService.get_lessons_with_progress(db, student_id, limit=1)
+        db.rollback()
+
+        print(f"Student {student_id}, {max(sizes)} temporary lessons\n")
+        print(f"{'page size':>9} {'lessons':>8} {'queries':>8} {'median ms':>10}")
+        for size in sizes:
+            timings = []
+            for _ in range(RUNS):
+                counter.reset()
+                started = time.perf_counter()
+                lessons = LessonService.get_lessons_with_progress(db, student_id, limit=size)
+                timings.append(time.perf_counter() - started)
+                counts[size] = counter.count
+                db.rollback()
+            print(f"{size:>9} {len(lessons):>8} {counts[size]:>8} {statistics.median(timings) * 1000:>10.2f}")
+    finally:
+        delete_lessons(db, lesson_ids)
+        db.close()
+
+    constant = len(set(counts.values())) == 1
+    print(f"\nConstant query count: {constant}")
+    sys.exit(0 if constant else 1)
+
+
+if __name__ == "__main__":
+    main()
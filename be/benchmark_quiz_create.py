@@ -0,0 +1,110 @@
+"""
+Statement-count check for quiz creation
+Creates quizzes of growing size through QuizService.create_quiz and counts
+the SQL statements each one sends (a before_cursor_execute listener on the
+engine). The count must not grow with the number of questions: questions
+and answers go in one multi-row INSERT each, with one SELECT in between to
+read the question ids back (MySQL has no RETURNING).
+
+Exits with status 1 if the count grows or exceeds MAX_STATEMENTS. The
+quizzes created are deleted afterwards.
+
+Usage: python benchmark_quiz_create.py [lesson_id] [sizes, e.g. 1,10,100]
+"""
+import sys
+import threading
+import time
+
+from sqlalchemy import event
+
+from core.database import SessionLocal, engine
+from entities.geogebra import GeoGebraContent  # noqa: F401 - needed by the Lesson mapper
+from entities.lesson import Lesson
+from schemas.quiz import QuizAnswerCreate, QuizCreate, QuizQuestionCreate
+from services.quiz_service import QuizService
+
+# INSERT quiz, INSERT questions, SELECT ids, INSERT answers, then the
+# reload (quiz + questions + answers); transaction control is not counted
+MAX_STATEMENTS = 7
+
+
+class StatementCounter:
+    """Counts statements sent through the engine"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        with self._lock:
+            self.count += 1
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+
+
+def build_quiz(lesson_id: int, size: int) -> QuizCreate:
+    return QuizCreate(
+        lesson_id=lesson_id,
+        title=f"Statement count check ({size} questions)",
+        questions=[
+            QuizQuestionCreate(
+                question_text=f"Question {index + 1}",
+                points=1.0,
+                order=index + 1,
+                answers=[
+                    QuizAnswerCreate(answer_text=f"Option {option}", is_correct=option == 0, order=option)
+                    for option in range(4)
+                ]
+            )
+            for index in range(size)
+        ]
+    )
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[2].split(",")] if len(sys.argv) > 2 else [1, 10, 100]
+    counts = {}
+    created = []
+    db = SessionLocal()
+    try:
+        if len(sys.argv) > 1:
+            lesson_id = int(sys.argv[1])
+        else:
+            lesson = db.query(Lesson).first()
+            if not lesson:
+                sys.exit("No lessons found. Please run seed_data.py first.")
+            lesson_id = lesson.id
+        db.close()
+
+        counter = StatementCounter()
+        for size in sizes:
+            quiz_data = build_quiz(lesson_id, size)
+            db = SessionLocal()
+            counter.reset()
+            started = time.perf_counter()
+            quiz = QuizService.create_quiz(db, quiz_data)
+            elapsed = time.perf_counter() - started
+            counts[size] = counter.count
+            created.append(quiz.id)
+
+            answers = sum(len(question.answers) for question in quiz.questions)
+            print(f"{size:>5} questions ({answers:>4} answers): {counts[size]:>3} statements, {elapsed * 1000:8.1f} ms")
+            if len(quiz.questions) != size or answers != size * 4:
+                sys.exit(f"Quiz {quiz.id} was created incomplete")
+            db.close()
+    finally:
+        db = SessionLocal()
+        for quiz_id in created:
+            QuizService.delete_quiz(db, quiz_id)
+        db.close()
+
+    constant = len(set(counts.values())) == 1
+    print(f"Constant statement count: {constant} (limit {MAX_STATEMENTS})")
+    sys.exit(0 if constant and max(counts.values()) <= MAX_STATEMENTS else 1)
+
+
+if __name__ == "__main__":
+    main()
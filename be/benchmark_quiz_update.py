@@ -0,0 +1,158 @@
+"""
+Benchmark of editing a 50-question quiz
+Creates a quiz and applies typical teacher edits through
+QuizService.update_quiz, printing for each the SQL statements sent (a
+before_cursor_execute listener on the engine), the time taken and how many
+question ids survived (QuizAttempt.answers refers to them).
+
+The last edit sends every question without ids, which makes the diff delete
+and re-insert the whole quiz: what every save did before the diff-based
+update, for comparison. The quiz is deleted afterwards.
+
+Usage: python benchmark_quiz_update.py [lesson_id] [questions]
+"""
+import sys
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import selectinload
+
+from core.database import SessionLocal, engine
+from entities.geogebra import GeoGebraContent  # noqa: F401 - needed by the Lesson mapper
+from entities.lesson import Lesson
+from entities.quiz import QuizQuestion
+from schemas.quiz import QuizAnswerCreate, QuizCreate, QuizQuestionCreate, QuizUpdate
+from services.quiz_service import QuizService
+
+ANSWERS_PER_QUESTION = 4
+
+
+class StatementCounter:
+    """Counts statements sent through the engine"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        with self._lock:
+            self.count += 1
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+
+
+def new_question(number: int) -> QuizQuestionCreate:
+    return QuizQuestionCreate(
+        question_text=f"Question {number}",
+        points=1.0,
+        order=number,
+        answers=[
+            QuizAnswerCreate(answer_text=f"Option {option}", is_correct=option == 0, order=option)
+            for option in range(ANSWERS_PER_QUESTION)
+        ]
+    )
+
+
+def current_questions(db, quiz_id: int) -> list:
+    """The quiz as the admin editor sends it back: every question and answer with its id"""
+    questions = db.query(QuizQuestion).options(selectinload(QuizQuestion.answers)).filter(
+        QuizQuestion.quiz_id == quiz_id
+    ).order_by(QuizQuestion.order).all()
+    return [
+        QuizQuestionCreate(
+            id=question.id,
+            question_text=question.question_text,
+            question_type=question.question_type,
+            points=question.points,
+            order=question.order,
+            image_url=question.image_url,
+            answers=[
+                QuizAnswerCreate(id=answer.id, answer_text=answer.answer_text,
+                                 is_correct=answer.is_correct, order=answer.order)
+                for answer in question.answers
+            ]
+        )
+        for question in questions
+    ]
+
+
+def edit_one(questions: list) -> list:
+    questions[0].question_text += " (edited)"
+    return questions
+
+
+def add_and_remove(questions: list) -> list:
+    last = questions[-1].order
+    return questions[:-5] + [new_question(last + index + 1) for index in range(5)]
+
+
+def without_ids(questions: list) -> list:
+    for question in questions:
+        question.id = None
+        for answer in question.answers:
+            answer.id = None
+    return questions
+
+
+EDITS = [
+    ("duration only", lambda questions: QuizUpdate(duration=30)),
+    ("duration, full payload", lambda questions: QuizUpdate(duration=35, questions=questions)),
+    ("edit 1 question", lambda questions: QuizUpdate(questions=edit_one(questions))),
+    ("add 5, remove 5", lambda questions: QuizUpdate(questions=add_and_remove(questions))),
+    ("rewrite (old update)", lambda questions: QuizUpdate(questions=without_ids(questions))),
+]
+
+
+def main():
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    db = SessionLocal()
+    if len(sys.argv) > 1:
+        lesson_id = int(sys.argv[1])
+    else:
+        lesson = db.query(Lesson.id).first()
+        if not lesson:
+            sys.exit("No lessons found. Please run seed_data.py first.")
+        lesson_id = lesson.id
+
+    quiz = QuizService.create_quiz(db, QuizCreate(
+        lesson_id=lesson_id,
+        title=f"Update benchmark ({size} questions)",
+        questions=[new_question(number) for number in range(1, size + 1)]
+    ))
+    quiz_id = quiz.id
+    db.close()
+
+    counter = StatementCounter()
+    print(f"Quiz {quiz_id}: {size} questions x {ANSWERS_PER_QUESTION} answers\n")
+    print(f"{'edit':24} {'statements':>11} {'ms':>8} {'question ids kept':>18}")
+    try:
+        for label, build_update in EDITS:
+            db = SessionLocal()
+            questions = current_questions(db, quiz_id)
+            before = {question.id for question in questions}
+            update = build_update(questions)
+            db.rollback()
+
+            counter.reset()
+            started = time.perf_counter()
+            QuizService.update_quiz(db, quiz_id, update)
+            elapsed = time.perf_counter() - started
+            statements = counter.count
+
+            after = {question_id for (question_id,) in db.query(QuizQuestion.id).filter(
+                QuizQuestion.quiz_id == quiz_id
+            )}
+            print(f"{label:24} {statements:>11} {elapsed * 1000:>8.1f} {len(before & after):>12} / {len(before)}")
+            db.close()
+    finally:
+        db = SessionLocal()
+        QuizService.delete_quiz(db, quiz_id)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark for vectorized regrading
+Scores synthetic attempts (JSON-shaped answers, as stored in quiz_attempts)
+with the per-attempt QuizService.grade_answers loop and with the NumPy
+answer matrix, checks both agree and prints the timings.
+
+With --quiz, additionally regrades that quiz's attempts in the database and
+reports chunk progress (run against a test database).
+
+Usage: python benchmark_regrade.py [attempts] [questions] [--quiz QUIZ_ID]
+"""
+import random
+import sys
+import time
+
+import numpy as np
+
+from services.answer_key import AnswerKey, QuestionKey
+from services.answer_matrix import AnswerMatrixBuilder, score_matrix
+from services.quiz_service import QuizService
+
+CHUNK_SIZE = 5000
+
+
+def synthetic_key(questions: int) -> AnswerKey:
+    keys = []
+    for index in range(questions):
+        question_id = 1000 + index
+        if index % 5 == 4:
+            keys.append(QuestionKey(
+                question_id=question_id, question_text=f"Q{index}", question_type="short_answer",
+                points=2.0, correct_answer_id=None, correct_answer_text="42",
+                normalized_answer_text="42"
+            ))
+        else:
+            keys.append(QuestionKey(
+                question_id=question_id, question_text=f"Q{index}", question_type="multiple_choice",
+                points=1.0, correct_answer_id=question_id * 10 + 1, correct_answer_text="A",
+                normalized_answer_text="a"
+            ))
+    return AnswerKey(
+        quiz_id=1, version=None, lesson_id=1, passing_score=60.0, show_answers=False,
+        total_points=sum(question.points for question in keys), questions=tuple(keys)
+    )
+
+
+def synthetic_attempts(answer_key: AnswerKey, count: int):
+    rng = random.Random(7)
+    attempts = []
+    for attempt_id in range(1, count + 1):
+        answers = {}
+        for question in answer_key.questions:
+            roll = rng.random()
+            if roll < 0.05:
+                continue  # skipped
+            if question.question_type == "short_answer":
+                answers[str(question.question_id)] = " 42 " if roll < 0.7 else str(rng.randint(0, 99))
+            else:
+                answers[str(question.question_id)] = question.question_id * 10 + (1 if roll < 0.7 else rng.randint(2, 4))
+        attempts.append((attempt_id, answers))
+    return attempts
+
+
+def benchmark(count: int, questions: int) -> None:
+    answer_key = synthetic_key(questions)
+    print(f"Generating {count} attempts x {questions} questions...")
+    attempts = synthetic_attempts(answer_key, count)
+
+    started = time.perf_counter()
+    loop_scores = np.array([
+        QuizService.grade_answers(answer_key, {int(k): v for k, v in answers.items()})[0]
+        for _, answers in attempts
+    ])
+    loop_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    builder = AnswerMatrixBuilder(answer_key)
+    build_time = 0.0
+    score_time = 0.0
+    matrix_scores = []
+    for start in range(0, count, CHUNK_SIZE):
+        chunk_started = time.perf_counter()
+        matrix = builder.build(attempts[start:start + CHUNK_SIZE])
+        build_time += time.perf_counter() - chunk_started
+
+        chunk_started = time.perf_counter()
+        _, scores = score_matrix(matrix)
+        score_time += time.perf_counter() - chunk_started
+        matrix_scores.append(scores)
+    matrix_time = time.perf_counter() - started
+    matrix_scores = np.concatenate(matrix_scores)
+
+    print(f"{'grade_answers loop':28} {loop_time * 1000:>10.1f} ms")
+    print(f"{'answer matrix (total)':28} {matrix_time * 1000:>10.1f} ms  ({loop_time / matrix_time:.1f}x)")
+    print(f"{'  encode JSON -> matrix':28} {build_time * 1000:>10.1f} ms")
+    print(f"{'  vectorized scoring':28} {score_time * 1000:>10.1f} ms")
+    print(f"Scores identical: {bool(np.allclose(loop_scores, matrix_scores))}")
+
+
+def regrade_database(quiz_id: int) -> None:
+    from core.database import SessionLocal
+    from entities.geogebra import GeoGebraContent  # noqa: F401 - needed by the Lesson mapper
+    from services.regrade_service import RegradeService
+
+    def report(job):
+        print(f"  {job.processed}/{job.total} attempts ({job.progress}%), {job.updated} changed")
+
+    db = SessionLocal()
+    try:
+        print(f"\nRegrading quiz {quiz_id} in the database...")
+        started = time.perf_counter()
+        job = RegradeService.regrade_quiz(db, quiz_id, on_chunk=report)
+        print(f"Done: {job.processed} attempts, {job.updated} changed in {time.perf_counter() - started:.2f}s")
+    finally:
+        db.close()
+
+
+def main():
+    args = sys.argv[1:]
+    quiz_id = None
+    if "--quiz" in args:
+        position = args.index("--quiz")
+        quiz_id = int(args[position + 1])
+        del args[position:position + 2]
+    count = int(args[0]) if len(args) > 0 else 100_000
+    questions = int(args[1]) if len(args) > 1 else 30
+
+    benchmark(count, questions)
+    if quiz_id is not None:
+        regrade_database(quiz_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark of API latency during a video upload
+Streams a large multipart upload to /api/upload/video of a running server
+while other threads keep calling a cheap endpoint, and prints that
+endpoint's latency before and during the upload. With a blocking upload
+handler the probe latency jumps for the whole write; with streaming it
+should stay close to the baseline.
+
+Uses only the standard library. The uploaded file is deleted afterwards.
+
+Usage: python benchmark_upload.py <base_url> <admin_token> [size_mb] [probe_path]
+Example: python benchmark_upload.py http://localhost:8000 eyJ... 90 /health
+"""
+import http.client
+import json
+import statistics
+import sys
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+CHUNK = 256 * 1024
+PROBE_THREADS = 4
+
+
+def connect(base_url: str) -> http.client.HTTPConnection:
+    parts = urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    return connection_class(parts.hostname, parts.port, timeout=300)
+
+
+def probe(base_url: str, path: str, stop: threading.Event, latencies: list) -> None:
+    connection = connect(base_url)
+    while not stop.is_set():
+        started = time.perf_counter()
+        connection.request("GET", path)
+        connection.getresponse().read()
+        latencies.append(time.perf_counter() - started)
+        time.sleep(0.01)
+    connection.close()
+
+
+def measure(base_url: str, path: str, seconds: float = None, during: threading.Thread = None) -> list:
+    latencies = []
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=probe, args=(base_url, path, stop, latencies))
+        for _ in range(PROBE_THREADS)
+    ]
+    for thread in threads:
+        thread.start()
+    if during is not None:
+        during.join()
+    else:
+        time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def upload(base_url: str, token: str, size: int, result: dict) -> None:
+    boundary = uuid.uuid4().hex
+    head = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="benchmark.mp4"\r\n'
+        "Content-Type: video/mp4\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{boundary}--\r\n".encode()
+
+    def body():
+        yield head
+        block = b"\0" * CHUNK
+        remaining = size
+        while remaining > 0:
+            yield block[:min(CHUNK, remaining)]
+            remaining -= CHUNK
+        yield tail
+
+    connection = connect(base_url)
+    started = time.perf_counter()
+    connection.request("POST", "/api/upload/video", body=body(), headers={
+        "Authorization": f"Bearer {token}",
+        "Content-Type": f"multipart/form-data; boundary={boundary}",
+        "Content-Length": str(len(head) + size + len(tail)),
+    })
+    response = connection.getresponse()
+    result["status"] = response.status
+    result["body"] = json.loads(response.read() or b"{}")
+    result["seconds"] = time.perf_counter() - started
+    connection.close()
+
+
+def summarize(label: str, latencies: list) -> None:
+    if not latencies:
+        print(f"{label:10} no samples")
+        return
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(0.99 * (len(ordered) - 1)))]
+    print(
+        f"{label:10} n={len(ordered):5}  p50 {statistics.median(ordered) * 1000:8.1f} ms"
+        f"  p99 {p99 * 1000:8.1f} ms  max {ordered[-1] * 1000:8.1f} ms"
+    )
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.exit(__doc__)
+    base_url, token = sys.argv[1].rstrip("/"), sys.argv[2]
+    size = int(float(sys.argv[3]) * 1024 * 1024) if len(sys.argv) > 3 else 90 * 1024 * 1024
+    path = sys.argv[4] if len(sys.argv) > 4 else "/health"
+
+    summarize("baseline", measure(base_url, path, seconds=3))
+
+    result = {}
+    uploader = threading.Thread(target=upload, args=(base_url, token, size, result))
+    uploader.start()
+    summarize("uploading", measure(base_url, path, during=uploader))
+    print(f"Upload of {size / 1024 / 1024:.0f} MB: HTTP {result.get('status')} in {result.get('seconds', 0):.2f}s")
+
+    filename = result.get("body", {}).get("filename")
+    if filename:
+        connection = connect(base_url)
+        connection.request("DELETE", f"/api/upload/videos/{filename}", headers={"Authorization": f"Bearer {token}"})
+        connection.getresponse().read()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Index check for the hot read queries
+Calls the service methods behind the busiest pages (lesson lists, progress
+heartbeats, feedback, quiz lookups), captures the SQL they send (a
+before_cursor_execute listener on the engine) and runs EXPLAIN on each
+statement with its parameters. A statement whose plan reads a table without
+an index fails the check:
+
+- MySQL:      a row with type ALL or no key
+- PostgreSQL: a Seq Scan (planned with enable_seqscan off, since the
+              planner prefers scans on small tables)
+- SQLite:     a SCAN step that does not use an index
+
+Temporary lessons, quizzes and a student with progress, feedback and quiz
+attempts on them are created so no plan is answered from an empty table,
+and deleted afterwards.
+
+Exits with status 1 if any statement scans a table.
+
+Usage: python check_query_indexes.py
+"""
+import sys
+import threading
+import uuid
+from datetime import datetime
+
+from sqlalchemy import event
+
+from core.database import SessionLocal, engine
+from entities.feedback import Feedback
+from entities.geogebra import GeoGebraContent  # noqa: F401 - needed by the Lesson mapper
+from entities.lesson import Lesson
+from entities.quiz import Quiz, QuizAttempt, QuizUserStats
+from entities.student_progress import StudentProgress
+from entities.user import User, UserRole
+from services.feedback_service import FeedbackService
+from services.lesson_service import LessonService
+from services.progress_buffer import PendingProgress
+from services.quiz_service import QuizService
+
+SEED_LESSONS = 24  # Spread over grades 6-9, every other one published
+CHECK_GRADE = 8
+
+
+class StatementRecorder:
+    """Records the SELECT statements sent through the engine"""
+
+    def __init__(self):
+        self.statements = []
+        self.recording = False
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.recording and statement.lstrip().upper().startswith("SELECT"):
+            with self._lock:
+                self.statements.append((statement, parameters))
+
+    def record(self, call):
+        with self._lock:
+            self.statements = []
+        self.recording = True
+        try:
+            call()
+        finally:
+            self.recording = False
+        return list(self.statements)
+
+
+def seed(db) -> dict:
+    """A student, lessons with an active quiz each, and the student's rows on them"""
+    prefix = f"check-indexes-{uuid.uuid4().hex[:8]}"
+    student = User(email=f"{prefix}@example.com", username=prefix, hashed_password="!",
+                   full_name="Index check", role=UserRole.STUDENT, grade=CHECK_GRADE)
+    lessons = [
+        Lesson(title=f"Index check lesson {index + 1}", slug=f"{prefix}-{index}", grade=6 + index % 4,
+               duration=45, order=index, is_published=index % 2 == 0)
+        for index in range(SEED_LESSONS)
+    ]
+    db.add(student)
+    db.add_all(lessons)
+    db.flush()
+
+    quizzes = [Quiz(lesson_id=lesson.id, title=f"Quiz {lesson.id}", is_active=True) for lesson in lessons]
+    db.add_all(quizzes)
+    db.add_all([
+        StudentProgress(user_id=student.id, lesson_id=lesson.id, progress_percentage=50.0, time_spent=300)
+        for lesson in lessons
+    ])
+    db.add_all([
+        Feedback(user_id=student.id, lesson_id=lesson.id, rating=4.0, comment="Index check")
+        for lesson in lessons
+    ])
+    db.flush()
+
+    now = datetime.utcnow()
+    attempts = [
+        QuizAttempt(user_id=student.id, quiz_id=quiz.id, score=score, points_earned=score / 10,
+                    total_points=10.0, answers={}, submitted_at=now, is_completed=True)
+        for quiz in quizzes
+        for score in (40.0, 80.0)
+    ]
+    db.add_all(attempts)
+    db.flush()
+    db.add_all([
+        QuizUserStats(user_id=student.id, quiz_id=quiz.id, attempt_count=2, sum_score=120.0,
+                      best_score=80.0, best_attempt_id=attempt.id, last_score=80.0, last_attempt_at=now)
+        for quiz, attempt in zip(quizzes, attempts[1::2])
+    ])
+    db.commit()
+
+    lesson = next(lesson for lesson in lessons if lesson.is_published and lesson.grade == CHECK_GRADE)
+    quiz = next(quiz for quiz in quizzes if quiz.lesson_id == lesson.id)
+    return {
+        "student_id": student.id,
+        "lesson_id": lesson.id,
+        "quiz_id": quiz.id,
+        "lesson_ids": [lesson.id for lesson in lessons],
+        "quiz_ids": [quiz.id for quiz in quizzes]
+    }
+
+
+def delete_seed(db, seeded: dict) -> None:
+    quiz_ids, lesson_ids = seeded["quiz_ids"], seeded["lesson_ids"]
+    db.query(QuizUserStats).filter(QuizUserStats.quiz_id.in_(quiz_ids)).delete(synchronize_session=False)
+    db.query(QuizAttempt).filter(QuizAttempt.quiz_id.in_(quiz_ids)).delete(synchronize_session=False)
+    db.query(Quiz).filter(Quiz.id.in_(quiz_ids)).delete(synchronize_session=False)
+    db.query(Feedback).filter(Feedback.lesson_id.in_(lesson_ids)).delete(synchronize_session=False)
+    db.query(StudentProgress).filter(StudentProgress.lesson_id.in_(lesson_ids)).delete(synchronize_session=False)
+    db.query(Lesson).filter(Lesson.id.in_(lesson_ids)).delete(synchronize_session=False)
+    db.query(User).filter(User.id == seeded["student_id"]).delete(synchronize_session=False)
+    db.commit()
+
+
+def hot_queries(seeded: dict) -> list:
+    """(label, call) for each service read to check"""
+    student_id, lesson_id, quiz_id = seeded["student_id"], seeded["lesson_id"], seeded["quiz_id"]
+    return [
+        ("published lessons by grade",
+         lambda db: LessonService.get_lessons(db, grade=CHECK_GRADE, is_published=True)),
+        ("my lessons by grade",
+         lambda db: LessonService.get_lessons_with_progress(db, student_id, grade=CHECK_GRADE)),
+        ("progress heartbeat",
+         lambda db: LessonService.merge_stored_progress(db, PendingProgress(student_id, lesson_id))),
+        ("user feedback on a lesson",
+         lambda db: FeedbackService.get_user_feedback(db, student_id, lesson_id)),
+        ("lesson feedback",
+         lambda db: FeedbackService.get_lesson_feedback(db, lesson_id)),
+        ("active quiz of a lesson",
+         lambda db: QuizService.get_quiz_by_lesson(db, lesson_id)),
+        ("user attempts on a quiz",
+         lambda db: QuizService.get_user_attempts(db, student_id, quiz_id)),
+        ("best attempt",
+         lambda db: QuizService.get_best_attempt(db, student_id, quiz_id)),
+    ]
+
+
+def scanned_tables(connection, statement: str, parameters) -> list:
+    """Plan steps of a statement that read a table without an index"""
+    dialect = engine.dialect.name
+    if dialect == "mysql":
+        rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).mappings().all()
+        return [
+            f"{row['table']} (type {row['type']}, key {row['key']})"
+            for row in rows
+            if row["table"] and (row["type"] == "ALL" or row["key"] is None)
+        ]
+    if dialect == "postgresql":
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        plan = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).scalars().all()
+        return [line.strip() for line in plan if "Seq Scan" in line]
+    if dialect == "sqlite":
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        return [
+            row[-1] for row in rows
+            if row[-1].startswith("SCAN ") and "INDEX" not in row[-1] and "CONSTANT ROW" not in row[-1]
+        ]
+    sys.exit(f"EXPLAIN is not supported for the {dialect} dialect")
+
+
+def main():
+    db = SessionLocal()
+    seeded = seed(db)
+    failed = False
+    try:
+        recorder = StatementRecorder()
+        print(f"Checking {engine.dialect.name} plans with {SEED_LESSONS} temporary lessons\n")
+        for label, call in hot_queries(seeded):
+            statements = recorder.record(lambda: call(db))
+            db.rollback()
+            with engine.connect() as connection:
+                scans = []
+                for statement, parameters in statements:
+                    scans.extend(scanned_tables(connection, statement, parameters))
+                connection.rollback()
+            if scans:
+                failed = True
+                print(f"✗ {label}: {'; '.join(scans)}")
+                for statement, _ in statements:
+                    print(f"    {' '.join(statement.split())}")
+            else:
+                print(f"✓ {label} ({len(statements)} statements)")
+    finally:
+        delete_seed(db, seeded)
+        db.close()
+
+    print(f"\nAll hot queries use an index: {not failed}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 Application configuration
 """
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -19,11 +19,15 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: Optional[str] = None  # Derived from DATABASE_URL when unset
 
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" or "process"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 64  # Hash jobs allowed to wait for a worker
 
     # CORS
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
@@ -31,6 +35,39 @@ class Settings(BaseSettings):
     # File Upload
     MAX_FILE_SIZE: int = 10485760  # 10MB
     UPLOAD_DIR: str = "./uploads"
+    IMAGE_VARIANT_WIDTHS: str = "320,640,1280"  # Resized WebP/JPEG copies made of each uploaded image
+    IMAGE_VARIANT_QUALITY: int = 80
+    IMAGE_VARIANT_WORKERS: int = 2  # Processes resizing images
+    UPLOAD_CHUNK_SIZE: int = 5242880  # Chunk size suggested to resumable upload clients (5MB)
+    UPLOAD_SESSION_TTL_HOURS: int = 24  # Unfinished resumable uploads are deleted after this
+
+    # Caching
+    ANSWER_KEY_CACHE_SIZE: int = 512  # Number of quizzes kept precompiled for grading
+    STUDENT_VIEW_CACHE_SIZE: int = 512  # Number of quizzes kept pre-serialized for students
+    PRINCIPAL_CACHE_SIZE: int = 10000  # Authenticated users kept resolved
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60  # Bounds staleness across worker processes
+    TOKEN_CACHE_SIZE: int = 10000  # Verified JWT payloads, each kept until its exp
+    SINGLE_FLIGHT_ENABLED: bool = True  # Coalesce concurrent identical hot reads into one load
+
+    # Lesson progress write-behind buffer
+    PROGRESS_BUFFER_ENABLED: bool = True
+    PROGRESS_FLUSH_INTERVAL_SECONDS: float = 5.0
+    PROGRESS_FLUSH_MAX_PENDING: int = 1000  # Flush early once this many (user, lesson) keys are pending
+    PROGRESS_FLUSH_BATCH_SIZE: int = 500  # Rows per upsert statement
+    PROGRESS_FLUSH_MAX_RETRIES: int = 5  # Flushes a rejected row is retried in before it is dropped
+
+    # Quiz submission grading queue (submit returns 202, workers grade in batches)
+    GRADING_QUEUE_ENABLED: bool = False
+    GRADING_WORKERS: int = 2
+    GRADING_QUEUE_SIZE: int = 1000  # Pending attempts held in memory; beyond this submits grade inline
+    GRADING_BATCH_SIZE: int = 50  # Attempts graded per transaction
+    GRADING_SWEEP_INTERVAL_SECONDS: float = 30.0  # How often pending attempts are looked for
+    GRADING_STALE_SECONDS: int = 60  # Attempts pending longer than this are queued again
+    GRADING_MAX_RETRIES: int = 3  # Failed grading runs before an attempt is marked failed
+    REGRADE_CHUNK_SIZE: int = 5000  # Attempts loaded, scored and written back per regrade step
+
+    # Admin dashboard
+    DASHBOARD_AT_RISK_SCORE: float = 50.0  # Best quiz score below which a student counts as at risk
 
     # Email
     MAIL_USERNAME: str = ""
@@ -49,5 +86,9 @@ class Settings(BaseSettings):
         """Parse ALLOWED_ORIGINS string to list"""
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
 
+    def get_image_variant_widths(self) -> List[int]:
+        """Parse IMAGE_VARIANT_WIDTHS string to a sorted list"""
+        return sorted({int(width) for width in self.IMAGE_VARIANT_WIDTHS.split(",") if width.strip()})
+
 
 settings = Settings()
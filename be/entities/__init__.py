@@ -4,8 +4,11 @@ Database entities/models
 from entities.user import User
 from entities.lesson import Lesson
 from entities.student_progress import StudentProgress
-from entities.quiz import Quiz, QuizQuestion, QuizAnswer, QuizAttempt
+from entities.quiz import Quiz, QuizQuestion, QuizAnswer, QuizAttempt, QuizUserStats
+from entities.quiz_analytics import QuizScoreStats, QuizQuestionStats, QuizOptionStats, QuizScoreBucket
 from entities.feedback import Feedback
+from entities.dashboard import DashboardRollup
+from entities.stored_file import StoredFile
 
 __all__ = [
     "User",
@@ -15,5 +18,12 @@ __all__ = [
     "QuizQuestion",
     "QuizAnswer",
     "QuizAttempt",
-    "Feedback"
+    "QuizUserStats",
+    "QuizScoreStats",
+    "QuizQuestionStats",
+    "QuizOptionStats",
+    "QuizScoreBucket",
+    "Feedback",
+    "DashboardRollup",
+    "StoredFile"
 ]
@@ -0,0 +1,30 @@
+"""
+Dashboard rollup entity - precomputed per-class, per-lesson progress counters
+
+Rows hold derived counters only and carry no foreign keys; they are kept
+up to date by deltas from the progress and grading write paths and rebuilt
+from student_progress by the nightly job.
+"""
+from sqlalchemy import Column, Integer, Float, String, DateTime
+from datetime import datetime
+
+from core.database import Base
+
+
+class DashboardRollup(Base):
+    """Progress and score counters of one class on one lesson (students only)"""
+    __tablename__ = "dashboard_rollups"
+
+    class_name = Column(String(20), primary_key=True, default="")  # "" for students without a class
+    lesson_id = Column(Integer, primary_key=True)
+    student_count = Column(Integer, nullable=False, default=0)  # Students with a progress row
+    completed_count = Column(Integer, nullable=False, default=0)
+    progress_sum = Column(Float, nullable=False, default=0.0)
+    time_spent_sum = Column(Integer, nullable=False, default=0)  # seconds
+    scored_count = Column(Integer, nullable=False, default=0)  # Students with a quiz score
+    score_sum = Column(Float, nullable=False, default=0.0)  # Sum of best quiz scores
+    at_risk_count = Column(Integer, nullable=False, default=0)  # Best quiz score below the at-risk threshold
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<DashboardRollup Class:{self.class_name or '-'} Lesson:{self.lesson_id} Students:{self.student_count}>"
@@ -1,7 +1,7 @@
 """
 Feedback entity - for lesson ratings and comments
 """
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -11,6 +11,12 @@ from core.database import Base
 class Feedback(Base):
     """Feedback model - student feedback on lessons"""
     __tablename__ = "feedbacks"
+    __table_args__ = (
+        # One feedback per student and lesson; also serves the (user_id, lesson_id) lookups
+        UniqueConstraint("user_id", "lesson_id", name="uq_feedbacks_user_lesson"),
+        # Admin feedback list, newest first (keyset on created_at, id)
+        Index("ix_feedbacks_created_at", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
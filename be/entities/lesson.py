@@ -1,7 +1,7 @@
 """
 Lesson entity
 """
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Enum, Boolean
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Enum, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -19,6 +19,10 @@ class LessonDifficulty(str, enum.Enum):
 class Lesson(Base):
     """Lesson model"""
     __tablename__ = "lessons"
+    __table_args__ = (
+        # Published lesson listings filtered by grade and sorted by order
+        Index("ix_lessons_published_grade_order", "is_published", "grade", "order"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False, index=True)
@@ -38,6 +42,7 @@ class Lesson(Base):
     # Rating (calculated from student feedback)
     rating = Column(Float, default=0.0)
     review_count = Column(Integer, default=0)
+    rating_sum = Column(Float, nullable=False, default=0.0)  # Running sum, adjusted with each feedback write
 
     # Ordering and visibility
     order = Column(Integer, default=0)
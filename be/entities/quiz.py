@@ -1,7 +1,7 @@
 """
 Quiz entities - for lesson assessments
 """
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Boolean, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -11,6 +11,10 @@ from core.database import Base
 class Quiz(Base):
     """Quiz model"""
     __tablename__ = "quizzes"
+    __table_args__ = (
+        # Active quiz lookup per lesson
+        Index("ix_quizzes_lesson_active", "lesson_id", "is_active"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     lesson_id = Column(Integer, ForeignKey("lessons.id"), nullable=False, index=True)
@@ -25,6 +29,10 @@ class Quiz(Base):
     shuffle_questions = Column(Boolean, default=False)
     show_answers = Column(Boolean, default=True)  # Show answers after submission
 
+    # Bumped by every edit; identifies the cached answer key and student view
+    # (updated_at has one-second resolution on MySQL)
+    version = Column(Integer, nullable=False, default=1)
+
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -33,6 +41,7 @@ class Quiz(Base):
     lesson = relationship("Lesson", back_populates="quizzes")
     questions = relationship("QuizQuestion", back_populates="quiz", cascade="all, delete-orphan")
     attempts = relationship("QuizAttempt", back_populates="quiz", cascade="all, delete-orphan")
+    user_stats = relationship("QuizUserStats", back_populates="quiz", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Quiz {self.title}>"
@@ -89,6 +98,14 @@ class QuizAnswer(Base):
 class QuizAttempt(Base):
     """Quiz attempt model - tracks student quiz submissions"""
     __tablename__ = "quiz_attempts"
+    __table_args__ = (
+        # Per-user attempt lists and best-attempt lookups
+        Index("ix_quiz_attempts_user_quiz_score", "user_id", "quiz_id", "score"),
+        # Admin attempt list, newest first (keyset on submitted_at, id)
+        Index("ix_quiz_attempts_submitted_at", "submitted_at"),
+        # Sweep of attempts still waiting for the grading queue
+        Index("ix_quiz_attempts_pending", "is_completed", "submitted_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -109,6 +126,7 @@ class QuizAttempt(Base):
 
     # Status
     is_completed = Column(Boolean, default=False)
+    grading_failed = Column(Boolean, default=False, nullable=False)  # Queued grading gave up on it
 
     # Relationships
     user = relationship("User", back_populates="quiz_attempts")
@@ -116,3 +134,29 @@ class QuizAttempt(Base):
 
     def __repr__(self):
         return f"<QuizAttempt User:{self.user_id} Quiz:{self.quiz_id} Score:{self.score}%>"
+
+
+class QuizUserStats(Base):
+    """Materialized per-student quiz statistics, updated in the grading transaction"""
+    __tablename__ = "quiz_user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id"), primary_key=True, index=True)
+
+    attempt_count = Column(Integer, nullable=False, default=0)
+    sum_score = Column(Float, nullable=False, default=0.0)
+    best_score = Column(Float, nullable=True)
+    best_attempt_id = Column(Integer, nullable=True)  # No FK: attempts can be purged independently
+    last_score = Column(Float, nullable=True)
+    last_attempt_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    user = relationship("User", back_populates="quiz_stats")
+    quiz = relationship("Quiz", back_populates="user_stats")
+
+    @property
+    def average_score(self) -> float:
+        return self.sum_score / self.attempt_count if self.attempt_count else 0.0
+
+    def __repr__(self):
+        return f"<QuizUserStats User:{self.user_id} Quiz:{self.quiz_id} Attempts:{self.attempt_count}>"
@@ -0,0 +1,64 @@
+"""
+Quiz analytics entities - incrementally maintained item-analysis counters
+
+These tables only hold derived counters, so they carry no foreign keys:
+rows of deleted quizzes/questions are ignored on read and dropped by the
+next full recompute.
+"""
+from sqlalchemy import Column, Integer, Float, DateTime
+from datetime import datetime
+
+from core.database import Base
+
+
+class QuizScoreStats(Base):
+    """Attempt count and score moments of a quiz (mean, spread, discrimination)"""
+    __tablename__ = "quiz_score_stats"
+
+    quiz_id = Column(Integer, primary_key=True)
+    attempt_count = Column(Integer, nullable=False, default=0)
+    sum_score = Column(Float, nullable=False, default=0.0)
+    sum_score_sq = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<QuizScoreStats Quiz:{self.quiz_id} Attempts:{self.attempt_count}>"
+
+
+class QuizQuestionStats(Base):
+    """Per-question response and correctness counters"""
+    __tablename__ = "quiz_question_stats"
+
+    quiz_id = Column(Integer, primary_key=True)
+    question_id = Column(Integer, primary_key=True)
+    response_count = Column(Integer, nullable=False, default=0)  # Attempts that answered the question
+    correct_count = Column(Integer, nullable=False, default=0)
+    sum_score_correct = Column(Float, nullable=False, default=0.0)  # Total score of attempts answering correctly
+
+    def __repr__(self):
+        return f"<QuizQuestionStats Question:{self.question_id} {self.correct_count}/{self.response_count}>"
+
+
+class QuizOptionStats(Base):
+    """How often each answer option (distractor or key) was chosen"""
+    __tablename__ = "quiz_option_stats"
+
+    quiz_id = Column(Integer, primary_key=True)
+    question_id = Column(Integer, primary_key=True)
+    answer_id = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<QuizOptionStats Answer:{self.answer_id} x{self.count}>"
+
+
+class QuizScoreBucket(Base):
+    """Score distribution in 10-point buckets (bucket 9 also holds 100%)"""
+    __tablename__ = "quiz_score_buckets"
+
+    quiz_id = Column(Integer, primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<QuizScoreBucket Quiz:{self.quiz_id} {self.bucket * 10}%+ x{self.count}>"
@@ -0,0 +1,25 @@
+"""
+Stored file entity - reference counts of content-addressed uploads
+
+Uploads are stored once per content as <sha256><ext>; every upload of the
+same content adds a reference and every delete removes one. The file is
+deleted with its last reference.
+"""
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
+from datetime import datetime
+
+from core.database import Base
+
+
+class StoredFile(Base):
+    """One content-addressed file under the upload directory"""
+    __tablename__ = "stored_files"
+
+    path = Column(String(255), primary_key=True)  # Relative to the upload directory, e.g. images/<sha256>.png
+    sha256 = Column(String(64), nullable=False, index=True)
+    size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<StoredFile {self.path} Refs:{self.ref_count}>"
@@ -1,7 +1,7 @@
 """
 Student Progress entity - tracks lesson completion
 """
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Boolean, JSON, Text
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Boolean, JSON, Text, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -11,6 +11,12 @@ from core.database import Base
 class StudentProgress(Base):
     """Student progress tracking for lessons"""
     __tablename__ = "student_progress"
+    __table_args__ = (
+        # One progress row per student and lesson; also serves the (user_id, lesson_id) lookups
+        UniqueConstraint("user_id", "lesson_id", name="uq_student_progress_user_lesson"),
+        # Admin progress list, most recently active first (keyset on last_accessed, id)
+        Index("ix_student_progress_last_accessed", "last_accessed"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
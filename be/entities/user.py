@@ -1,7 +1,7 @@
 """
 User entity - for both students and admins
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -19,6 +19,10 @@ class UserRole(str, enum.Enum):
 class User(Base):
     """User model - handles both students and admins"""
     __tablename__ = "users"
+    __table_args__ = (
+        # Admin student list filtered by role and class, newest first
+        Index("ix_users_role_class_created", "role", "class_name", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(50), unique=True, index=True, nullable=False)
@@ -43,6 +47,7 @@ class User(Base):
     # Relationships
     student_progress = relationship("StudentProgress", back_populates="user", cascade="all, delete-orphan")
     quiz_attempts = relationship("QuizAttempt", back_populates="user", cascade="all, delete-orphan")
+    quiz_stats = relationship("QuizUserStats", back_populates="user", cascade="all, delete-orphan")
     feedbacks = relationship("Feedback", back_populates="user", cascade="all, delete-orphan")
 
     def __repr__(self):
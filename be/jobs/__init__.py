@@ -0,0 +1,3 @@
+"""
+Maintenance jobs, run from cron or by hand (python jobs/<job>.py)
+"""
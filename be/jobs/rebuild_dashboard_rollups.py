@@ -0,0 +1,59 @@
+"""
+Nightly full rebuild of the admin dashboard rollups
+
+dashboard_rollups is maintained by deltas from the progress and grading
+write paths. Changes outside those paths (students moving class, deleted
+users or lessons, manual fixes) are repaired here by recomputing every
+rollup from student_progress in one transaction. Creates the table on
+first run. Reports how many (class, lesson) rows had drifted.
+
+Usage: python jobs/rebuild_dashboard_rollups.py
+Cron:  15 2 * * * cd /path/to/be && python jobs/rebuild_dashboard_rollups.py
+"""
+import sys
+import os
+import time
+
+# Add parent directory to path to import from be
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database import SessionLocal, engine
+from entities.dashboard import DashboardRollup
+from entities.geogebra import GeoGebraContent  # noqa: F401 - needed by the Lesson mapper
+from services.dashboard_rollups import COUNTERS, rebuild_dashboard_rollups
+
+
+def _snapshot(db):
+    return {
+        (rollup.class_name, rollup.lesson_id): tuple(round(getattr(rollup, name), 6) for name in COUNTERS)
+        for rollup in db.query(DashboardRollup).populate_existing().all()
+    }
+
+
+def run_rebuild():
+    """Recompute all dashboard rollups and report drift"""
+    DashboardRollup.__table__.create(bind=engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        before = _snapshot(db)
+        written = rebuild_dashboard_rollups(db)
+        after = _snapshot(db)
+        db.commit()
+
+        drifted = sum(1 for key in before.keys() | after.keys() if before.get(key) != after.get(key))
+        print(
+            f"✓ Rebuilt {written} dashboard rollups in {time.perf_counter() - started:.2f}s "
+            f"({drifted} had drifted)"
+        )
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Rebuild failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_rebuild()
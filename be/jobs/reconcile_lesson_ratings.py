@@ -0,0 +1,53 @@
+"""
+Check the running lesson rating aggregates against a full recompute
+
+Lesson.rating_sum / review_count / rating are adjusted by deltas on every
+feedback write. This job recomputes them from the feedbacks table, reports
+lessons that drifted and, with --fix, overwrites those lessons under a row
+lock. Exits with status 1 when drift was found and not fixed, so it can
+alert from cron.
+
+Usage: python jobs/reconcile_lesson_ratings.py [--fix]
+"""
+import sys
+import os
+
+# Add parent directory to path to import from be
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database import SessionLocal
+from entities.geogebra import GeoGebraContent  # noqa: F401 - needed by the Lesson mapper
+from services.feedback_service import FeedbackService
+
+
+def run_reconcile():
+    """Report (and optionally fix) lessons whose rating aggregates drifted"""
+    fix = "--fix" in sys.argv[1:]
+
+    db = SessionLocal()
+    try:
+        drifted = FeedbackService.reconcile_lesson_ratings(db, fix=fix)
+        for entry in drifted:
+            print(
+                f"  Lesson {entry['lesson_id']}: "
+                f"sum {entry['rating_sum']} -> {entry['expected_rating_sum']}, "
+                f"count {entry['review_count']} -> {entry['expected_review_count']}, "
+                f"rating {entry['rating']} -> {entry['expected_rating']}"
+            )
+        if not drifted:
+            print("✓ All lesson rating aggregates match the feedbacks")
+        elif fix:
+            print(f"✓ Fixed {len(drifted)} lessons")
+        else:
+            print(f"✗ {len(drifted)} lessons drifted (re-run with --fix to repair)")
+            sys.exit(1)
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Reconciliation failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_reconcile()
@@ -0,0 +1,131 @@
+"""
+Concurrency benchmark for the async database engine
+Replays a stream of lesson reads inside one event loop, as one uvicorn
+worker would serve them, with every n-th request running a slow query (a
+report, a cold cache). Requests arrive at a fixed rate and latency is taken
+from each request's arrival time, so time spent waiting for a blocked event
+loop counts.
+
+- sync:  the old async def handlers, querying a sync Session on the event loop
+- async: handlers on get_async_db (AsyncSession, sync service code via run_sync)
+
+With sync sessions one slow query stalls every request behind it; p99 of the
+fast requests shows it. Keep the rate below what one worker can serve, or
+both modes only measure queueing.
+
+Usage: python load_test_async_db.py [lesson_id] [requests] [requests_per_second]
+"""
+import asyncio
+import sys
+import time
+
+from sqlalchemy import text
+
+from core.database import AsyncSessionLocal, SessionLocal, async_engine
+from entities.geogebra import GeoGebraContent  # noqa: F401 - needed by the Lesson mapper
+from entities.lesson import Lesson
+from services.lesson_service import LessonService
+
+SLOW_EVERY = 20  # Every n-th request runs the slow query
+SLOW_SECONDS = 0.2
+
+SLOW_QUERIES = {
+    "mysql": f"SELECT SLEEP({SLOW_SECONDS})",
+    "postgresql": f"SELECT pg_sleep({SLOW_SECONDS})",
+}
+# Dialects without a sleep function burn CPU in the database instead
+COUNTING_QUERY = (
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < :n) "
+    "SELECT count(*) FROM c"
+)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def slow_query(db) -> tuple:
+    """(statement, parameters) of a query taking about SLOW_SECONDS"""
+    dialect = db.get_bind().dialect.name
+    if dialect in SLOW_QUERIES:
+        return text(SLOW_QUERIES[dialect]), {}
+
+    # Size the counting query to SLOW_SECONDS on this machine
+    rows = 100000
+    started = time.perf_counter()
+    db.execute(text(COUNTING_QUERY), {"n": rows})
+    elapsed = time.perf_counter() - started
+    return text(COUNTING_QUERY), {"n": int(rows * SLOW_SECONDS / max(elapsed, 1e-6))}
+
+
+def sync_request(lesson_id: int, slow) -> None:
+    db = SessionLocal()
+    try:
+        if slow:
+            db.execute(*slow)
+        LessonService.get_lesson_response(db, lesson_id)
+    finally:
+        db.close()
+
+
+async def async_request(lesson_id: int, slow) -> None:
+    async with AsyncSessionLocal() as db:
+        if slow:
+            await db.execute(*slow)
+        await db.run_sync(LessonService.get_lesson_response, lesson_id)
+
+
+async def replay(mode: str, lesson_id: int, count: int, rate: float, slow_query_args) -> tuple:
+    fast, slow = [], []
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    async def one(index: int):
+        arrival = started + index / rate
+        await asyncio.sleep(max(0.0, arrival - loop.time()))
+        is_slow = index % SLOW_EVERY == SLOW_EVERY - 1
+        query = slow_query_args if is_slow else None
+        if mode == "sync":
+            sync_request(lesson_id, query)  # Blocks the event loop, as the old handlers did
+        else:
+            await async_request(lesson_id, query)
+        (slow if is_slow else fast).append(loop.time() - arrival)
+
+    await asyncio.gather(*(one(index) for index in range(count)))
+    total = loop.time() - started
+    # Pooled async connections belong to this event loop, which asyncio.run closes
+    await async_engine.dispose()
+    return fast, slow, total
+
+
+def main():
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    rate = float(sys.argv[3]) if len(sys.argv) > 3 else 50.0
+
+    db = SessionLocal()
+    try:
+        if len(sys.argv) > 1:
+            lesson_id = int(sys.argv[1])
+        else:
+            lesson = db.query(Lesson.id).first()
+            if not lesson:
+                sys.exit("No lessons found. Please run seed_data.py first.")
+            lesson_id = lesson.id
+        slow = slow_query(db)
+    finally:
+        db.close()
+
+    print(f"Lesson {lesson_id}: {count} requests at {rate:.0f}/s, every {SLOW_EVERY}th with a "
+          f"~{SLOW_SECONDS * 1000:.0f} ms query\n")
+    print(f"{'mode':6} {'fast p50 ms':>12} {'fast p99 ms':>12} {'fast max ms':>12} {'slow p50 ms':>12} {'total s':>8}")
+    for mode in ("sync", "async"):
+        fast, slow_latencies, total = asyncio.run(replay(mode, lesson_id, count, rate, slow))
+        print(
+            f"{mode:6} {percentile(fast, 0.5) * 1000:>12.1f} {percentile(fast, 0.99) * 1000:>12.1f} "
+            f"{max(fast) * 1000:>12.1f} {percentile(slow_latencies, 0.5) * 1000:>12.1f} {total:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
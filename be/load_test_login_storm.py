@@ -0,0 +1,131 @@
+"""
+Login storm benchmark
+A class logs in at once: N concurrent AuthService.login calls inside one
+event loop, as one uvicorn worker would serve them. Prints logins per
+second, login latency and event-loop lag (how late a 10 ms timer fires
+while the storm runs), first with bcrypt run inline on the event loop (the
+old login) and then through the bounded password hashing pool.
+
+Temporary students sharing one password hash are created and deleted
+afterwards.
+
+Usage: python load_test_login_storm.py [logins]
+"""
+import asyncio
+import sys
+import uuid
+
+from fastapi import HTTPException
+
+from core.config import settings
+from core.database import AsyncSessionLocal, SessionLocal, async_engine
+from entities.geogebra import GeoGebraContent  # noqa: F401 - needed by the Lesson mapper
+from entities.user import User, UserRole
+from schemas.user import UserLogin
+from services.auth_service import AuthService
+from utils.security import get_password_hash, verify_password
+
+PASSWORD = "storm-password"
+LAG_INTERVAL = 0.01
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def create_students(count: int) -> list:
+    prefix = f"storm-{uuid.uuid4().hex[:8]}"
+    hashed_password = get_password_hash(PASSWORD)
+    db = SessionLocal()
+    try:
+        db.add_all([
+            User(email=f"{prefix}-{index}@example.com", username=f"{prefix}-{index}",
+                 hashed_password=hashed_password, full_name=f"Storm {index}", role=UserRole.STUDENT)
+            for index in range(count)
+        ])
+        db.commit()
+    finally:
+        db.close()
+    return [f"{prefix}-{index}" for index in range(count)]
+
+
+def delete_students(usernames: list) -> None:
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.username.in_(usernames)).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+async def verify_inline(plain_password: str, hashed_password: str) -> bool:
+    """The old login: bcrypt on the event loop"""
+    return verify_password(plain_password, hashed_password)
+
+
+async def measure_lag(stop: asyncio.Event, lags: list) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + LAG_INTERVAL
+        await asyncio.sleep(LAG_INTERVAL)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def storm(usernames: list) -> dict:
+    latencies, rejected = [], 0
+    lags = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(measure_lag(stop, lags))
+    loop = asyncio.get_running_loop()
+
+    async def login(username: str):
+        nonlocal rejected
+        started = loop.time()
+        async with AsyncSessionLocal() as db:
+            try:
+                await AuthService.login(db, UserLogin(username=username, password=PASSWORD))
+            except HTTPException as e:
+                if e.status_code != 503:
+                    raise
+                rejected += 1
+                return
+        latencies.append(loop.time() - started)
+
+    # Let the lag monitor take a first sample before the storm
+    await asyncio.sleep(LAG_INTERVAL * 2)
+    started = loop.time()
+    await asyncio.gather(*(login(username) for username in usernames))
+    total = loop.time() - started
+    stop.set()
+    await monitor
+    # Pooled async connections belong to this event loop, which asyncio.run closes
+    await async_engine.dispose()
+    return {"latencies": latencies, "rejected": rejected, "lags": lags, "total": total}
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    usernames = create_students(count)
+    pooled = AuthService.__dict__["verify_password_async"]
+    try:
+        print(f"{count} concurrent logins; pool: {settings.PASSWORD_HASH_WORKERS} "
+              f"{settings.PASSWORD_HASH_EXECUTOR} workers, queue {settings.PASSWORD_HASH_QUEUE_SIZE}\n")
+        print(f"{'mode':7} {'logins/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'rejected':>9} "
+              f"{'lag p99 ms':>11} {'lag max ms':>11}")
+        for mode, verify in (("inline", staticmethod(verify_inline)), ("pool", pooled)):
+            AuthService.verify_password_async = verify
+            result = asyncio.run(storm(usernames))
+            latencies, lags = result["latencies"], result["lags"]
+            print(
+                f"{mode:7} {len(latencies) / result['total']:>9.1f} "
+                f"{percentile(latencies, 0.5) * 1000:>8.1f} {percentile(latencies, 0.99) * 1000:>8.1f} "
+                f"{result['rejected']:>9} {percentile(lags, 0.99) * 1000:>11.1f} {max(lags) * 1000:>11.1f}"
+            )
+    finally:
+        AuthService.verify_password_async = pooled
+        delete_students(usernames)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Burst benchmark for quiz submission
+Simulates a class submitting a timed quiz at once: N submissions spread over
+one second, each from its own thread and session, first graded inline and
+then through the grading queue. Prints p50/p99 request latency, the time until
+every attempt is graded and, on MySQL, InnoDB row lock waits.
+
+Run against a test database: attempts created by the benchmark are deleted
+and the affected quiz stats rebuilt afterwards.
+
+Usage: python load_test_quiz_submit.py <quiz_id> [submissions] [spread_seconds]
+"""
+import random
+import sys
+import threading
+import time
+
+from sqlalchemy import text
+
+from core.database import SessionLocal
+from entities.geogebra import GeoGebraContent  # noqa: F401 - needed by the Lesson mapper
+from entities.quiz import Quiz, QuizAttempt
+from entities.user import User, UserRole
+from schemas.quiz import QuizSubmitRequest
+from services.grading_queue import grading_queue
+from services.quiz_service import QuizService
+from services.quiz_stats import rebuild_quiz_user_stats
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def row_lock_status(db):
+    """InnoDB row lock counters (MySQL only)"""
+    if db.get_bind().dialect.name != "mysql":
+        return None
+    rows = db.execute(text("SHOW GLOBAL STATUS LIKE 'Innodb_row_lock%'")).all()
+    return {name: int(value) for name, value in rows}
+
+
+def build_submissions(db, quiz_id, count):
+    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    if not quiz:
+        sys.exit(f"Quiz {quiz_id} not found")
+    answer_key = QuizService.get_answer_key(db, quiz)
+
+    students = [
+        user_id for (user_id,) in db.query(User.id).filter(User.role == UserRole.STUDENT).limit(count).all()
+    ]
+    if not students:
+        sys.exit("No students found. Please run seed_data.py first.")
+
+    submissions = []
+    for index in range(count):
+        answers = {}
+        for question in answer_key.questions:
+            # Roughly 70% correct answers
+            if question.correct_answer_id is not None:
+                answers[question.question_id] = (
+                    question.correct_answer_id if random.random() < 0.7 else 0
+                )
+            elif question.correct_answer_text:
+                answers[question.question_id] = (
+                    question.correct_answer_text if random.random() < 0.7 else "?"
+                )
+        submissions.append((students[index % len(students)], QuizSubmitRequest(answers=answers, time_spent=600)))
+    return submissions
+
+
+def run_burst(quiz_id, submissions, spread, queued):
+    latencies = []
+    attempt_ids = []
+    lock = threading.Lock()
+    started = time.perf_counter()
+
+    def submit(index, user_id, submit_data):
+        time.sleep(max(0.0, started + spread * index / len(submissions) - time.perf_counter()))
+        db = SessionLocal()
+        try:
+            begin = time.perf_counter()
+            if queued:
+                attempt = QuizService.create_pending_attempt(db, user_id, quiz_id, submit_data)
+                if not grading_queue.submit(attempt.id):
+                    QuizService.grade_pending_attempts(db, [attempt.id])
+            else:
+                attempt, _, _ = QuizService.submit_quiz(db, user_id, quiz_id, submit_data)
+            elapsed = time.perf_counter() - begin
+            with lock:
+                latencies.append(elapsed)
+                attempt_ids.append(attempt.id)
+        finally:
+            db.close()
+
+    threads = [
+        threading.Thread(target=submit, args=(index, user_id, submit_data))
+        for index, (user_id, submit_data) in enumerate(submissions)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Wait until every attempt has been graded
+    db = SessionLocal()
+    try:
+        while db.query(QuizAttempt.id).filter(
+            QuizAttempt.id.in_(attempt_ids),
+            QuizAttempt.is_completed == False
+        ).count():
+            db.rollback()
+            time.sleep(0.05)
+    finally:
+        db.close()
+    return latencies, time.perf_counter() - started, attempt_ids
+
+
+def delete_attempts(quiz_id, attempt_ids):
+    db = SessionLocal()
+    try:
+        user_ids = [
+            user_id for (user_id,) in db.query(QuizAttempt.user_id).filter(
+                QuizAttempt.id.in_(attempt_ids)
+            ).distinct().all()
+        ]
+        db.query(QuizAttempt).filter(QuizAttempt.id.in_(attempt_ids)).delete(synchronize_session=False)
+        rebuild_quiz_user_stats(db, quiz_id=quiz_id, user_ids=user_ids)
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    quiz_id = int(sys.argv[1])
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    spread = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+
+    db = SessionLocal()
+    try:
+        submissions = build_submissions(db, quiz_id, count)
+    finally:
+        db.close()
+
+    grading_queue.start()
+    print(f"Quiz {quiz_id}: {count} submissions over {spread:.1f}s\n")
+    print(f"{'mode':8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'all graded s':>13} {'lock waits':>11} {'lock ms':>8}")
+    for label, queued in (("inline", False), ("queued", True)):
+        db = SessionLocal()
+        before = row_lock_status(db)
+        db.close()
+
+        latencies, total, attempt_ids = run_burst(quiz_id, submissions, spread, queued)
+
+        db = SessionLocal()
+        after = row_lock_status(db)
+        db.close()
+        if before is not None:
+            waits = after["Innodb_row_lock_waits"] - before["Innodb_row_lock_waits"]
+            wait_ms = after["Innodb_row_lock_time"] - before["Innodb_row_lock_time"]
+        else:
+            waits = wait_ms = "n/a"
+
+        print(
+            f"{label:8} {percentile(latencies, 0.5) * 1000:>8.1f} {percentile(latencies, 0.99) * 1000:>8.1f} "
+            f"{max(latencies) * 1000:>8.1f} {total:>13.2f} {waits!s:>11} {wait_ms!s:>8}"
+        )
+        delete_attempts(quiz_id, attempt_ids)
+
+    grading_queue.stop()
+    print(f"\nGrading queue: {grading_queue.stats()}")
+
+
+if __name__ == "__main__":
+    main()
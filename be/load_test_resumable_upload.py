@@ -0,0 +1,199 @@
+"""
+Load test for resumable chunked video uploads
+Uploads a random file to a running server through /api/upload/video/sessions
+with parallel chunks, cutting every few chunks off halfway to simulate a
+dropped connection. Interrupted chunks are resumed from the ranges the
+server reports (HEAD), the upload is finalized and its SHA-256 compared
+with the local file. While it runs, the server's resident memory is sampled
+from /proc (Linux, same machine) to show it does not grow with the file.
+
+Uses only the standard library. The uploaded file is deleted afterwards.
+
+Usage: python load_test_resumable_upload.py <base_url> <admin_token> [size_mb] [server_pid]
+Example: python load_test_resumable_upload.py http://localhost:8000 eyJ... 90 $(pgrep -f "uvicorn main:app")
+"""
+import hashlib
+import http.client
+import json
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+PARALLEL_CHUNKS = 3
+INTERRUPT_EVERY = 4  # Every n-th chunk is cut off halfway on its first attempt
+SAMPLE_INTERVAL = 0.05
+
+
+def connect(base_url: str) -> http.client.HTTPConnection:
+    parts = urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    return connection_class(parts.hostname, parts.port, timeout=300)
+
+
+def request(base_url: str, token: str, method: str, path: str, body=None, headers=None):
+    connection = connect(base_url)
+    connection.request(method, path, body=body, headers={"Authorization": f"Bearer {token}", **(headers or {})})
+    response = connection.getresponse()
+    payload = response.read()
+    connection.close()
+    return response, json.loads(payload) if payload else None
+
+
+def rss_bytes(pid: int) -> int:
+    """Resident memory of a process and its children (uvicorn workers)"""
+    total = 0
+    for task in [pid] + [int(child) for child in _children(pid)]:
+        try:
+            with open(f"/proc/{task}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+        except FileNotFoundError:
+            pass
+    return total
+
+
+def _children(pid: int) -> list:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as children:
+            return children.read().split()
+    except FileNotFoundError:
+        return []
+
+
+def sample_memory(pid: int, stop: threading.Event, samples: list) -> None:
+    while not stop.is_set():
+        samples.append(rss_bytes(pid))
+        time.sleep(SAMPLE_INTERVAL)
+
+
+def make_file(size: int) -> tuple:
+    """Write size random bytes to a temp file; returns (path, sha256)"""
+    digest = hashlib.sha256()
+    handle = tempfile.NamedTemporaryFile(suffix=".mp4", delete=False)
+    with handle:
+        remaining = size
+        while remaining > 0:
+            block = os.urandom(min(1024 * 1024, remaining))
+            digest.update(block)
+            handle.write(block)
+            remaining -= len(block)
+    return handle.name, digest.hexdigest()
+
+
+def send_interrupted(base_url: str, token: str, path: str, offset: int, data: bytes) -> None:
+    """Announce a whole chunk, send half of it and drop the connection"""
+    connection = connect(base_url)
+    connection.putrequest("PATCH", path)
+    connection.putheader("Authorization", f"Bearer {token}")
+    connection.putheader("Upload-Offset", str(offset))
+    connection.putheader("Content-Type", "application/offset+octet-stream")
+    connection.putheader("Content-Length", str(len(data)))
+    connection.endheaders()
+    connection.send(data[:len(data) // 2])
+    connection.sock.close()
+
+
+def received_up_to(base_url: str, token: str, path: str, start: int) -> int:
+    response, _ = request(base_url, token, "HEAD", path)
+    for pair in filter(None, (response.getheader("Upload-Ranges") or "").split(",")):
+        first, last = (int(bound) for bound in pair.split("-"))
+        if first <= start <= last + 1:
+            return last + 1
+    return start
+
+
+def upload_chunks(base_url: str, token: str, session: dict, file_path: str, stats: dict) -> None:
+    path = session["url"]
+    chunks = queue.Queue()
+    for index, start in enumerate(range(0, session["size"], session["chunk_size"])):
+        chunks.put((index, start, min(start + session["chunk_size"], session["size"])))
+    lock = threading.Lock()
+
+    def worker():
+        with open(file_path, "rb") as source:
+            while True:
+                try:
+                    index, start, end = chunks.get_nowait()
+                except queue.Empty:
+                    return
+                source.seek(start)
+                data = source.read(end - start)
+                offset = start
+                if index % INTERRUPT_EVERY == 0:
+                    send_interrupted(base_url, token, path, start, data)
+                    time.sleep(0.2)  # Let the server notice the disconnect
+                    offset = received_up_to(base_url, token, path, start)
+                    with lock:
+                        stats["interrupted"] += 1
+                        stats["saved_bytes"] += offset - start
+                if offset < end:
+                    response, body = request(base_url, token, "PATCH", path, data[offset - start:], {
+                        "Upload-Offset": str(offset),
+                        "Content-Type": "application/offset+octet-stream"
+                    })
+                    if response.status != 204:
+                        raise RuntimeError(f"PATCH at {offset}: HTTP {response.status} {body}")
+
+    threads = [threading.Thread(target=worker) for _ in range(PARALLEL_CHUNKS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.exit(__doc__)
+    base_url, token = sys.argv[1].rstrip("/"), sys.argv[2]
+    size = int(float(sys.argv[3]) * 1024 * 1024) if len(sys.argv) > 3 else 90 * 1024 * 1024
+    pid = int(sys.argv[4]) if len(sys.argv) > 4 else None
+
+    file_path, expected_sha256 = make_file(size)
+    samples = []
+    stop = threading.Event()
+    sampler = None
+    try:
+        baseline = rss_bytes(pid) if pid else 0
+        if pid:
+            sampler = threading.Thread(target=sample_memory, args=(pid, stop, samples))
+            sampler.start()
+
+        response, session = request(base_url, token, "POST", "/api/upload/video/sessions", json.dumps({
+            "filename": "load-test.mp4", "size": size
+        }), {"Content-Type": "application/json"})
+        if response.status != 201:
+            sys.exit(f"Create session: HTTP {response.status} {session}")
+
+        stats = {"interrupted": 0, "saved_bytes": 0}
+        started = time.perf_counter()
+        upload_chunks(base_url, token, session, file_path, stats)
+        response, result = request(base_url, token, "POST", f"{session['url']}/finalize")
+        elapsed = time.perf_counter() - started
+    finally:
+        stop.set()
+        if sampler:
+            sampler.join()
+        os.unlink(file_path)
+
+    print(f"Uploaded {size / 1024 / 1024:.0f} MB in {-(-size // session['chunk_size'])} chunks "
+          f"({PARALLEL_CHUNKS} parallel) in {elapsed:.2f}s: HTTP {response.status}")
+    print(f"Interrupted chunks: {stats['interrupted']}, "
+          f"{stats['saved_bytes'] / 1024 / 1024:.1f} MB kept by the server and not resent")
+    ok = response.status == 200 and result["sha256"] == expected_sha256
+    print(f"SHA-256 matches: {ok}")
+    if samples:
+        print(f"Server RSS: baseline {baseline / 1024 / 1024:.1f} MB, "
+              f"peak {max(samples) / 1024 / 1024:.1f} MB (+{(max(samples) - baseline) / 1024 / 1024:.1f} MB)")
+
+    if response.status == 200:
+        request(base_url, token, "DELETE", f"/api/upload/videos/{result['filename']}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Load test for single-flight request coalescing
+Fires bursts of identical concurrent reads (a class opening the same lesson,
+quiz and GeoGebra applets) and prints the number of SQL statements executed
+with and without coalescing.
+
+Usage: python load_test_single_flight.py [lesson_id] [concurrency]
+"""
+import asyncio
+import sys
+import threading
+import time
+
+from sqlalchemy import event
+
+from core.database import SessionLocal, AsyncSessionLocal, engine, async_engine
+from services.geogebra_service import GeoGebraService, geogebra_flight
+from services.lesson_service import LessonService, lesson_flight
+from services.quiz_service import QuizService, student_quiz_flight, student_view_cache
+
+
+class QueryCounter:
+    """Counts statements sent to the database by both engines"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+        for target in (engine, async_engine.sync_engine):
+            event.listen(target, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        with self._lock:
+            self.count += 1
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+
+
+def run_threaded_burst(fn, concurrency: int):
+    """Run fn(db) in `concurrency` threads released at the same moment"""
+    barrier = threading.Barrier(concurrency)
+
+    def worker():
+        db = SessionLocal()
+        try:
+            barrier.wait()
+            fn(db)
+        except Exception:
+            pass  # 404s (missing lesson/quiz) still count as one load
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+async def run_async_burst(lesson_id: int, concurrency: int):
+    """Run the async lesson read `concurrency` times concurrently"""
+    async def one():
+        async with AsyncSessionLocal() as db:
+            try:
+                await LessonService.get_lesson_shared(db, lesson_id)
+            except Exception:
+                pass
+
+    await asyncio.gather(*(one() for _ in range(concurrency)))
+    # Pooled async connections belong to this event loop, which asyncio.run closes
+    await async_engine.dispose()
+
+
+def measure(counter: QueryCounter, lesson_id: int, concurrency: int, enabled: bool) -> dict:
+    for group in (lesson_flight, student_quiz_flight, geogebra_flight):
+        group.enabled = enabled
+    # Start from a cold student view cache so both runs build it once
+    student_view_cache.clear()
+
+    results = {}
+    scenarios = [
+        ("GET /lessons/{id}", lambda: asyncio.run(run_async_burst(lesson_id, concurrency))),
+        ("GET /quizzes/lesson/{id}/quiz", lambda: run_threaded_burst(
+            lambda db: QuizService.get_student_view_for_lesson(db, lesson_id), concurrency
+        )),
+        ("GET /geogebra/lesson/{id}", lambda: run_threaded_burst(
+            lambda db: GeoGebraService.get_by_lesson_shared(db, lesson_id), concurrency
+        )),
+    ]
+    for label, scenario in scenarios:
+        counter.reset()
+        started = time.perf_counter()
+        scenario()
+        results[label] = (counter.count, time.perf_counter() - started)
+    return results
+
+
+def main():
+    lesson_id = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    counter = QueryCounter()
+
+    print(f"Lesson {lesson_id}, {concurrency} concurrent identical requests per endpoint\n")
+    without = measure(counter, lesson_id, concurrency, enabled=False)
+    with_flight = measure(counter, lesson_id, concurrency, enabled=True)
+
+    print(f"{'endpoint':32} {'queries (off)':>14} {'queries (on)':>13} {'ms (off)':>9} {'ms (on)':>8}")
+    for label in without:
+        off_count, off_time = without[label]
+        on_count, on_time = with_flight[label]
+        print(f"{label:32} {off_count:>14} {on_count:>13} {off_time * 1000:>9.1f} {on_time * 1000:>8.1f}")
+
+    print("\nCoalescing counters:")
+    for group in (lesson_flight, student_quiz_flight, geogebra_flight):
+        print(f"  {group.name}: {group.stats()}")
+
+
+if __name__ == "__main__":
+    main()
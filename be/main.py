@@ -8,7 +8,12 @@ from contextlib import asynccontextmanager
 from pathlib import Path
 
 from core.config import settings
-from core.database import init_db
+from core.database import init_db, async_engine
+from utils.security import shutdown_password_executor
+from utils.static_files import UploadStaticFiles
+from services.progress_buffer import progress_buffer
+from services.grading_queue import grading_queue
+from services.image_variants import shutdown_variant_executor
 
 # Import routers
 from routes import auth, lessons, quiz, upload, feedback,geogebra, admin
@@ -30,10 +35,23 @@ async def lifespan(app: FastAPI):
     init_db()
     print("✅ Database initialized")
 
+    if settings.PROGRESS_BUFFER_ENABLED:
+        progress_buffer.start()
+    if settings.GRADING_QUEUE_ENABLED:
+        grading_queue.start()
+        grading_queue.recover()
+
     yield
 
     # Shutdown
     print("👋 Shutting down...")
+    if settings.GRADING_QUEUE_ENABLED:
+        grading_queue.stop()
+    if settings.PROGRESS_BUFFER_ENABLED:
+        progress_buffer.stop()
+    await async_engine.dispose()
+    shutdown_password_executor()
+    shutdown_variant_executor()
 
 
 # Create FastAPI app
@@ -59,6 +77,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Resumable uploads report their progress in these headers
+    expose_headers=["Upload-Offset", "Upload-Length", "Upload-Ranges"],
 )
 
 # Include routers
@@ -73,7 +93,7 @@ app.include_router(geogebra.router, prefix="/api")
 # Mount static files for uploads
 uploads_dir = Path("uploads")
 uploads_dir.mkdir(exist_ok=True)
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+app.mount("/uploads", UploadStaticFiles(directory="uploads"), name="uploads")
 
 # Mount static files for default images
 default_dir = Path("default")
@@ -3,13 +3,13 @@ Authentication middleware and dependencies
 """
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 
-from core.database import get_db
-from entities.user import User, UserRole
+from core.database import get_async_db
+from entities.user import UserRole
 from utils.security import decode_access_token
-from services.auth_service import AuthService
+from services.auth_service import AuthService, UserPrincipal
 
 # OAuth2 scheme for token extraction
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -17,15 +17,15 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_async_db)
+) -> UserPrincipal:
     """
     Dependency to get current authenticated user from token
     Args:
         token: JWT access token
-        db: Database session
+        db: Database session (only used on a principal cache miss)
     Returns:
-        Current user
+        Current user principal (load the full User entity when more fields are needed)
     Raises:
         HTTPException: If token is invalid or user not found
     """
@@ -44,9 +44,9 @@ async def get_current_user(
     if user_id is None:
         raise credentials_exception
 
-    # Get user from database
+    # Resolve user from the principal cache, falling back to the database
     try:
-        user = AuthService.get_current_user(db, int(user_id))
+        user = await db.run_sync(AuthService.get_principal, int(user_id))
     except Exception:
         raise credentials_exception
 
@@ -54,8 +54,8 @@ async def get_current_user(
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_user)
+) -> UserPrincipal:
     """
     Dependency to ensure user is active
     Args:
@@ -74,8 +74,8 @@ async def get_current_active_user(
 
 
 async def get_current_admin_user(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_active_user)
+) -> UserPrincipal:
     """
     Dependency to ensure user is admin
     Args:
@@ -94,8 +94,8 @@ async def get_current_admin_user(
 
 
 async def get_current_teacher_or_admin(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_active_user)
+) -> UserPrincipal:
     """
     Dependency to ensure user is teacher or admin
     Args:
@@ -114,8 +114,8 @@ async def get_current_teacher_or_admin(
 
 
 async def get_current_student_user(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_active_user)
+) -> UserPrincipal:
     """
     Dependency to ensure user is student
     Args:
@@ -141,7 +141,7 @@ def require_role(roles: List[UserRole]):
     Returns:
         Dependency function that checks user role
     """
-    async def role_checker(current_user: User = Depends(get_current_active_user)) -> User:
+    async def role_checker(current_user: UserPrincipal = Depends(get_current_active_user)) -> UserPrincipal:
         if current_user.role not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,15 @@
+-- Migration: Indexes for the paginated admin lists
+-- Keyset pages are ordered by (date, id); InnoDB secondary indexes already
+-- end with the primary key, so a single-column index serves both.
+
+-- For MySQL
+CREATE INDEX ix_quiz_attempts_submitted_at ON quiz_attempts (submitted_at);
+CREATE INDEX ix_student_progress_last_accessed ON student_progress (last_accessed);
+CREATE INDEX ix_feedbacks_created_at ON feedbacks (created_at);
+CREATE INDEX ix_users_role_class_created ON users (role, class_name, created_at);
+
+-- For PostgreSQL / SQLite (alternative, include the id tie-breaker explicitly)
+-- CREATE INDEX ix_quiz_attempts_submitted_at ON quiz_attempts (submitted_at, id);
+-- CREATE INDEX ix_student_progress_last_accessed ON student_progress (last_accessed, id);
+-- CREATE INDEX ix_feedbacks_created_at ON feedbacks (created_at, id);
+-- CREATE INDEX ix_users_role_class_created ON users (role, class_name, created_at, id);
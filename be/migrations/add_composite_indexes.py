@@ -0,0 +1,93 @@
+"""
+Run database migration to add composite and unique indexes for hot lookups
+"""
+import sys
+import os
+
+# Add parent directory to path to import from be
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from core.config import settings
+
+# (table, index name, DDL)
+INDEXES = [
+    ("student_progress", "uq_student_progress_user_lesson",
+     "ALTER TABLE student_progress ADD UNIQUE INDEX uq_student_progress_user_lesson (user_id, lesson_id)"),
+    ("feedbacks", "uq_feedbacks_user_lesson",
+     "ALTER TABLE feedbacks ADD UNIQUE INDEX uq_feedbacks_user_lesson (user_id, lesson_id)"),
+    ("quiz_attempts", "ix_quiz_attempts_user_quiz_score",
+     "CREATE INDEX ix_quiz_attempts_user_quiz_score ON quiz_attempts (user_id, quiz_id, score)"),
+    ("quizzes", "ix_quizzes_lesson_active",
+     "CREATE INDEX ix_quizzes_lesson_active ON quizzes (lesson_id, is_active)"),
+    ("lessons", "ix_lessons_published_grade_order",
+     "CREATE INDEX ix_lessons_published_grade_order ON lessons (is_published, grade, `order`)"),
+]
+
+# Remove duplicates so the unique indexes can be created (keeps the newest row)
+DEDUPLICATE_SQL = [
+    """
+    DELETE sp FROM student_progress sp
+    JOIN student_progress newer
+      ON newer.user_id = sp.user_id AND newer.lesson_id = sp.lesson_id AND newer.id > sp.id
+    """,
+    """
+    DELETE fb FROM feedbacks fb
+    JOIN feedbacks newer
+      ON newer.user_id = fb.user_id AND newer.lesson_id = fb.lesson_id AND newer.id > fb.id
+    """,
+    """
+    UPDATE lessons l
+    LEFT JOIN (
+        SELECT lesson_id, ROUND(AVG(rating), 2) AS avg_rating, COUNT(*) AS cnt
+        FROM feedbacks GROUP BY lesson_id
+    ) f ON f.lesson_id = l.id
+    SET l.rating = COALESCE(f.avg_rating, 0), l.review_count = COALESCE(f.cnt, 0)
+    """,
+]
+
+def index_exists(connection, table: str, index_name: str) -> bool:
+    """Check information_schema for an index"""
+    result = connection.execute(text("""
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND INDEX_NAME = :index_name
+    """), {"table": table, "index_name": index_name})
+    return result.scalar() > 0
+
+
+def run_migration():
+    """Apply the add_composite_indexes migration"""
+
+    # Create engine
+    engine = create_engine(settings.DATABASE_URL)
+
+    try:
+        with engine.connect() as connection:
+            missing = [(table, name, ddl) for table, name, ddl in INDEXES
+                       if not index_exists(connection, table, name)]
+
+            if not missing:
+                print("✓ All composite indexes already exist")
+            else:
+                print("Removing duplicate progress/feedback rows...")
+                for sql in DEDUPLICATE_SQL:
+                    connection.execute(text(sql))
+                connection.commit()
+
+                for table, name, ddl in missing:
+                    print(f"Creating index {name} on {table}...")
+                    connection.execute(text(ddl))
+                connection.commit()
+                print("✓ Migration completed successfully!")
+
+            # The plans of the hot queries are checked against real service calls
+            print("Run python check_query_indexes.py to verify the hot queries use these indexes")
+
+    except Exception as e:
+        print(f"✗ Migration failed: {e}")
+        sys.exit(1)
+    finally:
+        engine.dispose()
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,47 @@
+-- Migration: Composite and unique indexes for hot lookup patterns
+-- Duplicate progress/feedback rows must be removed before the unique
+-- constraints can be created; the most recent row (highest id) is kept.
+
+-- For MySQL
+
+-- 1. Remove duplicate (user_id, lesson_id) rows
+DELETE sp FROM student_progress sp
+JOIN student_progress newer
+  ON newer.user_id = sp.user_id
+ AND newer.lesson_id = sp.lesson_id
+ AND newer.id > sp.id;
+
+DELETE fb FROM feedbacks fb
+JOIN feedbacks newer
+  ON newer.user_id = fb.user_id
+ AND newer.lesson_id = fb.lesson_id
+ AND newer.id > fb.id;
+
+-- Lesson ratings are derived from feedbacks, refresh them after the cleanup
+UPDATE lessons l
+LEFT JOIN (
+    SELECT lesson_id, ROUND(AVG(rating), 2) AS avg_rating, COUNT(*) AS cnt
+    FROM feedbacks
+    GROUP BY lesson_id
+) f ON f.lesson_id = l.id
+SET l.rating = COALESCE(f.avg_rating, 0),
+    l.review_count = COALESCE(f.cnt, 0);
+
+-- 2. Unique constraints
+ALTER TABLE student_progress
+ADD UNIQUE INDEX uq_student_progress_user_lesson (user_id, lesson_id);
+
+ALTER TABLE feedbacks
+ADD UNIQUE INDEX uq_feedbacks_user_lesson (user_id, lesson_id);
+
+-- 3. Composite indexes
+CREATE INDEX ix_quiz_attempts_user_quiz_score ON quiz_attempts (user_id, quiz_id, score);
+CREATE INDEX ix_quizzes_lesson_active ON quizzes (lesson_id, is_active);
+CREATE INDEX ix_lessons_published_grade_order ON lessons (is_published, grade, `order`);
+
+-- For PostgreSQL / SQLite (alternative, after the same duplicate cleanup)
+-- CREATE UNIQUE INDEX uq_student_progress_user_lesson ON student_progress (user_id, lesson_id);
+-- CREATE UNIQUE INDEX uq_feedbacks_user_lesson ON feedbacks (user_id, lesson_id);
+-- CREATE INDEX ix_quiz_attempts_user_quiz_score ON quiz_attempts (user_id, quiz_id, score);
+-- CREATE INDEX ix_quizzes_lesson_active ON quizzes (lesson_id, is_active);
+-- CREATE INDEX ix_lessons_published_grade_order ON lessons (is_published, grade, "order");
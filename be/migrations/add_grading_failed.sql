@@ -0,0 +1,13 @@
+-- Migration: Track quiz attempts the grading queue gave up on
+-- Pending attempts are swept up and queued again periodically; one that keeps
+-- failing is flagged instead of being retried forever.
+
+-- For MySQL
+ALTER TABLE quiz_attempts
+ADD COLUMN grading_failed BOOLEAN NOT NULL DEFAULT FALSE;
+CREATE INDEX ix_quiz_attempts_pending ON quiz_attempts (is_completed, submitted_at);
+
+-- For PostgreSQL / SQLite (alternative)
+-- ALTER TABLE quiz_attempts
+-- ADD COLUMN grading_failed BOOLEAN NOT NULL DEFAULT FALSE;
+-- CREATE INDEX ix_quiz_attempts_pending ON quiz_attempts (is_completed, submitted_at);
@@ -0,0 +1,68 @@
+"""
+Add lessons.rating_sum and initialize the lesson rating aggregates from feedbacks
+
+Safe to re-run: the column is only added when missing and the aggregates
+are recomputed from the feedbacks table each time.
+"""
+import sys
+import os
+
+# Add parent directory to path to import from be
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from core.config import settings
+
+def run_migration():
+    """Apply the add_lesson_rating_sum migration"""
+
+    engine = create_engine(settings.DATABASE_URL)
+
+    migration_sql = """
+    ALTER TABLE lessons
+    ADD COLUMN rating_sum FLOAT NOT NULL DEFAULT 0
+    COMMENT 'Running sum of feedback ratings';
+    """
+
+    backfill_sql = """
+    UPDATE lessons l
+    LEFT JOIN (
+        SELECT lesson_id, SUM(rating) AS rating_sum, COUNT(*) AS review_count
+        FROM feedbacks
+        GROUP BY lesson_id
+    ) f ON f.lesson_id = l.id
+    SET l.rating = COALESCE(ROUND(f.rating_sum / f.review_count, 2), 0),
+        l.rating_sum = COALESCE(f.rating_sum, 0),
+        l.review_count = COALESCE(f.review_count, 0);
+    """
+
+    try:
+        with engine.connect() as connection:
+            check_sql = """
+            SELECT COUNT(*) as count
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE()
+            AND TABLE_NAME = 'lessons'
+            AND COLUMN_NAME = 'rating_sum';
+            """
+            exists = connection.execute(text(check_sql)).fetchone()[0] > 0
+
+            if exists:
+                print("✓ Column 'rating_sum' already exists in lessons table")
+            else:
+                print("Applying migration: add rating_sum column...")
+                connection.execute(text(migration_sql))
+
+            print("Initializing lesson rating aggregates from feedbacks...")
+            result = connection.execute(text(backfill_sql))
+            connection.commit()
+            print(f"✓ Migration completed successfully! ({result.rowcount} lessons updated)")
+
+    except Exception as e:
+        print(f"✗ Migration failed: {e}")
+        sys.exit(1)
+    finally:
+        engine.dispose()
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,24 @@
+-- Migration: Add rating_sum column to lessons table
+-- Running sum of feedback ratings; rating and review_count are kept
+-- alongside it by deltas on every feedback write
+
+-- For MySQL
+ALTER TABLE lessons
+ADD COLUMN rating_sum FLOAT NOT NULL DEFAULT 0
+COMMENT 'Running sum of feedback ratings';
+
+-- Initialize the aggregates from existing feedbacks
+UPDATE lessons l
+LEFT JOIN (
+    SELECT lesson_id, SUM(rating) AS rating_sum, COUNT(*) AS review_count
+    FROM feedbacks
+    GROUP BY lesson_id
+) f ON f.lesson_id = l.id
+SET l.rating = COALESCE(ROUND(f.rating_sum / f.review_count, 2), 0),
+    l.rating_sum = COALESCE(f.rating_sum, 0),
+    l.review_count = COALESCE(f.review_count, 0);
+
+-- For PostgreSQL / SQLite (alternative)
+-- ALTER TABLE lessons
+-- ADD COLUMN rating_sum FLOAT NOT NULL DEFAULT 0;
+-- Then run: python jobs/reconcile_lesson_ratings.py --fix
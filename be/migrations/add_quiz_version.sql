@@ -0,0 +1,13 @@
+-- Migration: Add version column to quizzes table
+-- Bumped by every quiz edit; cached answer keys and student views are checked
+-- against it. updated_at is DATETIME(0) on MySQL, so two edits within one
+-- second could not be told apart.
+
+-- For MySQL
+ALTER TABLE quizzes
+ADD COLUMN version INT NOT NULL DEFAULT 1
+COMMENT 'Bumped on every edit';
+
+-- For PostgreSQL / SQLite (alternative)
+-- ALTER TABLE quizzes
+-- ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
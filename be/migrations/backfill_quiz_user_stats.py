@@ -0,0 +1,45 @@
+"""
+Create quiz_user_stats and build it from existing quiz_attempts
+
+Also rewrites StudentProgress.quiz_score / average_score from the rebuilt
+stats (best score and true mean of all graded attempts). Safe to re-run:
+the stats are recomputed from scratch each time.
+
+Usage: python migrations/backfill_quiz_user_stats.py [quiz_id]
+"""
+import sys
+import os
+
+# Add parent directory to path to import from be
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database import SessionLocal, engine
+from entities.geogebra import GeoGebraContent  # noqa: F401 - needed by the Lesson mapper
+from entities.quiz import QuizUserStats
+from services.quiz_stats import rebuild_quiz_user_stats
+
+
+def run_backfill():
+    """Build quiz_user_stats for every quiz, or only the one given on the command line"""
+    quiz_id = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    QuizUserStats.__table__.create(bind=engine, checkfirst=True)
+    print("✓ Table quiz_user_stats ready")
+
+    db = SessionLocal()
+    try:
+        scope = f"quiz {quiz_id}" if quiz_id is not None else "all quizzes"
+        print(f"Rebuilding quiz stats for {scope}...")
+        written = rebuild_quiz_user_stats(db, quiz_id=quiz_id)
+        db.commit()
+        print(f"✓ Backfill completed: {written} (user, quiz) rows")
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Backfill failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_backfill()
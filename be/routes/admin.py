@@ -1,28 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
 from core.database import get_db
 from middleware.auth import require_role
 from entities.user import UserRole
 from schemas.admin import (
-    StudentAdminResponse, StudentCreate, StudentUpdate,
-    LessonProgressAdminResponse, QuizAttemptAdminResponse,
+    StudentAdminResponse, StudentCreate, StudentUpdate, StudentBulkImportResponse, StudentFilters,
+    LessonProgressAdminResponse, QuizAttemptAdminResponse, ResultFilters, Page,
     FeedbackResponse, SettingsResponse, SettingsUpdate, PasswordChange
 )
+from schemas.dashboard import DashboardResponse
 from services.user_service import UserService
 from services.admin_service import AdminService
+from services.dashboard_service import DashboardService
+from services.export_service import CSV_MEDIA_TYPE, XLSX_MEDIA_TYPE, ExportService
+from utils.cache import get_cache_stats
+from utils.pagination import PageParams
+from utils.singleflight import get_single_flight_stats
+from services.progress_buffer import progress_buffer
+from services.grading_queue import grading_queue
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 # ---------------- STUDENT MANAGEMENT ----------------
-@router.get("/students", response_model=List[StudentAdminResponse])
-def get_students(db: Session = Depends(get_db), current_user=Depends(require_role([UserRole.ADMIN]))):
-    return UserService.get_all_students(db)
+@router.get("/students", response_model=Page[StudentAdminResponse])
+def get_students(filters: StudentFilters = Depends(), page: PageParams = Depends(), db: Session = Depends(get_db), current_user=Depends(require_role([UserRole.ADMIN]))):
+    """Students, newest first; sort: created_at, full_name, username, id"""
+    return UserService.get_all_students(db, filters, page)
 
 @router.post("/students", response_model=StudentAdminResponse, status_code=status.HTTP_201_CREATED)
 def create_student(student_data: StudentCreate, db: Session = Depends(get_db), current_user=Depends(require_role([UserRole.ADMIN]))):
     return UserService.create_student(db, student_data)
 
+@router.post("/students/bulk", response_model=StudentBulkImportResponse)
+async def bulk_create_students(request: Request, db: Session = Depends(get_db), current_user=Depends(require_role([UserRole.ADMIN]))):
+    """
+    Import many students from CSV or JSON
+
+    - CSV: `Content-Type: text/csv`, header row with username,email,full_name,password,grade,class_name
+    - JSON: an array of student objects, or {"students": [...]}
+    - multipart/form-data with a `file` field (.csv or .json) is also accepted
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing 'file' field")
+        content = await upload.read()
+        content_format = "json" if (upload.filename or "").lower().endswith(".json") else "csv"
+    else:
+        content = await request.body()
+        content_format = "csv" if "csv" in content_type else "json"
+
+    rows = UserService.parse_student_rows(content, content_format)
+    return await run_in_threadpool(UserService.bulk_create_students, db, rows)
+
 @router.put("/students/{student_id}", response_model=StudentAdminResponse)
 def update_student(student_id: int, student_data: StudentUpdate, db: Session = Depends(get_db), current_user=Depends(require_role([UserRole.ADMIN]))):
     return UserService.update_student(db, student_id, student_data)
@@ -32,19 +67,76 @@ def delete_student(student_id: int, db: Session = Depends(get_db), current_user=
     UserService.delete_student(db, student_id)
     return None
 
+# ---------------- DASHBOARD ----------------
+@router.get("/dashboard", response_model=DashboardResponse)
+def get_dashboard(
+    class_name: Optional[str] = Query(None, max_length=20),
+    lesson_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(require_role([UserRole.ADMIN, UserRole.TEACHER]))
+):
+    """Completion rates, average scores, time spent and at-risk counts per class and lesson (from the rollups)"""
+    return DashboardService.get_dashboard(db, class_name, lesson_id)
+
 # ---------------- ACADEMIC RESULTS ----------------
-@router.get("/results/lesson-progress", response_model=List[LessonProgressAdminResponse])
-def get_lesson_progress(db: Session = Depends(get_db), current_user=Depends(require_role([UserRole.ADMIN]))):
-    return AdminService.get_all_lesson_progress(db)
+@router.get("/results/lesson-progress", response_model=Page[LessonProgressAdminResponse])
+def get_lesson_progress(filters: ResultFilters = Depends(), page: PageParams = Depends(), db: Session = Depends(get_db), current_user=Depends(require_role([UserRole.ADMIN]))):
+    """
+    Lesson progress, most recently active first
+    Dates filter last access, scores filter the best quiz score.
+    Sort: last_updated, progress, quiz_score, time_spent, user_name
+    """
+    return AdminService.get_all_lesson_progress(db, filters, page)
 
-@router.get("/results/quiz-attempts", response_model=List[QuizAttemptAdminResponse])
-def get_quiz_attempts(db: Session = Depends(get_db), current_user=Depends(require_role([UserRole.ADMIN]))):
-    return AdminService.get_all_quiz_attempts(db)
+@router.get("/results/quiz-attempts", response_model=Page[QuizAttemptAdminResponse])
+def get_quiz_attempts(filters: ResultFilters = Depends(), page: PageParams = Depends(), db: Session = Depends(get_db), current_user=Depends(require_role([UserRole.ADMIN]))):
+    """
+    Completed quiz attempts, most recent first
+    Dates filter the submission time. Sort: submitted_at, score, time_spent, user_name
+    """
+    return AdminService.get_all_quiz_attempts(db, filters, page)
+
+def _export_response(name: str, filters: ResultFilters, export_format: str) -> StreamingResponse:
+    if export_format == "xlsx":
+        content, media_type = ExportService.stream_xlsx(name, filters), XLSX_MEDIA_TYPE
+    else:
+        content, media_type = ExportService.stream_csv(name, filters), CSV_MEDIA_TYPE
+    filename = ExportService.filename(name, export_format)
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/results/quiz-attempts/export")
+def export_quiz_attempts(
+    filters: ResultFilters = Depends(),
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    current_user=Depends(require_role([UserRole.ADMIN, UserRole.TEACHER]))
+):
+    """Stream the completed quiz attempts matching the list filters as CSV or XLSX"""
+    return _export_response("quiz-attempts", filters, format)
+
+@router.get("/results/lesson-progress/export")
+def export_lesson_progress(
+    filters: ResultFilters = Depends(),
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    current_user=Depends(require_role([UserRole.ADMIN, UserRole.TEACHER]))
+):
+    """Stream the lesson progress rows matching the list filters as CSV or XLSX"""
+    return _export_response("lesson-progress", filters, format)
 
 # ---------------- FEEDBACK MANAGEMENT ----------------
-@router.get("/feedback", response_model=List[FeedbackResponse])
-def get_feedback(db: Session = Depends(get_db), current_user=Depends(require_role([UserRole.ADMIN]))):
-    return AdminService.get_all_feedback(db)
+@router.get("/feedback", response_model=Page[FeedbackResponse])
+def get_feedback(
+    filters: ResultFilters = Depends(),
+    page: PageParams = Depends(),
+    rating: Optional[int] = Query(None, ge=1, le=5),
+    db: Session = Depends(get_db),
+    current_user=Depends(require_role([UserRole.ADMIN]))
+):
+    """Feedback, newest first; score filters do not apply. Sort: created_at, rating"""
+    return AdminService.get_all_feedback(db, filters, page, rating)
 
 @router.patch("/feedback/{feedback_id}/read", response_model=FeedbackResponse)
 def mark_feedback_read(feedback_id: int, db: Session = Depends(get_db), current_user=Depends(require_role([UserRole.ADMIN]))):
@@ -67,4 +159,15 @@ def update_settings(settings_data: SettingsUpdate, db: Session = Depends(get_db)
 @router.post("/settings/change-password")
 def change_admin_password(password_data: PasswordChange, db: Session = Depends(get_db), current_user=Depends(require_role([UserRole.ADMIN]))):
     AdminService.change_admin_password(db, current_user.id, password_data)
-    return {"message": "Password changed successfully"}
\ No newline at end of file
+    return {"message": "Password changed successfully"}
+
+# ---------------- DIAGNOSTICS ----------------
+@router.get("/cache-stats")
+def cache_stats(current_user=Depends(require_role([UserRole.ADMIN]))):
+    """Hit/miss counters of the in-process caches and request coalescing (per worker process)"""
+    return {
+        **get_cache_stats(),
+        "progress_buffer": progress_buffer.stats(),
+        "grading_queue": grading_queue.stats(),
+        "single_flight": get_single_flight_stats()
+    }
\ No newline at end of file
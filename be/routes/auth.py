@@ -3,12 +3,14 @@ Authentication routes - login, logout, register
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.database import get_async_db
 from schemas.user import UserCreate, UserLogin, LoginResponse, UserResponse
 from schemas.user_settings import UserSettingsUpdate, PasswordChange
-from services.auth_service import AuthService
+from services.auth_service import AuthService, UserPrincipal
 from middleware.auth import get_current_active_user
 from entities.user import User
 
@@ -18,7 +20,7 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Register a new user (student, teacher, or admin)
@@ -31,14 +33,14 @@ async def register(
     - **grade**: Grade level for students (6-9)
     - **class_name**: Class name for students (e.g., "8A")
     """
-    user = AuthService.register_user(db, user_data)
+    user = await AuthService.register_user(db, user_data)
     return user
 
 
 @router.post("/login", response_model=LoginResponse)
 async def login(
     credentials: UserLogin,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Login with username and password
@@ -48,13 +50,13 @@ async def login(
     - **username**: Username
     - **password**: Password
     """
-    return AuthService.login(db, credentials)
+    return await AuthService.login(db, credentials)
 
 
 @router.post("/login/form", response_model=LoginResponse)
 async def login_form(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Login with OAuth2 password flow (for compatibility with Swagger UI)
@@ -62,11 +64,11 @@ async def login_form(
     Returns JWT access token and user information
     """
     credentials = UserLogin(username=form_data.username, password=form_data.password)
-    return AuthService.login(db, credentials)
+    return await AuthService.login(db, credentials)
 
 
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_active_user)):
+async def logout(current_user: UserPrincipal = Depends(get_current_active_user)):
     """
     Logout current user
 
@@ -82,15 +84,18 @@ async def logout(current_user: User = Depends(get_current_active_user)):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
+async def get_current_user_info(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
+):
     """
     Get current authenticated user information
     """
-    return current_user
+    return await db.get(User, current_user.id)
 
 
 @router.get("/verify")
-async def verify_token(current_user: User = Depends(get_current_active_user)):
+async def verify_token(current_user: UserPrincipal = Depends(get_current_active_user)):
     """
     Verify if current token is valid
 
@@ -107,8 +112,8 @@ async def verify_token(current_user: User = Depends(get_current_active_user)):
 @router.put("/settings", response_model=UserResponse)
 async def update_settings(
     settings: UserSettingsUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """
     Update user settings/profile
@@ -118,34 +123,38 @@ async def update_settings(
     - **grade**: Update grade (students only)
     - **class_name**: Update class name (students only)
     """
-    from sqlalchemy.exc import IntegrityError
+    user = await db.get(User, current_user.id)
 
     try:
         # Update fields if provided
         if settings.full_name:
-            current_user.full_name = settings.full_name
+            user.full_name = settings.full_name
         if settings.email:
             # Check if email is already taken by another user
-            existing = db.query(User).filter(
-                User.email == settings.email,
-                User.id != current_user.id
-            ).first()
+            result = await db.execute(
+                select(User.id).where(
+                    User.email == settings.email,
+                    User.id != user.id
+                )
+            )
+            existing = result.first()
             if existing:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Email already taken"
                 )
-            current_user.email = settings.email
+            user.email = settings.email
         if settings.grade is not None:
-            current_user.grade = settings.grade
+            user.grade = settings.grade
         if settings.class_name is not None:
-            current_user.class_name = settings.class_name
+            user.class_name = settings.class_name
 
-        db.commit()
-        db.refresh(current_user)
-        return current_user
+        await db.commit()
+        await db.refresh(user)
+        AuthService.invalidate_principal(user.id)
+        return user
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already exists"
@@ -155,8 +164,8 @@ async def update_settings(
 @router.post("/change-password")
 async def change_password(
     password_data: PasswordChange,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """
     Change user password
@@ -164,8 +173,10 @@ async def change_password(
     - **current_password**: Current password for verification
     - **new_password**: New password
     """
+    user = await db.get(User, current_user.id)
+
     # Verify current password
-    if not AuthService.verify_password(password_data.current_password, current_user.hashed_password):
+    if not await AuthService.verify_password_async(password_data.current_password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Mật khẩu hiện tại không đúng"
@@ -179,7 +190,8 @@ async def change_password(
         )
 
     # Hash and update password
-    current_user.hashed_password = AuthService.get_password_hash(password_data.new_password)
-    db.commit()
+    user.hashed_password = await AuthService.get_password_hash_async(password_data.new_password)
+    await db.commit()
+    AuthService.invalidate_principal(user.id)
 
     return {"message": "Mật khẩu đã được thay đổi thành công"}
@@ -15,7 +15,7 @@ def create(data: GeoGebraCreate, db: Session = Depends(get_db), user=Depends(req
 
 @router.get("/lesson/{lesson_id}", response_model=List[GeoGebraResponse])
 def get_by_lesson(lesson_id: int, db: Session = Depends(get_db), user=Depends(get_current_active_user)):
-    return GeoGebraService.get_by_lesson(db, lesson_id)
+    return GeoGebraService.get_by_lesson_shared(db, lesson_id)
 
 @router.get("/{id}", response_model=GeoGebraResponse)
 def get_one(id: int, db: Session = Depends(get_db), user=Depends(get_current_active_user)):
@@ -2,14 +2,16 @@
 Lesson routes
 """
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from core.database import get_db
+from core.config import settings
+from core.database import get_async_db
 from schemas.lesson import LessonCreate, LessonUpdate, LessonResponse, LessonWithProgress
 from services.lesson_service import LessonService
+from services.progress_buffer import progress_buffer
 from middleware.auth import get_current_active_user, get_current_teacher_or_admin, get_current_student_user
-from entities.user import User
+from services.auth_service import UserPrincipal
 
 router = APIRouter(prefix="/lessons", tags=["Lessons"])
 
@@ -17,8 +19,8 @@ router = APIRouter(prefix="/lessons", tags=["Lessons"])
 @router.post("/", response_model=LessonResponse)
 async def create_lesson(
     lesson_data: LessonCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_teacher_or_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_teacher_or_admin)
 ):
     """
     Create a new lesson (Teacher/Admin only)
@@ -34,7 +36,7 @@ async def create_lesson(
     - **content**: Lesson content (HTML or Markdown)
     - **is_published**: Whether lesson is published
     """
-    return LessonService.create_lesson(db, lesson_data)
+    return await db.run_sync(LessonService.create_lesson, lesson_data)
 
 
 @router.get("/", response_model=List[LessonResponse])
@@ -43,8 +45,8 @@ async def get_lessons(
     limit: int = Query(100, ge=1, le=100),
     grade: Optional[int] = Query(None, ge=6, le=9),
     difficulty: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_teacher_or_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_teacher_or_admin)
 ):
     """
     Get all lessons with filters (Teacher/Admin only - includes unpublished)
@@ -54,8 +56,8 @@ async def get_lessons(
     - **grade**: Filter by grade (6-9)
     - **difficulty**: Filter by difficulty (easy, medium, hard)
     """
-    return LessonService.get_lessons(
-        db,
+    return await db.run_sync(
+        LessonService.get_lessons,
         skip=skip,
         limit=limit,
         grade=grade,
@@ -69,7 +71,7 @@ async def get_published_lessons(
     limit: int = Query(100, ge=1, le=100),
     grade: Optional[int] = Query(None, ge=6, le=9),
     difficulty: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get published lessons (Public access)
@@ -79,8 +81,8 @@ async def get_published_lessons(
     - **grade**: Filter by grade
     - **difficulty**: Filter by difficulty
     """
-    return LessonService.get_lessons(
-        db,
+    return await db.run_sync(
+        LessonService.get_lessons,
         skip=skip,
         limit=limit,
         grade=grade,
@@ -94,8 +96,8 @@ async def get_my_lessons(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     grade: Optional[int] = Query(None, ge=6, le=9),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_student_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_student_user)
 ):
     """
     Get lessons with progress for current student
@@ -106,8 +108,8 @@ async def get_my_lessons(
     - **limit**: Maximum number of records
     - **grade**: Filter by grade
     """
-    return LessonService.get_lessons_with_progress(
-        db,
+    return await db.run_sync(
+        LessonService.get_lessons_with_progress,
         user_id=current_user.id,
         skip=skip,
         limit=limit,
@@ -118,58 +120,58 @@ async def get_my_lessons(
 @router.get("/{lesson_id}", response_model=LessonResponse)
 async def get_lesson(
     lesson_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """
     Get lesson by ID
 
     - **lesson_id**: Lesson ID
     """
-    return LessonService.get_lesson(db, lesson_id)
+    return await LessonService.get_lesson_shared(db, lesson_id)
 
 
 @router.get("/slug/{slug}", response_model=LessonResponse)
 async def get_lesson_by_slug(
     slug: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """
     Get lesson by slug
 
     - **slug**: Lesson slug
     """
-    return LessonService.get_lesson_by_slug(db, slug)
+    return await db.run_sync(LessonService.get_lesson_by_slug, slug)
 
 
 @router.put("/{lesson_id}", response_model=LessonResponse)
 async def update_lesson(
     lesson_id: int,
     lesson_data: LessonUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_teacher_or_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_teacher_or_admin)
 ):
     """
     Update lesson (Teacher/Admin only)
 
     - **lesson_id**: Lesson ID
     """
-    return LessonService.update_lesson(db, lesson_id, lesson_data)
+    return await db.run_sync(LessonService.update_lesson, lesson_id, lesson_data)
 
 
 @router.delete("/{lesson_id}")
 async def delete_lesson(
     lesson_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_teacher_or_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_teacher_or_admin)
 ):
     """
     Delete lesson (Teacher/Admin only)
 
     - **lesson_id**: Lesson ID
     """
-    LessonService.delete_lesson(db, lesson_id)
+    await db.run_sync(LessonService.delete_lesson, lesson_id)
     return {"message": "Lesson deleted successfully"}
 
 
@@ -179,8 +181,8 @@ async def update_lesson_progress(
     progress_percentage: float = Query(..., ge=0, le=100),
     completed_sections: Optional[str] = Query(None),  # Comma-separated section IDs
     time_spent: Optional[int] = Query(None, ge=0),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_student_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_student_user)
 ):
     """
     Update student progress for a lesson
@@ -198,8 +200,20 @@ async def update_lesson_progress(
         except ValueError:
             pass  # Ignore invalid format
 
-    progress = LessonService.update_lesson_progress(
-        db,
+    if settings.PROGRESS_BUFFER_ENABLED:
+        # Buffered: merged in memory and persisted by the next batched flush
+        pending = progress_buffer.record(
+            user_id=current_user.id,
+            lesson_id=lesson_id,
+            progress_percentage=progress_percentage,
+            completed_sections=sections_list,
+            time_spent=time_spent
+        )
+        progress = await db.run_sync(LessonService.merge_stored_progress, pending)
+        return {"message": "Progress updated successfully", **progress}
+
+    progress = await db.run_sync(
+        LessonService.update_lesson_progress,
         user_id=current_user.id,
         lesson_id=lesson_id,
         progress_percentage=progress_percentage,
@@ -1,19 +1,26 @@
 """
 Quiz routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import List
 
+from core.config import settings
 from core.database import get_db
 from entities.user import UserRole
 from middleware.auth import get_current_user, require_role
 from schemas.user import UserResponse
 from schemas.quiz import (
     QuizCreate, QuizUpdate, QuizResponse, QuizStudentResponse,
-    QuizSubmitRequest, QuizSubmitResponse, QuizAttemptResponse
+    QuizSubmitRequest, QuizSubmitResponse, QuizSubmissionStatus, QuizAttemptResponse,
+    QuizUserStatsResponse, RegradeJobResponse
 )
 from services.quiz_service import QuizService
+from services.grading_queue import grading_queue
+from services.regrade_service import RegradeService
+from services.quiz_analytics import QuizAnalyticsService
+from schemas.quiz_analytics import QuizAnalyticsResponse
 
 router = APIRouter(prefix="/quizzes", tags=["quizzes"])
 
@@ -96,6 +103,69 @@ def delete_quiz(
     return None
 
 
+@router.post("/{quiz_id}/regrade", response_model=RegradeJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def regrade_quiz(
+    quiz_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(require_role([UserRole.ADMIN, UserRole.TEACHER]))
+):
+    """Rescore all attempts against the current answer key in the background (Admin/Teacher only)"""
+    if not QuizService.get_quiz_by_id(db, quiz_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quiz not found"
+        )
+    return RegradeService.start_regrade(quiz_id)
+
+
+@router.get("/regrade-jobs/{job_id}", response_model=RegradeJobResponse)
+def get_regrade_job(
+    job_id: str,
+    current_user: UserResponse = Depends(require_role([UserRole.ADMIN, UserRole.TEACHER]))
+):
+    """Get progress of a regrade job (Admin/Teacher only)"""
+    job = RegradeService.get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Regrade job not found"
+        )
+    return job
+
+
+@router.get("/{quiz_id}/analytics", response_model=QuizAnalyticsResponse)
+def get_quiz_analytics(
+    quiz_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(require_role([UserRole.ADMIN, UserRole.TEACHER]))
+):
+    """Item analysis: difficulty, discrimination, distractors and score distribution (Admin/Teacher only)"""
+    quiz = QuizService.get_quiz_by_id(db, quiz_id)
+    if not quiz:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quiz not found"
+        )
+    return QuizAnalyticsService.get_analytics(db, quiz)
+
+
+@router.post("/{quiz_id}/analytics/recompute", response_model=QuizAnalyticsResponse)
+def recompute_quiz_analytics(
+    quiz_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(require_role([UserRole.ADMIN, UserRole.TEACHER]))
+):
+    """Rebuild the analytics counters from all attempts (Admin/Teacher only)"""
+    quiz = QuizService.get_quiz_by_id(db, quiz_id)
+    if not quiz:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quiz not found"
+        )
+    QuizAnalyticsService.recompute(db, QuizService.get_answer_key(db, quiz))
+    return QuizAnalyticsService.get_analytics(db, quiz)
+
+
 # Student endpoints
 @router.get("/lesson/{lesson_id}/quiz", response_model=QuizStudentResponse)
 def get_lesson_quiz(
@@ -104,26 +174,40 @@ def get_lesson_quiz(
     current_user: UserResponse = Depends(get_current_user)
 ):
     """Get active quiz for a lesson (Student)"""
-    quiz = QuizService.get_quiz_by_lesson(db, lesson_id)
-    if not quiz:
+    # Pre-serialized view of the quiz version, permuted per student if shuffling is enabled
+    view = QuizService.get_student_view_for_lesson(db, lesson_id)
+    if not view:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No active quiz found for this lesson"
         )
 
-    # Get quiz with shuffled questions if enabled
-    quiz = QuizService.get_quiz_for_student(db, quiz.id, shuffle=quiz.shuffle_questions)
-    return quiz
+    return Response(
+        content=QuizService.render_student_quiz(view, current_user.id),
+        media_type="application/json"
+    )
 
 
-@router.post("/{quiz_id}/submit", response_model=QuizSubmitResponse)
+@router.post(
+    "/{quiz_id}/submit",
+    response_model=QuizSubmitResponse,
+    responses={status.HTTP_202_ACCEPTED: {"model": QuizSubmissionStatus}}
+)
 def submit_quiz(
     quiz_id: int,
     submit_data: QuizSubmitRequest,
     db: Session = Depends(get_db),
     current_user: UserResponse = Depends(get_current_user)
 ):
-    """Submit quiz answers and get results (Student)"""
+    """
+    Submit quiz answers and get results (Student)
+
+    In queued mode (GRADING_QUEUE_ENABLED) the answers are stored and a 202 with
+    the attempt id is returned; poll /quizzes/attempts/{attempt_id}/result.
+    """
+    if settings.GRADING_QUEUE_ENABLED:
+        return _submit_queued(db, current_user.id, quiz_id, submit_data)
+
     try:
         attempt, passed, correct_answers = QuizService.submit_quiz(
             db, current_user.id, quiz_id, submit_data
@@ -146,6 +230,55 @@ def submit_quiz(
         )
 
 
+def _submit_queued(db: Session, user_id: int, quiz_id: int, submit_data: QuizSubmitRequest):
+    try:
+        attempt = QuizService.create_pending_attempt(db, user_id, quiz_id, submit_data)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+    if grading_queue.submit(attempt.id):
+        submission = QuizSubmissionStatus(attempt_id=attempt.id, status="queued")
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=submission.model_dump(mode="json")
+        )
+
+    # Queue full or not running: grade inline so the submission is never lost
+    QuizService.grade_pending_attempts(db, [attempt.id])
+    attempt, passed, correct_answers = QuizService.get_submission_result(db, attempt.id, user_id)
+    return QuizSubmitResponse(attempt=attempt, passed=passed, correct_answers=correct_answers)
+
+
+@router.get("/attempts/{attempt_id}/result", response_model=QuizSubmissionStatus)
+def get_attempt_result(
+    attempt_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Poll the grading result of a submitted attempt"""
+    result = QuizService.get_submission_result(db, attempt_id, current_user.id)
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Attempt not found"
+        )
+
+    attempt, passed, correct_answers = result
+    if not attempt.is_completed:
+        return QuizSubmissionStatus(
+            attempt_id=attempt.id,
+            status="failed" if attempt.grading_failed else "queued"
+        )
+    return QuizSubmissionStatus(
+        attempt_id=attempt.id,
+        status="graded",
+        result=QuizSubmitResponse(attempt=attempt, passed=passed, correct_answers=correct_answers)
+    )
+
+
 @router.get("/attempts/my-attempts", response_model=List[QuizAttemptResponse])
 def get_my_attempts(
     quiz_id: int = None,
@@ -187,3 +320,19 @@ def get_best_attempt(
             detail="No attempts found for this quiz"
         )
     return attempt
+
+
+@router.get("/{quiz_id}/my-stats", response_model=QuizUserStatsResponse)
+def get_my_stats(
+    quiz_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Get attempt count, best, average and last score for a quiz"""
+    stats = QuizService.get_user_stats(db, current_user.id, quiz_id)
+    if not stats:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No attempts found for this quiz"
+        )
+    return stats
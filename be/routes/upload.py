@@ -1,16 +1,24 @@
 """
 File upload routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from typing import Optional
-import os
-import uuid
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+import re
 from pathlib import Path
-import shutil
 
+from core.config import settings
+from core.database import get_async_db
 from entities.user import UserRole
 from middleware.auth import require_role
+from schemas.upload import UploadSessionCreate, UploadSessionResponse
 from schemas.user import UserResponse
+from services import image_variants
+from services.file_store import FileStoreService
+from utils import upload_sessions
+from utils.static_files import IMMUTABLE_CACHE_CONTROL
+from utils.upload_stream import StreamedUpload, receive_file
 
 router = APIRouter(prefix="/upload", tags=["upload"])
 
@@ -31,141 +39,263 @@ ALLOWED_VIDEO_EXTENSIONS = {".mp4", ".webm", ".mov", ".avi"}
 MAX_IMAGE_SIZE = 5 * 1024 * 1024  # 5MB
 MAX_VIDEO_SIZE = 100 * 1024 * 1024  # 100MB
 
-
-def get_file_extension(filename: str) -> str:
-    """Get file extension from filename"""
-    return Path(filename).suffix.lower()
-
-
-def generate_unique_filename(original_filename: str) -> str:
-    """Generate unique filename using UUID"""
-    ext = get_file_extension(original_filename)
-    return f"{uuid.uuid4()}{ext}"
+VARIANT_NAME = re.compile(r"^(\d+)\.(webp|jpg)$")
+FINALIZE_WAIT_SECONDS = 10  # How long finalize waits for chunks still being written
+
+
+# The body is parsed by receive_file, so the form field is documented here
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}}
+                }
+            }
+        }
+    }
+}
 
 
-@router.post("/image")
+@router.post("/image", openapi_extra=UPLOAD_REQUEST_BODY)
 async def upload_image(
-    file: UploadFile = File(...),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserResponse = Depends(require_role([UserRole.ADMIN, UserRole.TEACHER]))
 ):
     """
     Upload an image file (Admin/Teacher only)
-    Returns the URL to access the uploaded image
+    Files are stored by content hash: re-uploading an image returns the
+    existing file's URL. Resized WebP/JPEG variants are generated in the
+    background
+    Returns the URL to access the uploaded image, plus srcset strings for
+    its variants (JPEG, PNG and WebP uploads only)
     """
-    # Check file extension
-    ext = get_file_extension(file.filename)
-    if ext not in ALLOWED_IMAGE_EXTENSIONS:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid file type. Allowed: {', '.join(ALLOWED_IMAGE_EXTENSIONS)}"
-        )
-
-    # Check file size
-    file.file.seek(0, 2)  # Seek to end
-    file_size = file.file.tell()
-    file.file.seek(0)  # Reset to beginning
-
-    if file_size > MAX_IMAGE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Max size: {MAX_IMAGE_SIZE / 1024 / 1024}MB"
-        )
-
-    # Generate unique filename
-    unique_filename = generate_unique_filename(file.filename)
-    file_path = IMAGES_DIR / unique_filename
-
-    try:
-        # Save file
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        # Return URL (adjust based on your server configuration)
-        file_url = f"/uploads/images/{unique_filename}"
-
-        return {
-            "success": True,
-            "filename": unique_filename,
-            "url": file_url,
-            "size": file_size
-        }
-
-    except Exception as e:
-        # Clean up file if something went wrong
-        if file_path.exists():
-            file_path.unlink()
+    async with receive_file(request, IMAGES_DIR, ALLOWED_IMAGE_EXTENSIONS, MAX_IMAGE_SIZE) as upload:
+        stored = await db.run_sync(FileStoreService.store, upload, IMAGES_DIR)
+    response = {
+        "success": True,
+        "filename": stored.filename,
+        "url": f"/uploads/images/{stored.filename}",
+        "size": upload.size,
+        "sha256": upload.sha256
+    }
+    if image_variants.has_variants(stored.filename):
+        if stored.created:
+            image_variants.schedule_variants(IMAGES_DIR / stored.filename)
+        response["variants"] = image_variants.variant_metadata(f"/api/upload/images/{stored.filename}")
+    return response
+
+
+@router.get("/images/{filename}/w/{variant}")
+async def get_image_variant(filename: str, variant: str):
+    """
+    Serve a resized copy of an uploaded image, e.g. /images/<filename>/w/640.webp
+    Widths are those of IMAGE_VARIANT_WIDTHS; missing variants (images
+    uploaded before variants existed) are generated on the first request
+    """
+    match = VARIANT_NAME.match(variant)
+    source = IMAGES_DIR / filename
+    if (
+        not match
+        or int(match.group(1)) not in image_variants.VARIANT_WIDTHS
+        or Path(filename).name != filename
+        or not image_variants.has_variants(filename)
+        or not source.is_file()
+    ):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error uploading file: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image variant not found"
         )
 
-
-@router.post("/video")
+    width, variant_format = int(match.group(1)), match.group(2)
+    path = image_variants.variant_path(source, width, variant_format)
+    if not path.is_file():
+        try:
+            await image_variants.ensure_variants(source)
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail="Image could not be resized"
+            )
+
+    return FileResponse(
+        path,
+        media_type=image_variants.VARIANT_FORMATS[variant_format],
+        headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    )
+
+
+@router.post("/video", openapi_extra=UPLOAD_REQUEST_BODY)
 async def upload_video(
-    file: UploadFile = File(...),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserResponse = Depends(require_role([UserRole.ADMIN, UserRole.TEACHER]))
 ):
     """
     Upload a video file (Admin/Teacher only)
+    The file is streamed to disk while it arrives; uploads over the limit get 413.
+    Files are stored by content hash like images
     Returns the URL to access the uploaded video
     """
-    # Check file extension
-    ext = get_file_extension(file.filename)
-    if ext not in ALLOWED_VIDEO_EXTENSIONS:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid file type. Allowed: {', '.join(ALLOWED_VIDEO_EXTENSIONS)}"
-        )
+    async with receive_file(request, VIDEOS_DIR, ALLOWED_VIDEO_EXTENSIONS, MAX_VIDEO_SIZE) as upload:
+        stored = await db.run_sync(FileStoreService.store, upload, VIDEOS_DIR)
+    return {
+        "success": True,
+        "filename": stored.filename,
+        "url": f"/uploads/videos/{stored.filename}",
+        "size": upload.size,
+        "sha256": upload.sha256
+    }
+
+
+def _session_response(session: upload_sessions.UploadSession, offset: int) -> UploadSessionResponse:
+    return UploadSessionResponse(
+        upload_id=session.id,
+        url=f"/api/upload/video/sessions/{session.id}",
+        size=session.size,
+        offset=offset,
+        chunk_size=settings.UPLOAD_CHUNK_SIZE
+    )
+
+
+@router.post("/video/sessions", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_video_upload(
+    data: UploadSessionCreate,
+    current_user: UserResponse = Depends(require_role([UserRole.ADMIN, UserRole.TEACHER]))
+):
+    """
+    Start a resumable video upload (Admin/Teacher only)
 
-    # Check file size
-    file.file.seek(0, 2)
-    file_size = file.file.tell()
-    file.file.seek(0)
+    1. POST here with the file name and size
+    2. PATCH chunks to the session URL with an Upload-Offset header, in any
+       order and in parallel
+    3. After an interruption, HEAD the session URL: Upload-Offset is the
+       contiguous prefix received, Upload-Ranges lists every range received
+    4. POST to <session URL>/finalize once every byte has arrived
 
-    if file_size > MAX_VIDEO_SIZE:
+    Unfinished sessions are deleted after UPLOAD_SESSION_TTL_HOURS
+    """
+    if Path(data.filename).suffix.lower() not in ALLOWED_VIDEO_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Max size: {MAX_VIDEO_SIZE / 1024 / 1024}MB"
+            detail=f"Invalid file type. Allowed: {', '.join(sorted(ALLOWED_VIDEO_EXTENSIONS))}"
+        )
+    if data.size > MAX_VIDEO_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"File too large. Max size: {MAX_VIDEO_SIZE / 1024 / 1024:g}MB"
         )
 
-    # Generate unique filename
-    unique_filename = generate_unique_filename(file.filename)
-    file_path = VIDEOS_DIR / unique_filename
+    await run_in_threadpool(
+        upload_sessions.purge_expired_sessions, VIDEOS_DIR, settings.UPLOAD_SESSION_TTL_HOURS * 3600
+    )
+    session = await run_in_threadpool(
+        upload_sessions.create_session, VIDEOS_DIR, current_user.id, Path(data.filename).name, data.size
+    )
+    return _session_response(session, 0)
 
-    try:
-        # Save file
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
 
-        # Return URL
-        file_url = f"/uploads/videos/{unique_filename}"
+@router.head("/video/sessions/{upload_id}")
+async def get_video_upload_offset(
+    upload_id: str,
+    current_user: UserResponse = Depends(require_role([UserRole.ADMIN, UserRole.TEACHER]))
+):
+    """Report how much of a resumable upload has been received"""
+    session = upload_sessions.load_session(VIDEOS_DIR, upload_id, current_user.id)
+    ranges = await run_in_threadpool(upload_sessions.received_ranges, session)
+    return Response(headers={
+        "Upload-Offset": str(upload_sessions.received_offset(ranges)),
+        "Upload-Length": str(session.size),
+        "Upload-Ranges": upload_sessions.format_ranges(ranges),
+        "Cache-Control": "no-store"
+    })
+
+
+@router.patch("/video/sessions/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def upload_video_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+    current_user: UserResponse = Depends(require_role([UserRole.ADMIN, UserRole.TEACHER]))
+):
+    """
+    Write the request body (raw bytes) at Upload-Offset
+    The response's Upload-Offset is the offset after this chunk
+    """
+    session = upload_sessions.load_session(VIDEOS_DIR, upload_id, current_user.id)
+    end = await upload_sessions.write_chunk(session, request, upload_offset)
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers={"Upload-Offset": str(end)})
 
-        return {
-            "success": True,
-            "filename": unique_filename,
-            "url": file_url,
-            "size": file_size
-        }
 
-    except Exception as e:
-        # Clean up file if something went wrong
-        if file_path.exists():
-            file_path.unlink()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error uploading file: {str(e)}"
+@router.post("/video/sessions/{upload_id}/finalize")
+async def finalize_video_upload(
+    upload_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(require_role([UserRole.ADMIN, UserRole.TEACHER]))
+):
+    """
+    Complete a resumable upload once every byte has been received
+    Returns the same result as POST /video
+    """
+    session = upload_sessions.load_session(VIDEOS_DIR, upload_id, current_user.id)
+    await run_in_threadpool(upload_sessions.begin_finalize, session)
+    try:
+        if not await upload_sessions.wait_for_writers(session, FINALIZE_WAIT_SECONDS):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Chunks are still being uploaded"
+            )
+        ranges = await run_in_threadpool(upload_sessions.received_ranges, session)
+        if ranges != [(0, session.size)]:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload incomplete: received {upload_sessions.format_ranges(ranges) or 'nothing'} of {session.size} bytes"
+            )
+        sha256 = await run_in_threadpool(upload_sessions.hash_file, session.data_path)
+        upload = StreamedUpload(
+            path=session.data_path, original_filename=session.filename, size=session.size, sha256=sha256
         )
+        stored = await db.run_sync(FileStoreService.store, upload, VIDEOS_DIR)
+    except Exception:
+        await run_in_threadpool(upload_sessions.abort_finalize, session)
+        raise
+
+    await run_in_threadpool(upload_sessions.remove_session, session)
+    return {
+        "success": True,
+        "filename": stored.filename,
+        "url": f"/uploads/videos/{stored.filename}",
+        "size": session.size,
+        "sha256": sha256
+    }
+
+
+@router.delete("/video/sessions/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_video_upload(
+    upload_id: str,
+    current_user: UserResponse = Depends(require_role([UserRole.ADMIN, UserRole.TEACHER]))
+):
+    """Abandon a resumable upload and delete what was received"""
+    session = upload_sessions.load_session(VIDEOS_DIR, upload_id, current_user.id)
+    await run_in_threadpool(upload_sessions.remove_session, session)
 
 
 @router.delete("/{file_type}/{filename}")
 async def delete_file(
     file_type: str,
     filename: str,
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserResponse = Depends(require_role([UserRole.ADMIN, UserRole.TEACHER]))
 ):
     """
     Delete an uploaded file (Admin/Teacher only)
     file_type: 'images' or 'videos'
+    Removes one reference to the file; the file itself is deleted once no
+    other upload refers to it
     """
     if file_type not in ['images', 'videos']:
         raise HTTPException(
@@ -173,20 +303,14 @@ async def delete_file(
             detail="Invalid file type. Must be 'images' or 'videos'"
         )
 
-    file_path = UPLOAD_DIR / file_type / filename
-
-    if not file_path.exists():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="File not found"
-        )
-
     try:
-        file_path.unlink()
+        deleted = await db.run_sync(FileStoreService.release, UPLOAD_DIR / file_type, filename)
         return {
             "success": True,
-            "message": "File deleted successfully"
+            "message": "File deleted successfully" if deleted else "Reference removed; file is still in use"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,7 +1,53 @@
+from fastapi import Query
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Generic, Optional, List, TypeVar
 from datetime import datetime
 
+T = TypeVar("T")
+
+# Pagination
+class Page(BaseModel, Generic[T]):
+    """One page of a keyset-paginated list"""
+    items: List[T]
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to get the next page; None on the last page
+    total: Optional[int] = None  # Only filled with ?include_total=true
+
+class ResultFilters:
+    """Filters shared by the admin result lists (use as a dependency)"""
+
+    def __init__(
+        self,
+        class_name: Optional[str] = Query(None, max_length=20),
+        grade: Optional[int] = Query(None, ge=1, le=12),
+        lesson_id: Optional[int] = None,
+        date_from: Optional[datetime] = Query(None, description="Inclusive lower bound of the row date"),
+        date_to: Optional[datetime] = Query(None, description="Exclusive upper bound of the row date"),
+        score_min: Optional[float] = Query(None, ge=0, le=100),
+        score_max: Optional[float] = Query(None, ge=0, le=100)
+    ):
+        self.class_name = class_name
+        self.grade = grade
+        self.lesson_id = lesson_id
+        self.date_from = date_from
+        self.date_to = date_to
+        self.score_min = score_min
+        self.score_max = score_max
+
+class StudentFilters:
+    """Filters of the admin student list (use as a dependency)"""
+
+    def __init__(
+        self,
+        class_name: Optional[str] = Query(None, max_length=20),
+        grade: Optional[int] = Query(None, ge=1, le=12),
+        is_active: Optional[bool] = None,
+        search: Optional[str] = Query(None, min_length=1, max_length=100, description="Prefix of username or full name")
+    ):
+        self.class_name = class_name
+        self.grade = grade
+        self.is_active = is_active
+        self.search = search
+
 # Student
 class StudentAdminResponse(BaseModel):
     id: int
@@ -23,6 +69,19 @@ class StudentCreate(BaseModel):
     grade: Optional[int]
     class_name: Optional[str]
 
+class StudentBulkError(BaseModel):
+    row: int  # 1-based data row (CSV header excluded)
+    username: Optional[str] = None
+    detail: str
+
+class StudentBulkImportResponse(BaseModel):
+    total_rows: int
+    created: int
+    failed: int
+    errors: List[StudentBulkError]
+    elapsed_seconds: float
+    rows_per_second: float
+
 class StudentUpdate(BaseModel):
     email: Optional[EmailStr]
     full_name: Optional[str]
@@ -34,7 +93,9 @@ class StudentUpdate(BaseModel):
 class LessonProgressAdminResponse(BaseModel):
     id: int
     user_name: str
+    class_name: Optional[str] = None
     lesson_title: str
+    quiz_score: Optional[float] = None
     progress: float
     time_spent: int
     last_updated: datetime
@@ -42,6 +103,7 @@ class LessonProgressAdminResponse(BaseModel):
 class QuizAttemptAdminResponse(BaseModel):
     id: int
     user_name: str
+    class_name: Optional[str] = None
     lesson_title: str
     score: float
     time_spent: int
@@ -0,0 +1,45 @@
+"""
+Admin dashboard schemas
+"""
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+
+class DashboardMetrics(BaseModel):
+    """
+    Progress figures of a group of (student, lesson) pairs
+    started counts pairs with a progress row, so a class total over several
+    lessons counts each student once per lesson.
+    """
+    started: int = 0
+    completed: int = 0
+    completion_rate: float = 0.0  # Percentage of started
+    average_progress: float = 0.0
+    average_time_spent: float = 0.0  # seconds
+    scored: int = 0  # Pairs with a quiz score
+    average_score: Optional[float] = None  # Mean best quiz score
+    at_risk: int = 0  # Best quiz score below the at-risk threshold
+
+
+class ClassDashboard(DashboardMetrics):
+    class_name: str  # "" for students without a class
+
+
+class LessonDashboard(DashboardMetrics):
+    lesson_id: int
+    lesson_title: Optional[str] = None
+
+
+class ClassLessonDashboard(DashboardMetrics):
+    class_name: str
+    lesson_id: int
+
+
+class DashboardResponse(BaseModel):
+    overall: DashboardMetrics
+    classes: List[ClassDashboard]
+    lessons: List[LessonDashboard]
+    class_lessons: List[ClassLessonDashboard]
+    at_risk_score: float  # Threshold used for at_risk
+    updated_at: Optional[datetime] = None  # Most recent rollup change
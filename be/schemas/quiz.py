@@ -14,7 +14,7 @@ class QuizAnswerBase(BaseModel):
 
 
 class QuizAnswerCreate(QuizAnswerBase):
-    pass
+    id: Optional[int] = None  # Existing answer id when updating a quiz
 
 
 class QuizAnswerResponse(QuizAnswerBase):
@@ -46,6 +46,7 @@ class QuizQuestionBase(BaseModel):
 
 
 class QuizQuestionCreate(QuizQuestionBase):
+    id: Optional[int] = None  # Existing question id when updating a quiz
     answers: List[QuizAnswerCreate] = []
 
 
@@ -148,6 +149,37 @@ class QuizAttemptResponse(BaseModel):
         from_attributes = True
 
 
+class QuizUserStatsResponse(BaseModel):
+    user_id: int
+    quiz_id: int
+    attempt_count: int
+    best_score: Optional[float] = None
+    best_attempt_id: Optional[int] = None
+    average_score: float
+    last_score: Optional[float] = None
+    last_attempt_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class RegradeJobResponse(BaseModel):
+    id: str
+    quiz_id: int
+    status: str  # queued, running, completed, failed
+    total: int
+    processed: int
+    updated: int  # Attempts whose score changed
+    progress: float  # Percentage of attempts processed
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 class QuizSubmitRequest(BaseModel):
     answers: Dict[int, Any]  # {question_id: answer_id or answer_text}
     time_spent: int  # in seconds
@@ -160,3 +192,10 @@ class QuizSubmitResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class QuizSubmissionStatus(BaseModel):
+    """Queued submission: returned with 202 and by the result polling endpoint"""
+    attempt_id: int
+    status: str  # "queued", "graded" or "failed"
+    result: Optional[QuizSubmitResponse] = None  # Set once graded
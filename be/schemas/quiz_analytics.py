@@ -0,0 +1,44 @@
+"""
+Quiz analytics schemas
+"""
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class OptionAnalytics(BaseModel):
+    """How often one answer option was chosen"""
+    answer_id: int
+    answer_text: str
+    is_correct: bool
+    count: int
+    frequency: float  # Share of all attempts
+
+
+class QuestionAnalytics(BaseModel):
+    """Item statistics of one question"""
+    question_id: int
+    question_text: str
+    question_type: str
+    response_count: int
+    skipped_count: int
+    correct_count: int
+    p_value: Optional[float] = None  # Difficulty: share of attempts answering correctly
+    discrimination: Optional[float] = None  # Point-biserial correlation with the total score
+    options: List[OptionAnalytics] = []
+
+
+class ScoreBucket(BaseModel):
+    """Attempts scoring in [range_start, range_end)"""
+    range_start: int
+    range_end: int
+    count: int
+
+
+class QuizAnalyticsResponse(BaseModel):
+    """Item analysis of a quiz"""
+    quiz_id: int
+    attempt_count: int
+    average_score: float
+    score_stddev: float
+    score_distribution: List[ScoreBucket]
+    questions: List[QuestionAnalytics]
@@ -0,0 +1,19 @@
+"""
+Upload Pydantic schemas
+"""
+from pydantic import BaseModel, Field
+
+
+class UploadSessionCreate(BaseModel):
+    """Schema for starting a resumable upload"""
+    filename: str = Field(..., min_length=1, max_length=255)
+    size: int = Field(..., gt=0, description="Total file size in bytes")
+
+
+class UploadSessionResponse(BaseModel):
+    """Schema for a resumable upload session"""
+    upload_id: str
+    url: str  # Session URL for HEAD, PATCH and DELETE
+    size: int
+    offset: int  # Bytes received from the start of the file
+    chunk_size: int  # Suggested bytes per PATCH request
@@ -87,6 +87,7 @@ def create_lessons(db: Session):
             difficulty=LessonDifficulty.MEDIUM,
             rating=4.8,
             review_count=124,
+            rating_sum=595.2,
             is_published=True,
             order=1,
             thumbnail="https://via.placeholder.com/400x225/4A90E2/FFFFFF?text=Phuong+trinh+bac+nhat",
@@ -101,6 +102,7 @@ def create_lessons(db: Session):
             difficulty=LessonDifficulty.MEDIUM,
             rating=4.5,
             review_count=89,
+            rating_sum=400.5,
             is_published=True,
             order=2,
             thumbnail="https://via.placeholder.com/400x225/10B981/FFFFFF?text=Bat+phuong+trinh",
@@ -115,6 +117,7 @@ def create_lessons(db: Session):
             difficulty=LessonDifficulty.HARD,
             rating=4.9,
             review_count=156,
+            rating_sum=764.4,
             is_published=True,
             order=3,
             thumbnail="https://via.placeholder.com/400x225/F59E0B/FFFFFF?text=He+phuong+trinh",
@@ -129,6 +132,7 @@ def create_lessons(db: Session):
             difficulty=LessonDifficulty.MEDIUM,
             rating=4.6,
             review_count=98,
+            rating_sum=450.8,
             is_published=True,
             order=4,
             thumbnail="https://via.placeholder.com/400x225/4A90E2/FFFFFF?text=Ham+so+bac+nhat",
@@ -143,6 +147,7 @@ def create_lessons(db: Session):
             difficulty=LessonDifficulty.EASY,
             rating=4.7,
             review_count=112,
+            rating_sum=526.4,
             is_published=True,
             order=5,
             thumbnail="https://via.placeholder.com/400x225/10B981/FFFFFF?text=Duong+thang+song+song",
@@ -157,6 +162,7 @@ def create_lessons(db: Session):
             difficulty=LessonDifficulty.MEDIUM,
             rating=4.4,
             review_count=76,
+            rating_sum=334.4,
             is_published=True,
             order=6,
             thumbnail="https://via.placeholder.com/400x225/F59E0B/FFFFFF?text=Tam+giac+dong+dang",
@@ -1,71 +1,153 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import join
+from sqlalchemy import func
+from typing import Any, Dict, Optional
 from entities.student_progress import StudentProgress
 from entities.quiz import QuizAttempt, Quiz
 from entities.lesson import Lesson
 from entities.feedback import Feedback
 from entities.user import User
-from schemas.admin import SettingsUpdate, PasswordChange
+from schemas.admin import SettingsUpdate, PasswordChange, ResultFilters
 from utils.security import verify_password, get_password_hash
+from services.auth_service import AuthService
+from services.feedback_service import FeedbackService
+from utils.pagination import PageParams, keyset_page
 from fastapi import HTTPException, status
 
+
+def _row_item(row) -> Dict[str, Any]:
+    """Response item of a column-only result row (drops the pagination keys)"""
+    item = dict(row._mapping)
+    item.pop("page_sort_key", None)
+    item.pop("page_row_id", None)
+    return item
+
+
 class AdminService:
+    # Sort names accepted by the result lists -> column expressions
+    LESSON_PROGRESS_SORTS = {
+        "last_updated": StudentProgress.last_accessed,
+        "progress": StudentProgress.progress_percentage,
+        "quiz_score": func.coalesce(StudentProgress.quiz_score, -1.0),
+        "time_spent": StudentProgress.time_spent,
+        "user_name": User.full_name,
+    }
+    QUIZ_ATTEMPT_SORTS = {
+        "submitted_at": QuizAttempt.submitted_at,
+        "score": QuizAttempt.score,
+        "time_spent": QuizAttempt.time_spent,
+        "user_name": User.full_name,
+    }
+    FEEDBACK_SORTS = {
+        "created_at": Feedback.created_at,
+        "rating": Feedback.rating,
+    }
+
     @staticmethod
-    def get_all_lesson_progress(db: Session):
-        progress_list = db.query(StudentProgress, User.full_name, Lesson.title).join(User, StudentProgress.user_id == User.id).join(Lesson, StudentProgress.lesson_id == Lesson.id).all()
-        return [
-            {
-                "id": p.StudentProgress.id,
-                "user_name": p.full_name,
-                "lesson_title": p.title,
-                "progress": p.StudentProgress.progress_percentage,
-                "time_spent": p.StudentProgress.time_spent,
-                "last_updated": p.StudentProgress.last_accessed
-            } for p in progress_list
-        ]
+    def _filter_students(query, filters: ResultFilters):
+        if filters.class_name:
+            query = query.filter(User.class_name == filters.class_name)
+        if filters.grade is not None:
+            query = query.filter(User.grade == filters.grade)
+        return query
 
     @staticmethod
-    def get_all_quiz_attempts(db: Session):
-        attempts = db.query(QuizAttempt, User.full_name, Lesson.title).join(User, QuizAttempt.user_id == User.id).join(Quiz, QuizAttempt.quiz_id == Quiz.id).join(Lesson, Quiz.lesson_id == Lesson.id).all()
-        return [
-            {
-                "id": a.QuizAttempt.id,
-                "user_name": a.full_name,
-                "lesson_title": a.title,
-                "score": a.QuizAttempt.score,
-                "time_spent": a.QuizAttempt.time_spent,
-                "submitted_at": a.QuizAttempt.submitted_at
-            } for a in attempts
-        ]
+    def _filter_range(query, column, low, high):
+        if low is not None:
+            query = query.filter(column >= low)
+        if high is not None:
+            query = query.filter(column < high)
+        return query
 
     @staticmethod
-    def get_all_feedback(db: Session):
-        # Join 3 bảng: Feedback, User, Lesson
-        # Lưu ý: feedback table trong DB của bạn tên cột nội dung là 'comment' hay 'content'?
-        # Dựa vào schema cũ bạn gửi, nó là 'comment'.
-        
-        results = db.query(Feedback, User, Lesson)\
-            .join(User, Feedback.user_id == User.id)\
-            .join(Lesson, Feedback.lesson_id == Lesson.id)\
-            .order_by(Feedback.created_at.desc())\
-            .all()
-            
-        list_data = []
-        for f, u, l in results:
-            # f là Feedback, u là User, l là Lesson
-            list_data.append({
-                "id": f.id,
-                "rating": f.rating,
-                "comment": f.comment,   # 👈 Quan trọng: phải đúng tên cột trong DB
-                "created_at": f.created_at,
-                
-                # Thông tin từ bảng User và Lesson
-                "user_name": u.full_name,
-                "user_email": u.email,
-                "lesson_title": l.title
-            })
-            
-        return list_data
+    def lesson_progress_query(db: Session, filters: ResultFilters):
+        """Filtered lesson progress rows, selecting only the listed columns"""
+        query = db.query(
+            StudentProgress.id,
+            User.full_name.label("user_name"),
+            User.class_name,
+            Lesson.title.label("lesson_title"),
+            StudentProgress.progress_percentage.label("progress"),
+            StudentProgress.quiz_score,
+            StudentProgress.time_spent,
+            StudentProgress.last_accessed.label("last_updated")
+        ).join(User, StudentProgress.user_id == User.id).join(Lesson, StudentProgress.lesson_id == Lesson.id)
+
+        query = AdminService._filter_students(query, filters)
+        if filters.lesson_id is not None:
+            query = query.filter(StudentProgress.lesson_id == filters.lesson_id)
+        query = AdminService._filter_range(query, StudentProgress.last_accessed, filters.date_from, filters.date_to)
+        if filters.score_min is not None:
+            query = query.filter(StudentProgress.quiz_score >= filters.score_min)
+        if filters.score_max is not None:
+            query = query.filter(StudentProgress.quiz_score <= filters.score_max)
+        return query
+
+    @staticmethod
+    def quiz_attempts_query(db: Session, filters: ResultFilters):
+        """Filtered completed quiz attempts, selecting only the listed columns"""
+        query = db.query(
+            QuizAttempt.id,
+            User.full_name.label("user_name"),
+            User.class_name,
+            Lesson.title.label("lesson_title"),
+            QuizAttempt.score,
+            QuizAttempt.time_spent,
+            QuizAttempt.submitted_at
+        ).join(User, QuizAttempt.user_id == User.id).join(Quiz, QuizAttempt.quiz_id == Quiz.id).join(
+            Lesson, Quiz.lesson_id == Lesson.id
+        ).filter(QuizAttempt.is_completed == True)
+
+        query = AdminService._filter_students(query, filters)
+        if filters.lesson_id is not None:
+            query = query.filter(Quiz.lesson_id == filters.lesson_id)
+        query = AdminService._filter_range(query, QuizAttempt.submitted_at, filters.date_from, filters.date_to)
+        if filters.score_min is not None:
+            query = query.filter(QuizAttempt.score >= filters.score_min)
+        if filters.score_max is not None:
+            query = query.filter(QuizAttempt.score <= filters.score_max)
+        return query
+
+    @staticmethod
+    def feedback_query(db: Session, filters: ResultFilters, rating: Optional[int] = None):
+        """Filtered feedback rows; only the lesson title is read, never its content"""
+        query = db.query(
+            Feedback.id,
+            Feedback.rating,
+            Feedback.comment,
+            Feedback.created_at,
+            User.full_name.label("user_name"),
+            User.email.label("user_email"),
+            Lesson.title.label("lesson_title")
+        ).join(User, Feedback.user_id == User.id).join(Lesson, Feedback.lesson_id == Lesson.id)
+
+        query = AdminService._filter_students(query, filters)
+        if filters.lesson_id is not None:
+            query = query.filter(Feedback.lesson_id == filters.lesson_id)
+        query = AdminService._filter_range(query, Feedback.created_at, filters.date_from, filters.date_to)
+        if rating is not None:
+            query = query.filter(Feedback.rating == rating)
+        return query
+
+    @staticmethod
+    def get_all_lesson_progress(db: Session, filters: ResultFilters, page: PageParams):
+        return keyset_page(
+            AdminService.lesson_progress_query(db, filters), page,
+            AdminService.LESSON_PROGRESS_SORTS, "last_updated", StudentProgress.id, _row_item
+        )
+
+    @staticmethod
+    def get_all_quiz_attempts(db: Session, filters: ResultFilters, page: PageParams):
+        return keyset_page(
+            AdminService.quiz_attempts_query(db, filters), page,
+            AdminService.QUIZ_ATTEMPT_SORTS, "submitted_at", QuizAttempt.id, _row_item
+        )
+
+    @staticmethod
+    def get_all_feedback(db: Session, filters: ResultFilters, page: PageParams, rating: Optional[int] = None):
+        return keyset_page(
+            AdminService.feedback_query(db, filters, rating), page,
+            AdminService.FEEDBACK_SORTS, "created_at", Feedback.id, _row_item
+        )
 
     @staticmethod
     def mark_feedback_as_read(db: Session, feedback_id: int):
@@ -85,10 +167,10 @@ class AdminService:
 
     @staticmethod
     def delete_feedback(db: Session, feedback_id: int):
-        feedback = db.query(Feedback).filter(Feedback.id == feedback_id).first()
+        feedback = db.query(Feedback).filter(Feedback.id == feedback_id).with_for_update().first()
         if not feedback:
             raise HTTPException(status_code=404, detail="Feedback not found")
-        db.delete(feedback)
+        FeedbackService.remove_feedback(db, feedback)
         db.commit()
 
     @staticmethod
@@ -112,4 +194,5 @@ class AdminService:
         if not admin or not verify_password(password_data.current_password, admin.hashed_password):
             raise HTTPException(status_code=400, detail="Mật khâu hiện tại không đúng")
         admin.hashed_password = get_password_hash(password_data.new_password)
-        db.commit()
\ No newline at end of file
+        db.commit()
+        AuthService.invalidate_principal(admin_id)
\ No newline at end of file
@@ -0,0 +1,32 @@
+"""
+Answer keys - precompiled grading data of a quiz version
+"""
+from typing import Any, NamedTuple, Optional, Tuple
+
+
+class QuestionKey(NamedTuple):
+    """Grading data for a single question"""
+    question_id: int
+    question_text: str
+    question_type: str
+    points: float
+    correct_answer_id: Optional[int]
+    correct_answer_text: Optional[str]
+    normalized_answer_text: Optional[str]
+    answer_ids: Tuple[int, ...] = ()  # All answer options, in id order
+
+
+class AnswerKey(NamedTuple):
+    """Precompiled answer key for one version of a quiz"""
+    quiz_id: int
+    version: Optional[int]  # Quiz.version the key was built from
+    lesson_id: int
+    passing_score: float
+    show_answers: bool
+    total_points: float
+    questions: Tuple[QuestionKey, ...]
+
+
+def normalize_short_answer(value: Any) -> str:
+    """Normalize a short-answer response for comparison (trimmed, case-insensitive)"""
+    return str(value).strip().lower()
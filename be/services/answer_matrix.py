@@ -0,0 +1,121 @@
+"""
+Dense attempts x questions response matrices for vectorized grading
+
+Submitted answers are stored as JSON per attempt. For bulk work (regrading,
+item analytics) they are encoded once into an int64 matrix with one column
+per question of an answer key:
+
+- multiple choice / true-false: the chosen answer id
+- short answer: a per-column code of the normalized text
+- NO_ANSWER where the question was skipped or the value is unusable
+
+The key row holds the code of the correct response per column (NEVER_CORRECT
+when a question has no usable key), so `responses == key` is the correctness
+matrix and scores are a matrix-vector product with the points.
+"""
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.answer_key import AnswerKey, normalize_short_answer
+
+NO_ANSWER = -1
+NEVER_CORRECT = -2
+
+CHOICE_TYPES = ("multiple_choice", "true_false")
+
+
+class AnswerMatrix(NamedTuple):
+    """Encoded responses of a chunk of attempts"""
+    attempt_ids: np.ndarray  # (attempts,) int64
+    responses: np.ndarray  # (attempts, questions) int64 response codes
+    key: np.ndarray  # (questions,) int64 code of the correct response
+    points: np.ndarray  # (questions,) float64
+
+
+class AnswerMatrixBuilder:
+    """
+    Encodes attempts against one answer key
+
+    Short-answer vocabularies live on the builder, so codes stay consistent
+    across every chunk built with the same instance.
+    """
+
+    def __init__(self, answer_key: AnswerKey):
+        self.answer_key = answer_key
+        self.question_ids = [question.question_id for question in answer_key.questions]
+        self.columns: Dict[int, int] = {
+            question_id: column for column, question_id in enumerate(self.question_ids)
+        }
+        self.is_choice = [question.question_type in CHOICE_TYPES for question in answer_key.questions]
+        # Normalized short-answer text -> code, per short-answer column
+        self.vocabularies: List[Optional[Dict[str, int]]] = [
+            None if choice else {} for choice in self.is_choice
+        ]
+
+        key = np.full(len(self.question_ids), NEVER_CORRECT, dtype=np.int64)
+        for column, question in enumerate(answer_key.questions):
+            if self.is_choice[column]:
+                if question.correct_answer_id is not None:
+                    key[column] = question.correct_answer_id
+            elif question.question_type == "short_answer" and question.normalized_answer_text is not None:
+                key[column] = self._text_code(column, question.normalized_answer_text)
+        self.key = key
+        self.points = np.array([question.points for question in answer_key.questions], dtype=np.float64)
+
+    def build(self, attempts: Sequence[Tuple[int, Optional[Dict[Any, Any]]]]) -> AnswerMatrix:
+        """Encode (attempt_id, answers JSON) pairs into a response matrix"""
+        responses = np.full((len(attempts), len(self.question_ids)), NO_ANSWER, dtype=np.int64)
+        columns = self.columns
+        for row, (_, answers) in enumerate(attempts):
+            if not answers:
+                continue
+            for question_id, value in answers.items():
+                # JSON object keys come back as strings
+                column = columns.get(int(question_id))
+                if column is None:
+                    continue
+                responses[row, column] = self._encode(column, value)
+
+        return AnswerMatrix(
+            attempt_ids=np.array([attempt_id for attempt_id, _ in attempts], dtype=np.int64),
+            responses=responses,
+            key=self.key,
+            points=self.points
+        )
+
+    def _encode(self, column: int, value: Any) -> int:
+        if self.is_choice[column]:
+            # Same rule as QuizService.grade_answers: the value must equal the answer id
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return NO_ANSWER
+            if isinstance(value, float) and not value.is_integer():
+                return NO_ANSWER
+            return int(value)
+        if not value:
+            return NO_ANSWER
+        return self._text_code(column, normalize_short_answer(value))
+
+    def _text_code(self, column: int, text: str) -> int:
+        vocabulary = self.vocabularies[column]
+        code = vocabulary.get(text)
+        if code is None:
+            code = vocabulary[text] = len(vocabulary)
+        return code
+
+
+def correctness(matrix: AnswerMatrix) -> np.ndarray:
+    """Boolean (attempts, questions) matrix of correct responses"""
+    return matrix.responses == matrix.key[np.newaxis, :]
+
+
+def score_matrix(matrix: AnswerMatrix) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score every attempt of a matrix
+    Returns: (earned points, percentage score), each of shape (attempts,)
+    """
+    earned = correctness(matrix).astype(np.float64) @ matrix.points
+    total = matrix.points.sum()
+    if total <= 0:
+        return earned, np.zeros_like(earned)
+    return earned, earned / total * 100.0
@@ -1,13 +1,75 @@
 """
 Authentication service
 """
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from datetime import datetime
+from typing import Optional
 
-from entities.user import User
+from core.config import settings
+from entities.user import User, UserRole
 from schemas.user import UserCreate, UserLogin, TokenResponse, UserResponse
-from utils.security import verify_password, get_password_hash, create_access_token
+from utils.security import (
+    verify_password, get_password_hash, create_access_token,
+    verify_password_async, get_password_hash_async, PasswordHasherBusy
+)
+from utils.cache import LRUCache
+
+
+class UserPrincipal:
+    """Lightweight snapshot of an authenticated user, safe to cache across requests"""
+    __slots__ = ("id", "username", "role", "is_active", "grade", "class_name")
+
+    def __init__(
+        self,
+        id: int,
+        username: str,
+        role: UserRole,
+        is_active: bool,
+        grade: Optional[int] = None,
+        class_name: Optional[str] = None
+    ):
+        self.id = id
+        self.username = username
+        self.role = role
+        self.is_active = is_active
+        self.grade = grade
+        self.class_name = class_name
+
+    def __repr__(self):
+        return f"<UserPrincipal {self.username} ({self.role})>"
+
+    def is_admin(self) -> bool:
+        """Check if user is admin"""
+        return self.role == UserRole.ADMIN
+
+    def is_teacher(self) -> bool:
+        """Check if user is teacher"""
+        return self.role == UserRole.TEACHER
+
+    def is_student(self) -> bool:
+        """Check if user is student"""
+        return self.role == UserRole.STUDENT
+
+
+# user_id -> UserPrincipal; the TTL bounds staleness in other worker processes,
+# local writes invalidate explicitly via AuthService.invalidate_principal
+principal_cache = LRUCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    name="principals"
+)
+
+
+def _hasher_busy_exception() -> HTTPException:
+    """Error returned when the bcrypt worker pool queue is full"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, please try again",
+        headers={"Retry-After": "1"}
+    )
 
 
 class AuthService:
@@ -21,12 +83,29 @@ class AuthService:
     def get_password_hash(password: str) -> str:
         """Hash password wrapper"""
         return get_password_hash(password)
+
+    @staticmethod
+    async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        """Verify password in the hashing worker pool"""
+        try:
+            return await verify_password_async(plain_password, hashed_password)
+        except PasswordHasherBusy:
+            raise _hasher_busy_exception()
+
+    @staticmethod
+    async def get_password_hash_async(password: str) -> str:
+        """Hash password in the hashing worker pool"""
+        try:
+            return await get_password_hash_async(password)
+        except PasswordHasherBusy:
+            raise _hasher_busy_exception()
+
     @staticmethod
-    def register_user(db: Session, user_data: UserCreate) -> User:
+    async def register_user(db: AsyncSession, user_data: UserCreate) -> User:
         """
         Register a new user
         Args:
-            db: Database session
+            db: Async database session
             user_data: User registration data
         Returns:
             Created user
@@ -34,23 +113,23 @@ class AuthService:
             HTTPException: If username or email already exists
         """
         # Check if username exists
-        existing_user = db.query(User).filter(User.username == user_data.username).first()
-        if existing_user:
+        result = await db.execute(select(User.id).where(User.username == user_data.username))
+        if result.first():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already registered"
             )
 
         # Check if email exists
-        existing_email = db.query(User).filter(User.email == user_data.email).first()
-        if existing_email:
+        result = await db.execute(select(User.id).where(User.email == user_data.email))
+        if result.first():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
 
         # Create new user
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await AuthService.get_password_hash_async(user_data.password)
         db_user = User(
             username=user_data.username,
             email=user_data.email,
@@ -62,17 +141,17 @@ class AuthService:
         )
 
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
 
         return db_user
 
     @staticmethod
-    def login(db: Session, credentials: UserLogin) -> TokenResponse:
+    async def login(db: AsyncSession, credentials: UserLogin) -> TokenResponse:
         """
         Authenticate user and return token
         Args:
-            db: Database session
+            db: Async database session
             credentials: Login credentials
         Returns:
             Token response with user data
@@ -80,7 +159,8 @@ class AuthService:
             HTTPException: If credentials are invalid
         """
         # Find user by username
-        user = db.query(User).filter(User.username == credentials.username).first()
+        result = await db.execute(select(User).where(User.username == credentials.username))
+        user = result.scalar_one_or_none()
 
         if not user:
             raise HTTPException(
@@ -88,8 +168,8 @@ class AuthService:
                 detail="Tài khoản hoặc mật khẩu không đúng"
             )
 
-        # Verify password
-        if not verify_password(credentials.password, user.hashed_password):
+        # Verify password (bcrypt runs in the worker pool, off the event loop)
+        if not await AuthService.verify_password_async(credentials.password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Tài khoản hoặc mật khẩu không đúng"
@@ -104,7 +184,7 @@ class AuthService:
 
         # Update last login
         user.last_login = datetime.utcnow()
-        db.commit()
+        await db.commit()
 
         # Create access token
         access_token = create_access_token(
@@ -149,3 +229,51 @@ class AuthService:
             )
 
         return user
+
+    @staticmethod
+    def get_principal(db: Session, user_id: int) -> UserPrincipal:
+        """
+        Resolve the principal of an authenticated user, using the principal cache
+        Args:
+            db: Database session
+            user_id: User ID from token
+        Returns:
+            UserPrincipal snapshot
+        Raises:
+            HTTPException: If user not found or inactive
+        """
+        principal = principal_cache.get(user_id)
+
+        if principal is None:
+            row = db.query(
+                User.id, User.username, User.role, User.is_active, User.grade, User.class_name
+            ).filter(User.id == user_id).first()
+
+            if not row:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
+
+            principal = UserPrincipal(
+                id=row.id,
+                username=row.username,
+                role=row.role,
+                is_active=bool(row.is_active),
+                grade=row.grade,
+                class_name=row.class_name
+            )
+            principal_cache.set(user_id, principal)
+
+        if not principal.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Account is inactive"
+            )
+
+        return principal
+
+    @staticmethod
+    def invalidate_principal(user_id: int) -> None:
+        """Drop a cached principal after the user's profile, status or password changed"""
+        principal_cache.pop(user_id)
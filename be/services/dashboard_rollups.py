@@ -0,0 +1,223 @@
+"""
+Precomputed admin dashboard aggregates
+
+dashboard_rollups keeps, per (class, lesson), the counters behind the
+dashboard: students started/completed, progress and time sums, best-score
+sum and at-risk count. Every write that changes a student's progress row
+(progress flush, synchronous progress update, quiz grading) reports the
+row's state before and after; the difference of their contributions is
+held on the session until that transaction commits, then added to the
+rollups by apply_committed_changes in a short transaction of its own. A
+rollup row is shared by a whole class, so it is never locked while a
+grading batch or progress flush is still running, and a rolled back write
+contributes nothing.
+
+Changes that bypass those paths (a student moving class, deleted users or
+lessons) are repaired by rebuild_dashboard_rollups, run nightly.
+"""
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import case, event, func, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from entities.dashboard import DashboardRollup
+from entities.student_progress import StudentProgress
+from entities.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+RollupKey = Tuple[str, int]  # (class_name, lesson_id)
+
+# Session.info keys: changes of the open transaction, and of committed ones not yet applied
+_RECORDED = "dashboard_rollup_changes"
+_COMMITTED = "dashboard_rollup_committed_changes"
+
+COUNTERS = (
+    "student_count", "completed_count", "progress_sum", "time_spent_sum",
+    "scored_count", "score_sum", "at_risk_count"
+)
+
+
+class ProgressState(NamedTuple):
+    """The student_progress fields the rollups are derived from"""
+    progress_percentage: float
+    is_completed: bool
+    time_spent: int
+    quiz_score: Optional[float]
+
+    @classmethod
+    def of(cls, progress) -> "ProgressState":
+        return cls(
+            progress.progress_percentage or 0.0,
+            bool(progress.is_completed),
+            progress.time_spent or 0,
+            progress.quiz_score
+        )
+
+
+class ProgressChange(NamedTuple):
+    """One progress row before (None if it did not exist) and after a write"""
+    user_id: int
+    lesson_id: int
+    old: Optional[ProgressState]
+    new: ProgressState
+
+
+def contribution(state: Optional[ProgressState]) -> Tuple:
+    """Counter values one progress row adds to its rollup, in COUNTERS order"""
+    if state is None:
+        return (0, 0, 0.0, 0, 0, 0.0, 0)
+    scored = state.quiz_score is not None
+    return (
+        1,
+        int(state.is_completed),
+        state.progress_percentage,
+        state.time_spent,
+        int(scored),
+        state.quiz_score if scored else 0.0,
+        int(scored and state.quiz_score < settings.DASHBOARD_AT_RISK_SCORE)
+    )
+
+
+def record_progress_changes(db: Session, changes: Iterable[ProgressChange]) -> None:
+    """
+    Hold the rollup deltas of some progress writes until the transaction ends
+    They are dropped on rollback; after the commit the caller applies them
+    with apply_committed_changes.
+    """
+    changes = [change for change in changes if change.old != change.new]
+    if changes:
+        db.info.setdefault(_RECORDED, []).extend(changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _keep_committed_changes(session: Session) -> None:
+    recorded = session.info.pop(_RECORDED, None)
+    if recorded:
+        session.info.setdefault(_COMMITTED, []).extend(recorded)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_recorded_changes(session: Session) -> None:
+    session.info.pop(_RECORDED, None)
+
+
+def apply_committed_changes(db: Session) -> None:
+    """
+    Add the deltas of committed progress writes to the rollups, in their own transaction
+    A failure only leaves the rollups behind until the nightly rebuild.
+    """
+    changes = db.info.pop(_COMMITTED, None)
+    if not changes:
+        return
+    try:
+        _apply_changes(db, changes)
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        logger.exception("Could not update dashboard rollups for %d progress changes", len(changes))
+
+
+def _apply_changes(db: Session, changes: List[ProgressChange]) -> None:
+    # Only students are counted; their class decides the rollup row
+    classes = dict(db.query(User.id, func.coalesce(User.class_name, "")).filter(
+        User.id.in_({change.user_id for change in changes}),
+        User.role == UserRole.STUDENT
+    ).all())
+
+    deltas: Dict[RollupKey, List] = {}
+    for change in changes:
+        class_name = classes.get(change.user_id)
+        if class_name is None:
+            continue
+        delta = deltas.setdefault((class_name, change.lesson_id), [0] * len(COUNTERS))
+        for index, (new, old) in enumerate(zip(contribution(change.new), contribution(change.old))):
+            delta[index] += new - old
+
+    rows = [
+        {"class_name": class_name, "lesson_id": lesson_id, **dict(zip(COUNTERS, delta))}
+        for (class_name, lesson_id), delta in sorted(deltas.items())
+        if any(delta)
+    ]
+    if rows:
+        _add_rollups(db, rows)
+
+
+def _add_rollups(db: Session, rows: List[dict]) -> None:
+    """Batched additive upsert of rollup deltas"""
+    dialect = db.get_bind().dialect.name
+    table = DashboardRollup.__table__
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        stmt = dialect_insert(table).values(rows)
+        new = stmt.inserted
+    elif dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(table).values(rows)
+        new = stmt.excluded
+    else:
+        _add_rollups_orm(db, rows)
+        return
+
+    updates = {name: table.c[name] + new[name] for name in COUNTERS}
+    updates["updated_at"] = func.now()
+    if dialect == "mysql":
+        stmt = stmt.on_duplicate_key_update(updates)
+    else:
+        stmt = stmt.on_conflict_do_update(index_elements=["class_name", "lesson_id"], set_=updates)
+    db.execute(stmt)
+
+
+def _add_rollups_orm(db: Session, rows: List[dict]) -> None:
+    """Portable fallback for dialects without an upsert statement"""
+    for row in rows:
+        rollup = db.get(DashboardRollup, (row["class_name"], row["lesson_id"]), with_for_update=True)
+        if not rollup:
+            db.add(DashboardRollup(**row))
+            continue
+        for name in COUNTERS:
+            setattr(rollup, name, getattr(rollup, name) + row[name])
+
+
+def rollup_source_query():
+    """The dashboard counters computed from the raw tables, grouped like dashboard_rollups"""
+    class_name = func.coalesce(User.class_name, "")
+    scored = StudentProgress.quiz_score.isnot(None)
+    return select(
+        class_name.label("class_name"),
+        StudentProgress.lesson_id,
+        func.count(StudentProgress.id).label("student_count"),
+        func.coalesce(func.sum(case((StudentProgress.is_completed == True, 1), else_=0)), 0).label("completed_count"),
+        func.coalesce(func.sum(func.coalesce(StudentProgress.progress_percentage, 0.0)), 0.0).label("progress_sum"),
+        func.coalesce(func.sum(func.coalesce(StudentProgress.time_spent, 0)), 0).label("time_spent_sum"),
+        func.count(StudentProgress.quiz_score).label("scored_count"),
+        func.coalesce(func.sum(StudentProgress.quiz_score), 0.0).label("score_sum"),
+        func.coalesce(func.sum(case(
+            (scored & (StudentProgress.quiz_score < settings.DASHBOARD_AT_RISK_SCORE), 1), else_=0
+        )), 0).label("at_risk_count"),
+        func.now().label("updated_at")
+    ).join(User, User.id == StudentProgress.user_id).where(
+        User.role == UserRole.STUDENT
+    ).group_by(class_name, StudentProgress.lesson_id)
+
+
+def rebuild_dashboard_rollups(db: Session) -> int:
+    """
+    Recompute every rollup from student_progress in one statement (caller commits)
+    Returns:
+        Number of rollup rows written
+    """
+    db.query(DashboardRollup).delete(synchronize_session=False)
+    source = rollup_source_query()
+    result = db.execute(
+        insert(DashboardRollup.__table__).from_select(
+            ["class_name", "lesson_id", *COUNTERS, "updated_at"], source
+        )
+    )
+    return result.rowcount
@@ -0,0 +1,108 @@
+"""
+Admin dashboard service - reads the precomputed dashboard rollups
+"""
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterable, List, Optional
+
+from core.config import settings
+from entities.dashboard import DashboardRollup
+from entities.lesson import Lesson
+from services.dashboard_rollups import COUNTERS
+
+
+def _metrics(counters: Dict[str, float]) -> Dict[str, Any]:
+    """Turn summed rollup counters into the dashboard figures"""
+    started = counters["student_count"]
+    scored = counters["scored_count"]
+    return {
+        "started": started,
+        "completed": counters["completed_count"],
+        "completion_rate": round(counters["completed_count"] / started * 100, 1) if started else 0.0,
+        "average_progress": round(counters["progress_sum"] / started, 1) if started else 0.0,
+        "average_time_spent": round(counters["time_spent_sum"] / started, 1) if started else 0.0,
+        "scored": scored,
+        "average_score": round(counters["score_sum"] / scored, 2) if scored else None,
+        "at_risk": counters["at_risk_count"]
+    }
+
+
+def _add(totals: Dict[str, float], rollup: DashboardRollup) -> None:
+    for name in COUNTERS:
+        totals[name] = totals.get(name, 0) + getattr(rollup, name)
+
+
+def _empty() -> Dict[str, float]:
+    return {name: 0 for name in COUNTERS}
+
+
+class DashboardService:
+    """Service for the admin dashboard"""
+
+    @staticmethod
+    def get_dashboard(
+        db: Session,
+        class_name: Optional[str] = None,
+        lesson_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Per-class and per-lesson completion, score, time and at-risk figures
+        Only dashboard_rollups is aggregated; lesson titles are looked up by id.
+        Args:
+            db: Database session
+            class_name: Only this class ("" for students without a class)
+            lesson_id: Only this lesson
+        """
+        query = db.query(DashboardRollup)
+        if class_name is not None:
+            query = query.filter(DashboardRollup.class_name == class_name)
+        if lesson_id is not None:
+            query = query.filter(DashboardRollup.lesson_id == lesson_id)
+        rollups = query.order_by(DashboardRollup.class_name, DashboardRollup.lesson_id).all()
+        return DashboardService.summarize(db, rollups)
+
+    @staticmethod
+    def summarize(db: Session, rollups: List[Any]) -> Dict[str, Any]:
+        """
+        Fold rollup rows (anything with the COUNTERS attributes, class_name and
+        lesson_id, sorted by both) into the dashboard response
+        """
+        overall = _empty()
+        by_class: Dict[str, Dict[str, float]] = {}
+        by_lesson: Dict[int, Dict[str, float]] = {}
+        updated_at = None
+        for rollup in rollups:
+            _add(overall, rollup)
+            _add(by_class.setdefault(rollup.class_name, _empty()), rollup)
+            _add(by_lesson.setdefault(rollup.lesson_id, _empty()), rollup)
+            changed = getattr(rollup, "updated_at", None)
+            if changed and (updated_at is None or changed > updated_at):
+                updated_at = changed
+
+        titles = DashboardService._lesson_titles(db, by_lesson)
+        return {
+            "overall": _metrics(overall),
+            "classes": [
+                {"class_name": name, **_metrics(totals)} for name, totals in sorted(by_class.items())
+            ],
+            "lessons": [
+                {"lesson_id": lesson, "lesson_title": titles.get(lesson), **_metrics(totals)}
+                for lesson, totals in sorted(by_lesson.items())
+            ],
+            "class_lessons": [
+                {
+                    "class_name": rollup.class_name,
+                    "lesson_id": rollup.lesson_id,
+                    **_metrics({name: getattr(rollup, name) for name in COUNTERS})
+                }
+                for rollup in rollups
+            ],
+            "at_risk_score": settings.DASHBOARD_AT_RISK_SCORE,
+            "updated_at": updated_at
+        }
+
+    @staticmethod
+    def _lesson_titles(db: Session, lesson_ids: Iterable[int]) -> Dict[int, str]:
+        lesson_ids = list(lesson_ids)
+        if not lesson_ids:
+            return {}
+        return dict(db.query(Lesson.id, Lesson.title).filter(Lesson.id.in_(lesson_ids)).all())
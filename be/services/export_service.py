@@ -0,0 +1,131 @@
+"""
+Streaming spreadsheet export of the admin result lists
+
+Rows are read through a server-side cursor (yield_per) and written out in
+batches, so memory stays flat however many rows match. CSV is streamed as
+it is produced; XLSX is written by openpyxl's write-only workbook into a
+temporary file (a zip can only be finalized at the end) and then streamed
+from disk.
+"""
+import csv
+import io
+import logging
+import tempfile
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List
+
+from core.database import SessionLocal
+from entities.quiz import QuizAttempt
+from entities.student_progress import StudentProgress
+from schemas.admin import ResultFilters
+from services.admin_service import AdminService
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip of the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+# Bytes buffered before a chunk is sent to the client
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Export name -> (filtered query builder, newest-first sort column, id column)
+EXPORTS: Dict[str, tuple] = {
+    "quiz-attempts": (AdminService.quiz_attempts_query, QuizAttempt.submitted_at, QuizAttempt.id),
+    "lesson-progress": (AdminService.lesson_progress_query, StudentProgress.last_accessed, StudentProgress.id),
+}
+
+
+def _safe_text(value: Any) -> Any:
+    """Keep spreadsheet apps from evaluating user-entered CSV text as a formula"""
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        return "'" + value
+    return value
+
+
+class ExportService:
+    """Service for exporting admin result lists"""
+
+    @staticmethod
+    def filename(name: str, export_format: str) -> str:
+        return f"{name}-{datetime.utcnow():%Y%m%d-%H%M}.{export_format}"
+
+    @staticmethod
+    def stream_rows(name: str, filters: ResultFilters, write: Callable[[List[str], Iterator[tuple]], Iterator[bytes]]) -> Iterator[bytes]:
+        """
+        Run an export query on its own session and feed its rows to a writer
+        The session outlives the request handler, so it is opened here rather
+        than taken from the get_db dependency.
+        """
+        build_query, sort_column, id_column = EXPORTS[name]
+        db = SessionLocal()
+        completed = False
+        try:
+            query = build_query(db, filters).order_by(sort_column.desc(), id_column.desc())
+            headers = [column["name"] for column in query.column_descriptions]
+            yield from write(headers, iter(query.yield_per(EXPORT_BATCH_SIZE)))
+            completed = True
+        except Exception:
+            logger.exception("Export of %s failed", name)
+            raise
+        finally:
+            if not completed:
+                # Closing a half-read server-side cursor would first drain every
+                # remaining row; drop the connection instead
+                try:
+                    db.connection().invalidate()
+                except Exception:
+                    pass
+            db.close()
+
+    @staticmethod
+    def stream_csv(name: str, filters: ResultFilters) -> Iterator[bytes]:
+        """Generate the CSV export in chunks (UTF-8 with BOM so Excel detects the encoding)"""
+
+        def write(headers: List[str], rows: Iterator[tuple]) -> Iterator[bytes]:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            buffer.write("\ufeff")
+            writer.writerow(headers)
+            for row in rows:
+                writer.writerow([
+                    value.isoformat(sep=" ", timespec="seconds") if isinstance(value, datetime) else _safe_text(value)
+                    for value in row
+                ])
+                if buffer.tell() >= EXPORT_CHUNK_BYTES:
+                    yield buffer.getvalue().encode("utf-8")
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue().encode("utf-8")
+
+        return ExportService.stream_rows(name, filters, write)
+
+    @staticmethod
+    def stream_xlsx(name: str, filters: ResultFilters) -> Iterator[bytes]:
+        """Generate the XLSX export: rows go to a write-only workbook on disk, the file is then streamed"""
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+
+        def _xlsx_value(sheet, value: Any) -> Any:
+            # openpyxl stores text starting with "=" as a formula; force a string cell
+            if isinstance(value, str) and value.startswith("="):
+                cell = WriteOnlyCell(sheet, value)
+                cell.data_type = "s"
+                return cell
+            return value
+
+        def write(headers: List[str], rows: Iterator[tuple]) -> Iterator[bytes]:
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet(title=name)
+            sheet.append(headers)
+            for row in rows:
+                sheet.append([_xlsx_value(sheet, value) for value in row])
+
+            with tempfile.TemporaryFile() as output:
+                workbook.save(output)
+                output.seek(0)
+                while chunk := output.read(EXPORT_CHUNK_BYTES):
+                    yield chunk
+
+        return ExportService.stream_rows(name, filters, write)
@@ -2,9 +2,10 @@
 Feedback service
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import case, func, update
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from entities.feedback import Feedback
 from entities.lesson import Lesson
@@ -40,21 +41,17 @@ class FeedbackService:
         existing = db.query(Feedback).filter(
             Feedback.user_id == user_id,
             Feedback.lesson_id == feedback_data.lesson_id
-        ).first()
+        ).with_for_update().first()
 
         if existing:
             # Update existing feedback instead of creating new one
-            existing.rating = feedback_data.rating
+            FeedbackService._replace_rating(db, existing, feedback_data.rating)
             existing.comment = feedback_data.comment
             db.commit()
             db.refresh(existing)
-
-            # Update lesson rating
-            FeedbackService._update_lesson_rating(db, feedback_data.lesson_id)
-
             return existing
 
-        # Create new feedback
+        # Create new feedback; the lesson aggregates change in the same transaction
         feedback = Feedback(
             user_id=user_id,
             lesson_id=feedback_data.lesson_id,
@@ -62,12 +59,25 @@ class FeedbackService:
             comment=feedback_data.comment
         )
         db.add(feedback)
-        db.commit()
+        try:
+            db.flush()
+            FeedbackService.adjust_lesson_rating(db, feedback.lesson_id, feedback.rating, 1)
+            db.commit()
+        except IntegrityError:
+            # A concurrent request created this student's feedback first
+            # (unique user_id, lesson_id); apply this one as an update instead
+            db.rollback()
+            feedback = db.query(Feedback).filter(
+                Feedback.user_id == user_id,
+                Feedback.lesson_id == feedback_data.lesson_id
+            ).with_for_update().first()
+            if not feedback:
+                raise
+            FeedbackService._replace_rating(db, feedback, feedback_data.rating)
+            feedback.comment = feedback_data.comment
+            db.commit()
         db.refresh(feedback)
 
-        # Update lesson rating
-        FeedbackService._update_lesson_rating(db, feedback_data.lesson_id)
-
         return feedback
 
     @staticmethod
@@ -122,7 +132,7 @@ class FeedbackService:
         Raises:
             HTTPException: If feedback not found or unauthorized
         """
-        feedback = db.query(Feedback).filter(Feedback.id == feedback_id).first()
+        feedback = db.query(Feedback).filter(Feedback.id == feedback_id).with_for_update().first()
         if not feedback:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -137,16 +147,13 @@ class FeedbackService:
 
         # Update fields
         if feedback_data.rating is not None:
-            feedback.rating = feedback_data.rating
+            FeedbackService._replace_rating(db, feedback, feedback_data.rating)
         if feedback_data.comment is not None:
             feedback.comment = feedback_data.comment
 
         db.commit()
         db.refresh(feedback)
 
-        # Update lesson rating
-        FeedbackService._update_lesson_rating(db, feedback.lesson_id)
-
         return feedback
 
     @staticmethod
@@ -162,7 +169,7 @@ class FeedbackService:
         Raises:
             HTTPException: If feedback not found or unauthorized
         """
-        feedback = db.query(Feedback).filter(Feedback.id == feedback_id).first()
+        feedback = db.query(Feedback).filter(Feedback.id == feedback_id).with_for_update().first()
         if not feedback:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -175,38 +182,116 @@ class FeedbackService:
                 detail="Not authorized to delete this feedback"
             )
 
-        lesson_id = feedback.lesson_id
-        db.delete(feedback)
+        FeedbackService.remove_feedback(db, feedback)
         db.commit()
 
-        # Update lesson rating
-        FeedbackService._update_lesson_rating(db, lesson_id)
-
         return True
 
     @staticmethod
-    def _update_lesson_rating(db: Session, lesson_id: int):
+    def remove_feedback(db: Session, feedback: Feedback) -> None:
+        """Delete a feedback and take it out of the lesson aggregates (caller commits)"""
+        FeedbackService.adjust_lesson_rating(db, feedback.lesson_id, -feedback.rating, -1)
+        db.delete(feedback)
+
+    @staticmethod
+    def remove_user_ratings(db: Session, user_id: int) -> None:
+        """Take all of a user's ratings out of the lesson aggregates before the user is deleted"""
+        rows = db.query(
+            Feedback.lesson_id,
+            func.sum(Feedback.rating),
+            func.count(Feedback.id)
+        ).filter(Feedback.user_id == user_id).group_by(Feedback.lesson_id).all()
+        for lesson_id, rating_sum, count in rows:
+            FeedbackService.adjust_lesson_rating(db, lesson_id, -float(rating_sum), -count)
+
+    @staticmethod
+    def adjust_lesson_rating(db: Session, lesson_id: int, sum_delta: float, count_delta: int) -> None:
         """
-        Update lesson's average rating and review count
+        Apply a delta to a lesson's running rating aggregates (caller commits)
         Args:
             db: Database session
             lesson_id: Lesson ID
+            sum_delta: Change of the rating sum
+            count_delta: Change of the review count
         """
-        lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
-        if not lesson:
+        if not sum_delta and not count_delta:
             return
 
-        # Calculate average rating
-        stats = db.query(
-            func.avg(Feedback.rating).label('avg_rating'),
-            func.count(Feedback.id).label('count')
-        ).filter(Feedback.lesson_id == lesson_id).first()
+        new_sum = Lesson.rating_sum + sum_delta
+        new_count = Lesson.review_count + count_delta
+        # rating goes first: MySQL evaluates SET left to right with already-updated
+        # values, other databases use the old row; both then see the old aggregates
+        db.execute(
+            update(Lesson).where(Lesson.id == lesson_id).ordered_values(
+                (Lesson.rating, case((new_count > 0, func.round(new_sum / new_count, 2)), else_=0.0)),
+                (Lesson.rating_sum, new_sum),
+                (Lesson.review_count, new_count)
+            ).execution_options(synchronize_session=False)
+        )
 
-        if stats and stats.count > 0:
-            lesson.rating = round(float(stats.avg_rating), 2)
-            lesson.review_count = stats.count
-        else:
-            lesson.rating = 0.0
-            lesson.review_count = 0
+    @staticmethod
+    def _replace_rating(db: Session, feedback: Feedback, rating: float) -> None:
+        """Change a feedback's rating and move the lesson aggregates by the difference"""
+        FeedbackService.adjust_lesson_rating(db, feedback.lesson_id, rating - feedback.rating, 0)
+        feedback.rating = rating
 
-        db.commit()
+    @staticmethod
+    def reconcile_lesson_ratings(db: Session, fix: bool = False) -> List[Dict[str, Any]]:
+        """
+        Compare every lesson's running aggregates with a full recompute from feedbacks
+        Args:
+            db: Database session
+            fix: Overwrite drifted lessons with the recomputed values
+        Returns:
+            One entry per lesson whose aggregates drifted
+        """
+        recomputed = db.query(
+            Lesson.id,
+            Lesson.rating_sum,
+            Lesson.review_count,
+            Lesson.rating,
+            func.coalesce(func.sum(Feedback.rating), 0.0),
+            func.count(Feedback.id)
+        ).outerjoin(Feedback, Feedback.lesson_id == Lesson.id).group_by(Lesson.id).all()
+
+        drifted = []
+        for lesson_id, rating_sum, review_count, rating, actual_sum, actual_count in recomputed:
+            actual_sum = float(actual_sum)
+            actual_rating = round(actual_sum / actual_count, 2) if actual_count else 0.0
+            if (
+                abs((rating_sum or 0.0) - actual_sum) < 1e-6
+                and (review_count or 0) == actual_count
+                and abs((rating or 0.0) - actual_rating) < 0.005
+            ):
+                continue
+            drifted.append({
+                "lesson_id": lesson_id,
+                "rating_sum": rating_sum,
+                "review_count": review_count,
+                "rating": rating,
+                "expected_rating_sum": actual_sum,
+                "expected_review_count": actual_count,
+                "expected_rating": actual_rating
+            })
+
+        # Release the snapshot used for the comparison before fixing
+        db.rollback()
+        if fix:
+            for entry in drifted:
+                FeedbackService._recompute_lesson_rating(db, entry["lesson_id"])
+                db.commit()
+        return drifted
+
+    @staticmethod
+    def _recompute_lesson_rating(db: Session, lesson_id: int) -> None:
+        """Overwrite one lesson's aggregates from its feedbacks, holding the lesson row lock"""
+        lesson = db.query(Lesson).filter(Lesson.id == lesson_id).with_for_update().first()
+        if not lesson:
+            return
+        rating_sum, count = db.query(
+            func.coalesce(func.sum(Feedback.rating), 0.0),
+            func.count(Feedback.id)
+        ).filter(Feedback.lesson_id == lesson_id).one()
+        lesson.rating_sum = float(rating_sum)
+        lesson.review_count = count
+        lesson.rating = round(float(rating_sum) / count, 2) if count else 0.0
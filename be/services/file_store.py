@@ -0,0 +1,129 @@
+"""
+Content-addressed upload storage
+
+Uploaded files are named after the SHA-256 of their content, so the same
+diagram uploaded for twenty questions is stored once, under one URL that
+browsers can cache for good. stored_files counts the uploads pointing at
+each file: storing content that already exists only adds a reference, and
+deleting removes one, the file itself going with the last reference.
+
+The reference row stays locked while the file is put in place or removed,
+so a concurrent upload and delete of the same content cannot leave a row
+without its file.
+"""
+import os
+from pathlib import Path
+from typing import NamedTuple
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from entities.stored_file import StoredFile
+from services import image_variants
+from utils.upload_stream import StreamedUpload
+
+
+class StoredUpload(NamedTuple):
+    """Where an upload ended up"""
+    filename: str
+    created: bool  # False when the content was already stored
+
+
+def content_filename(sha256: str, original_filename: str) -> str:
+    """Content-addressed name of a file: its SHA-256 plus the original extension"""
+    return f"{sha256}{Path(original_filename).suffix.lower()}"
+
+
+def _stored_path(directory: Path, filename: str) -> str:
+    return f"{directory.name}/{filename}"
+
+
+def _add_reference(db: Session, row: dict) -> None:
+    """Insert the stored_files row or add one reference to it, locking it until commit"""
+    dialect = db.get_bind().dialect.name
+    table = StoredFile.__table__
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        stmt = dialect_insert(table).values(row)
+        stmt = stmt.on_duplicate_key_update(ref_count=table.c.ref_count + 1)
+    elif dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(table).values(row)
+        stmt = stmt.on_conflict_do_update(index_elements=["path"], set_={"ref_count": table.c.ref_count + 1})
+    else:
+        stored = db.get(StoredFile, row["path"], with_for_update=True)
+        if stored:
+            stored.ref_count += 1
+        else:
+            db.add(StoredFile(**row))
+        db.flush()
+        return
+    db.execute(stmt)
+
+
+class FileStoreService:
+    """Service for content-addressed upload storage"""
+
+    @staticmethod
+    def store(db: Session, upload: StreamedUpload, directory: Path) -> StoredUpload:
+        """
+        Move a received upload to its content address in directory, or drop it
+        if that content is already stored, and add a reference to it
+        """
+        filename = content_filename(upload.sha256, upload.original_filename)
+        _add_reference(db, {
+            "path": _stored_path(directory, filename),
+            "sha256": upload.sha256,
+            "size": upload.size,
+            "ref_count": 1
+        })
+
+        path = directory / filename
+        # A missing file is restored even when the row already existed
+        created = not path.is_file()
+        if created:
+            os.replace(upload.path, path)
+        db.commit()
+        return StoredUpload(filename=filename, created=created)
+
+    @staticmethod
+    def release(db: Session, directory: Path, filename: str) -> bool:
+        """
+        Remove one reference to a stored file, deleting the file (and its image
+        variants) with the last one. Files uploaded before content addressing
+        have no row and are deleted directly.
+        Returns:
+            True if the file was deleted, False if other references remain
+        Raises:
+            HTTPException: If the file is not found
+        """
+        # A bare file name only: no path traversal, nothing hidden (e.g. upload sessions)
+        if Path(filename).name != filename or filename.startswith("."):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="File not found"
+            )
+
+        path = directory / filename
+        stored = db.get(StoredFile, _stored_path(directory, filename), with_for_update=True)
+        if stored is None and not path.is_file():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="File not found"
+            )
+
+        if stored is not None and stored.ref_count > 1:
+            stored.ref_count -= 1
+            db.commit()
+            return False
+
+        if stored is not None:
+            db.delete(stored)
+        # Removed before commit, while the row is still locked against a re-upload
+        path.unlink(missing_ok=True)
+        image_variants.remove_variants(path)
+        db.commit()
+        return True
@@ -1,6 +1,11 @@
 from sqlalchemy.orm import Session
+from core.config import settings
 from entities.geogebra import GeoGebraContent
-from schemas.geogebra import GeoGebraCreate, GeoGebraUpdate
+from schemas.geogebra import GeoGebraCreate, GeoGebraUpdate, GeoGebraResponse
+from utils.singleflight import SingleFlight
+
+# Concurrent reads of a lesson's GeoGebra applets share one load
+geogebra_flight = SingleFlight(name="geogebra_by_lesson", enabled=settings.SINGLE_FLIGHT_ENABLED)
 
 class GeoGebraService:
     @staticmethod
@@ -15,6 +20,13 @@ class GeoGebraService:
     def get_by_lesson(db: Session, lesson_id: int):
         return db.query(GeoGebraContent).filter(GeoGebraContent.lesson_id == lesson_id).all()
 
+    @staticmethod
+    def get_by_lesson_shared(db: Session, lesson_id: int):
+        # Results are shared between requests, so hand out response models, not ORM rows
+        return geogebra_flight.do(lesson_id, lambda: [
+            GeoGebraResponse.model_validate(ggb) for ggb in GeoGebraService.get_by_lesson(db, lesson_id)
+        ])
+
     @staticmethod
     def get_by_id(db: Session, id: int):
         return db.query(GeoGebraContent).filter(GeoGebraContent.id == id).first()
@@ -0,0 +1,263 @@
+"""
+Background grading queue for quiz submissions
+
+When a timed quiz ends, a whole class submits at once. In queued mode the
+submit request only persists the raw answers (a pending attempt) and returns
+202; a bounded pool of worker threads grades pending attempts in batches,
+one transaction per batch, and clients poll the attempt for its result.
+Pending attempts live in the database, so anything still queued when the
+process stops is picked up again by `recover` at startup, and a sweep thread
+queues again whatever stays pending for too long (a failed batch, or a
+recovery that did not fit in the queue). Grading claims attempts with
+FOR UPDATE SKIP LOCKED, so an attempt queued twice, or by two processes, is
+graded once. An attempt whose grading keeps failing is marked failed after
+max_retries runs instead of being retried forever.
+"""
+import logging
+import queue
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.database import SessionLocal
+from entities.quiz import QuizAttempt
+from services.quiz_service import QuizService
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class GradingQueue:
+    """Bounded queue of pending attempt ids drained by worker threads"""
+
+    def __init__(
+        self,
+        workers: int,
+        max_size: int,
+        batch_size: int,
+        sweep_interval: float,
+        stale_seconds: int,
+        max_retries: int,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.workers = workers
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.sweep_interval = sweep_interval
+        self.stale_seconds = stale_seconds
+        self.max_retries = max_retries
+        self.session_factory = session_factory
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_size)
+        self._threads: List[threading.Thread] = []
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop_sweep = threading.Event()
+        self._lock = threading.Lock()
+        self._queued: Set[int] = set()  # Attempt ids in the queue or being graded
+        self._failures: Dict[int, int] = {}  # Failed grading runs per attempt id
+        self.enqueued = 0
+        self.rejected = 0
+        self.graded = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.failed_attempts = 0
+        self.swept = 0
+
+    def submit(self, attempt_id: int) -> bool:
+        """
+        Queue a pending attempt for grading
+        Returns:
+            False if the queue is full or not running (caller grades inline)
+        """
+        if not self._threads:
+            return False
+        with self._lock:
+            if attempt_id in self._queued:
+                return True
+            self._queued.add(attempt_id)
+        try:
+            self._queue.put_nowait(attempt_id)
+        except queue.Full:
+            with self._lock:
+                self._queued.discard(attempt_id)
+                self.rejected += 1
+            return False
+        with self._lock:
+            self.enqueued += 1
+        return True
+
+    def start(self) -> None:
+        """Start the worker threads"""
+        if self._threads:
+            return
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"grading-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._stop_sweep.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, name="grading-sweep", daemon=True)
+        self._sweeper.start()
+
+    def stop(self) -> None:
+        """Grade everything already queued, then stop the workers"""
+        if self._sweeper:
+            self._stop_sweep.set()
+            self._sweeper.join()
+            self._sweeper = None
+        threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(_STOP)
+        for thread in threads:
+            thread.join()
+
+    def recover(self) -> int:
+        """
+        Queue attempts left pending by a previous run
+        Returns:
+            Number of attempts queued
+        """
+        queued, pending = self.sweep(older_than_seconds=0)
+        if pending:
+            logger.info("Recovered %d of %d pending quiz attempts", queued, pending)
+        return queued
+
+    def sweep(self, older_than_seconds: int) -> Tuple[int, int]:
+        """
+        Queue pending attempts submitted more than older_than_seconds ago
+        Returns:
+            (attempts queued, pending attempts found), at most one queue's worth
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=older_than_seconds)
+        db = self.session_factory()
+        try:
+            attempt_ids = [
+                attempt_id for (attempt_id,) in db.query(QuizAttempt.id).filter(
+                    QuizAttempt.is_completed == False,
+                    QuizAttempt.grading_failed == False,
+                    QuizAttempt.submitted_at.isnot(None),
+                    QuizAttempt.submitted_at <= cutoff
+                ).order_by(QuizAttempt.id).limit(self.max_size).all()
+            ]
+        finally:
+            db.close()
+
+        queued = 0
+        for attempt_id in attempt_ids:
+            if not self.submit(attempt_id):
+                # Queue full: the rest stays pending and is picked up by the next sweep
+                break
+            queued += 1
+        return queued, len(attempt_ids)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": len(self._threads),
+                "queued": self._queue.qsize(),
+                "enqueued": self.enqueued,
+                "rejected": self.rejected,
+                "graded": self.graded,
+                "batches": self.batches,
+                "failed_batches": self.failed_batches,
+                "failed_attempts": self.failed_attempts,
+                "swept": self.swept
+            }
+
+    def _sweep_loop(self) -> None:
+        while not self._stop_sweep.wait(self.sweep_interval):
+            try:
+                queued, _ = self.sweep(self.stale_seconds)
+            except Exception:
+                logger.exception("Sweeping pending quiz attempts failed")
+                continue
+            if queued:
+                logger.info("Queued %d quiz attempts pending for over %ds", queued, self.stale_seconds)
+                with self._lock:
+                    self.swept += queued
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+
+            # Drain whatever else is waiting, up to one batch
+            batch = [first]
+            stop_after = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop_after = True
+                    break
+                batch.append(item)
+
+            try:
+                self._grade_batch(batch)
+            finally:
+                with self._lock:
+                    self._queued.difference_update(batch)
+            if stop_after:
+                return
+
+    def _grade_batch(self, attempt_ids: List[int]) -> None:
+        db = self.session_factory()
+        try:
+            graded = QuizService.grade_pending_attempts(db, attempt_ids)
+            with self._lock:
+                self.graded += graded
+                self.batches += 1
+                for attempt_id in attempt_ids:
+                    self._failures.pop(attempt_id, None)
+            return
+        except Exception:
+            db.rollback()
+            logger.exception("Grading batch of %d attempts failed", len(attempt_ids))
+            with self._lock:
+                self.failed_batches += 1
+        finally:
+            db.close()
+
+        if len(attempt_ids) == 1:
+            self._record_failure(attempt_ids[0])
+            return
+        # Grade one by one so a single bad attempt does not hold back the rest
+        for attempt_id in attempt_ids:
+            self._grade_batch([attempt_id])
+
+    def _record_failure(self, attempt_id: int) -> None:
+        """Count a failed grading run; the attempt stays pending for the sweep until max_retries"""
+        with self._lock:
+            failures = self._failures.get(attempt_id, 0) + 1
+            if failures < self.max_retries:
+                self._failures[attempt_id] = failures
+                return
+            self._failures.pop(attempt_id, None)
+
+        db = self.session_factory()
+        try:
+            if QuizService.mark_attempts_failed(db, [attempt_id]):
+                logger.error("Gave up grading quiz attempt %d after %d failures", attempt_id, failures)
+                with self._lock:
+                    self.failed_attempts += 1
+        except Exception:
+            # Still pending: the sweep tries again and gets here once more
+            db.rollback()
+            logger.exception("Could not mark quiz attempt %d as failed", attempt_id)
+        finally:
+            db.close()
+
+
+grading_queue = GradingQueue(
+    workers=settings.GRADING_WORKERS,
+    max_size=settings.GRADING_QUEUE_SIZE,
+    batch_size=settings.GRADING_BATCH_SIZE,
+    sweep_interval=settings.GRADING_SWEEP_INTERVAL_SECONDS,
+    stale_seconds=settings.GRADING_STALE_SECONDS,
+    max_retries=settings.GRADING_MAX_RETRIES
+)
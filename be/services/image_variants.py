@@ -0,0 +1,162 @@
+"""
+Resized copies of uploaded images
+
+Each uploaded image gets WebP and JPEG variants at the configured widths,
+stored next to it as uploads/images/variants/<stem>/<width>.<webp|jpg> and
+served by GET /api/upload/images/<filename>/w/<width>.<webp|jpg>. Resizing
+is CPU bound, so it runs in a process pool: uploads schedule it in the
+background, and a request for a variant that does not exist yet (images
+uploaded before variants existed) generates it on the spot. Concurrent
+requests for the same image share one job.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Animated GIFs would lose their animation, so they are always served as-is
+VARIANT_SOURCE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+VARIANT_FORMATS = {"webp": "image/webp", "jpg": "image/jpeg"}
+
+VARIANT_WIDTHS = settings.get_image_variant_widths()
+
+_executor: Optional[ProcessPoolExecutor] = None
+# Source path -> job generating its variants
+_in_flight: Dict[str, asyncio.Future] = {}
+# Background jobs started by uploads, referenced until they finish
+_background: Set[asyncio.Task] = set()
+
+
+def has_variants(filename: str) -> bool:
+    """Whether variants are made for this kind of image"""
+    return Path(filename).suffix.lower() in VARIANT_SOURCE_EXTENSIONS
+
+
+def variants_dir(source: Path) -> Path:
+    return source.parent / "variants" / source.stem
+
+
+def variant_path(source: Path, width: int, variant_format: str) -> Path:
+    return variants_dir(source) / f"{width}.{variant_format}"
+
+
+def variant_metadata(url: str) -> dict:
+    """srcset strings for the variants of the image at url"""
+    return {
+        "widths": VARIANT_WIDTHS,
+        "srcset": {
+            variant_format: ", ".join(f"{url}/w/{width}.{variant_format} {width}w" for width in VARIANT_WIDTHS)
+            for variant_format in VARIANT_FORMATS
+        }
+    }
+
+
+def _save(image, path: Path, image_format: str, **options) -> None:
+    """Write an image under a temporary name and rename it, so readers never see half a file"""
+    temp_path = path.with_name(f".{uuid.uuid4().hex}.part")
+    try:
+        image.save(temp_path, image_format, **options)
+        os.replace(temp_path, path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+def render_variants(source: str, target_dir: str, widths: List[int], quality: int) -> int:
+    """
+    Write the WebP and JPEG variants of one image (runs in a worker process)
+    Images are never upscaled: widths above the original reuse its size.
+    Returns:
+        Number of files written
+    """
+    from PIL import Image, ImageOps
+
+    target = Path(target_dir)
+    target.mkdir(parents=True, exist_ok=True)
+    with Image.open(source) as image:
+        # JPEGs can be decoded directly at a reduced scale, much cheaper than full size
+        image.draft("RGB", (max(widths), max(widths)))
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    written = 0
+    for width in widths:
+        if width < image.width:
+            resized = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        else:
+            resized = image
+        _save(resized, target / f"{width}.webp", "WEBP", quality=quality, method=4)
+
+        if has_alpha:
+            flattened = Image.new("RGB", resized.size, (255, 255, 255))
+            flattened.paste(resized, mask=resized.getchannel("A"))
+            resized = flattened
+        _save(resized, target / f"{width}.jpg", "JPEG", quality=quality, optimize=True, progressive=True)
+        written += 2
+    return written
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # Spawned rather than forked: the API process runs background threads
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_VARIANT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+async def ensure_variants(source: Path) -> None:
+    """
+    Generate the variants of an image unless a job for it is already running
+    Raises:
+        Whatever Pillow raised for an unreadable image
+    """
+    key = str(source)
+    job = _in_flight.get(key)
+    if job is None:
+        job = asyncio.wrap_future(_get_executor().submit(
+            render_variants, key, str(variants_dir(source)), VARIANT_WIDTHS, settings.IMAGE_VARIANT_QUALITY
+        ))
+        _in_flight[key] = job
+        job.add_done_callback(lambda _: _in_flight.pop(key, None))
+    # A cancelled request must not cancel the job other requests wait on
+    await asyncio.shield(job)
+
+
+def _log_failure(task: asyncio.Task) -> None:
+    _background.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Generating variants failed", exc_info=task.exception())
+
+
+def schedule_variants(source: Path) -> None:
+    """Start generating the variants of a new upload without waiting for them"""
+    task = asyncio.create_task(ensure_variants(source))
+    _background.add(task)
+    task.add_done_callback(_log_failure)
+
+
+def remove_variants(source: Path) -> None:
+    """Delete the variants of a deleted image"""
+    directory = variants_dir(source)
+    if directory.is_dir():
+        for path in directory.iterdir():
+            path.unlink(missing_ok=True)
+        directory.rmdir()
+
+
+def shutdown_variant_executor() -> None:
+    """Stop the image worker pool"""
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
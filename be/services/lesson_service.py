@@ -2,12 +2,26 @@
 Lesson service
 """
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from typing import List, Optional
+from datetime import datetime
+import json
 
+from core.config import settings
 from entities.lesson import Lesson
 from entities.student_progress import StudentProgress
 from schemas.lesson import LessonCreate, LessonUpdate, LessonResponse, LessonWithProgress
+from services.progress_buffer import PendingProgress, progress_buffer
+from services.dashboard_rollups import (
+    ProgressChange, ProgressState, apply_committed_changes, record_progress_changes
+)
+from utils.singleflight import SingleFlight
+
+# Concurrent reads of the same lesson (e.g. a whole class opening it) share one load
+lesson_flight = SingleFlight(name="lessons", enabled=settings.SINGLE_FLIGHT_ENABLED)
 
 
 class LessonService:
@@ -52,6 +66,28 @@ class LessonService:
             )
         return lesson
 
+    @staticmethod
+    def get_lesson_response(db: Session, lesson_id: int) -> LessonResponse:
+        """Get lesson by ID as a session-independent response model"""
+        return LessonResponse.model_validate(LessonService.get_lesson(db, lesson_id))
+
+    @staticmethod
+    async def get_lesson_shared(db: AsyncSession, lesson_id: int) -> LessonResponse:
+        """
+        Get lesson by ID, sharing one load between concurrent identical requests
+        Args:
+            db: Async database session (only the leading request's session is used)
+            lesson_id: Lesson ID
+        Returns:
+            Lesson response model
+        Raises:
+            HTTPException: If lesson not found
+        """
+        return await lesson_flight.do_async(
+            lesson_id,
+            lambda: db.run_sync(LessonService.get_lesson_response, lesson_id)
+        )
+
     @staticmethod
     def get_lesson_by_slug(db: Session, slug: str) -> Lesson:
         """Get lesson by slug"""
@@ -116,42 +152,58 @@ class LessonService:
         Returns:
             List of lessons with progress data
         """
-        query = db.query(Lesson).filter(Lesson.is_published == True)
+        # Single round trip: LEFT OUTER JOIN the student's progress rows onto the
+        # lesson page instead of querying StudentProgress once per lesson
+        query = db.query(
+            Lesson,
+            StudentProgress.progress_percentage,
+            StudentProgress.is_completed,
+            StudentProgress.completed_sections
+        ).outerjoin(
+            StudentProgress,
+            and_(
+                StudentProgress.lesson_id == Lesson.id,
+                StudentProgress.user_id == user_id
+            )
+        ).filter(Lesson.is_published == True)
 
         if grade is not None:
             query = query.filter(Lesson.grade == grade)
 
-        lessons = query.order_by(Lesson.order, Lesson.created_at.desc()).offset(skip).limit(limit).all()
+        rows = query.order_by(Lesson.order, Lesson.created_at.desc()).offset(skip).limit(limit).all()
 
-        # Get progress for each lesson
-        result = []
-        for lesson in lessons:
-            progress = db.query(StudentProgress).filter(
-                StudentProgress.user_id == user_id,
-                StudentProgress.lesson_id == lesson.id
-            ).first()
-
-            lesson_data = LessonWithProgress.from_orm(lesson)
-            if progress:
-                lesson_data.progress = progress.progress_percentage
-                lesson_data.is_completed = progress.is_completed
-
-                # Parse completed sections if available
-                if progress.completed_sections:
-                    import json
-                    try:
-                        lesson_data.completed_sections = json.loads(progress.completed_sections)
-                    except:
-                        lesson_data.completed_sections = []
-                else:
-                    lesson_data.completed_sections = []
-            else:
-                lesson_data.completed_sections = []
+        # Heartbeats still waiting in the write-behind buffer are newer than the rows
+        pending = progress_buffer.pending_for_user(user_id)
 
+        result = []
+        for lesson, progress_percentage, is_completed, completed_sections in rows:
+            lesson_data = LessonWithProgress.model_validate(lesson)
+            if progress_percentage is not None:
+                lesson_data.progress = progress_percentage
+                lesson_data.is_completed = bool(is_completed)
+            lesson_data.completed_sections = LessonService._parse_completed_sections(completed_sections)
+
+            buffered = pending.get(lesson.id)
+            if buffered is not None:
+                lesson_data.progress = max(lesson_data.progress, buffered.progress_percentage)
+                lesson_data.is_completed = lesson_data.is_completed or buffered.is_completed
+                if buffered.completed_sections is not None:
+                    lesson_data.completed_sections = buffered.completed_sections
             result.append(lesson_data)
 
         return result
 
+    @staticmethod
+    def _parse_completed_sections(raw: Optional[str]) -> List[int]:
+        """Parse the JSON-encoded completed section list stored on StudentProgress"""
+        if not raw:
+            return []
+        try:
+            sections = json.loads(raw)
+        except (TypeError, ValueError):
+            return []
+        return sections if isinstance(sections, list) else []
+
     @staticmethod
     def update_lesson(db: Session, lesson_id: int, lesson_data: LessonUpdate) -> Lesson:
         """Update lesson"""
@@ -196,37 +248,80 @@ class LessonService:
         Returns:
             Updated or created StudentProgress
         """
-        # Get or create progress record
-        progress = db.query(StudentProgress).filter(
-            StudentProgress.user_id == user_id,
-            StudentProgress.lesson_id == lesson_id
-        ).first()
-
-        if not progress:
-            progress = StudentProgress(
-                user_id=user_id,
-                lesson_id=lesson_id
-            )
-            db.add(progress)
-
-        # Update progress
-        progress.progress_percentage = min(progress_percentage, 100.0)
-        progress.is_completed = progress.progress_percentage >= 100.0
-
-        # Update completed sections if provided
-        if completed_sections is not None:
-            import json
-            progress.completed_sections = json.dumps(completed_sections)
-
-        # Update time spent if provided
-        if time_spent is not None:
-            progress.time_spent = time_spent
-
-        if progress.is_completed and not progress.completed_at:
-            from datetime import datetime
-            progress.completed_at = datetime.utcnow()
+        # The unique (user_id, lesson_id) constraint turns a concurrent
+        # get-or-create race into an IntegrityError; retry once onto the winner's row
+        for attempt in range(2):
+            # Get or create progress record
+            progress = db.query(StudentProgress).filter(
+                StudentProgress.user_id == user_id,
+                StudentProgress.lesson_id == lesson_id
+            ).with_for_update().first()
+
+            old_state = ProgressState.of(progress) if progress else None
+            if not progress:
+                progress = StudentProgress(
+                    user_id=user_id,
+                    lesson_id=lesson_id
+                )
+                db.add(progress)
+
+            # Update progress
+            progress.progress_percentage = min(progress_percentage, 100.0)
+            progress.is_completed = progress.progress_percentage >= 100.0
+
+            # Update completed sections if provided
+            if completed_sections is not None:
+                progress.completed_sections = json.dumps(completed_sections)
+
+            # Update time spent if provided
+            if time_spent is not None:
+                progress.time_spent = time_spent
+
+            if progress.is_completed and not progress.completed_at:
+                progress.completed_at = datetime.utcnow()
+
+            try:
+                db.flush()
+                record_progress_changes(db, [
+                    ProgressChange(user_id, lesson_id, old_state, ProgressState.of(progress))
+                ])
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                if attempt:
+                    raise
+                continue
+
+            apply_committed_changes(db)
+            db.refresh(progress)
+            return progress
 
-        db.commit()
-        db.refresh(progress)
+    @staticmethod
+    def merge_stored_progress(db: Session, pending: PendingProgress) -> dict:
+        """
+        Progress a buffered heartbeat reports back: the pending snapshot merged
+        with the stored row, as the flush will write it
+        """
+        stored = db.query(
+            StudentProgress.progress_percentage,
+            StudentProgress.is_completed,
+            StudentProgress.time_spent
+        ).filter(
+            StudentProgress.user_id == pending.user_id,
+            StudentProgress.lesson_id == pending.lesson_id
+        ).first()
 
-        return progress
+        progress_percentage = pending.progress_percentage
+        is_completed = pending.is_completed
+        time_spent = pending.time_spent
+        if stored is not None:
+            progress_percentage = max(progress_percentage, stored.progress_percentage or 0.0)
+            is_completed = is_completed or bool(stored.is_completed)
+            if time_spent is None:
+                time_spent = stored.time_spent
+
+        return {
+            "progress_percentage": progress_percentage,
+            "is_completed": is_completed,
+            "time_spent": time_spent if time_spent is not None else 0
+        }
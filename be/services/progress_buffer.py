@@ -0,0 +1,435 @@
+"""
+Write-behind buffer for lesson progress heartbeats
+
+Students post progress many times while watching a lesson. Instead of a
+get-or-create, update and commit per request, the latest state per
+(user, lesson) is kept in memory and flushed in batched upserts on an
+interval or when too many keys are pending.
+
+A flush that fails because the database is unreachable keeps every entry
+for the next flush. A batch the database rejects is written again row by
+row: a row that violates a constraint (e.g. its lesson was deleted) is
+dropped, any other rejected row is retried with the next flushes and
+dropped, with its content logged, after max_retries failed writes.
+"""
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, tuple_
+from sqlalchemy.exc import DBAPIError, IntegrityError, OperationalError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.database import SessionLocal
+from entities.student_progress import StudentProgress
+from services.dashboard_rollups import (
+    ProgressChange, ProgressState, apply_committed_changes, record_progress_changes
+)
+
+logger = logging.getLogger(__name__)
+
+ProgressKey = Tuple[int, int]  # (user_id, lesson_id)
+
+
+def _is_transient(error: SQLAlchemyError) -> bool:
+    """True if the write may succeed unchanged later: database unreachable, connection lost, deadlock"""
+    return isinstance(error, OperationalError) or (
+        isinstance(error, DBAPIError) and error.connection_invalidated
+    )
+
+
+class PendingProgress:
+    """Latest not-yet-persisted progress of one student on one lesson"""
+    __slots__ = (
+        "user_id", "lesson_id", "progress_percentage", "completed_sections",
+        "time_spent", "completed_at", "last_accessed", "failures"
+    )
+
+    def __init__(self, user_id: int, lesson_id: int):
+        self.user_id = user_id
+        self.lesson_id = lesson_id
+        self.progress_percentage = 0.0
+        self.completed_sections: Optional[List[int]] = None
+        self.time_spent: Optional[int] = None
+        self.completed_at: Optional[datetime] = None
+        self.last_accessed: Optional[datetime] = None
+        self.failures = 0  # Writes the database rejected
+
+    @property
+    def is_completed(self) -> bool:
+        return self.progress_percentage >= 100.0
+
+    def apply(
+        self,
+        progress_percentage: float,
+        completed_sections: Optional[List[int]] = None,
+        time_spent: Optional[int] = None,
+        at: Optional[datetime] = None
+    ) -> None:
+        """Merge a heartbeat: progress only grows, optional fields keep their latest value"""
+        at = at or datetime.utcnow()
+        self.progress_percentage = max(self.progress_percentage, min(progress_percentage, 100.0))
+        if completed_sections is not None:
+            self.completed_sections = completed_sections
+        if time_spent is not None:
+            self.time_spent = time_spent
+        if self.is_completed and self.completed_at is None:
+            self.completed_at = at
+        self.last_accessed = at
+
+    def merge_older(self, older: "PendingProgress") -> None:
+        """Fold in an older entry for the same key (used when a failed flush is requeued)"""
+        self.progress_percentage = max(self.progress_percentage, older.progress_percentage)
+        if self.completed_sections is None:
+            self.completed_sections = older.completed_sections
+        if self.time_spent is None:
+            self.time_spent = older.time_spent
+        if older.completed_at is not None:
+            self.completed_at = older.completed_at
+        self.failures = max(self.failures, older.failures)
+
+    def copy(self) -> "PendingProgress":
+        clone = PendingProgress(self.user_id, self.lesson_id)
+        for field in self.__slots__:
+            setattr(clone, field, getattr(self, field))
+        return clone
+
+
+class ProgressBuffer:
+    """In-memory, periodically flushed store of progress heartbeats"""
+
+    def __init__(
+        self,
+        flush_interval: float,
+        max_pending: int,
+        batch_size: int,
+        max_retries: int,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.session_factory = session_factory
+        self._pending: Dict[ProgressKey, PendingProgress] = {}
+        self._inflight: Dict[ProgressKey, PendingProgress] = {}  # Taken by a flush, not yet committed
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self.recorded = 0
+        self.rows_written = 0
+        self.flushes = 0
+        self.dropped = 0
+
+    def record(
+        self,
+        user_id: int,
+        lesson_id: int,
+        progress_percentage: float,
+        completed_sections: Optional[List[int]] = None,
+        time_spent: Optional[int] = None
+    ) -> PendingProgress:
+        """
+        Buffer a progress heartbeat
+        Returns:
+            Snapshot of the merged pending state for (user_id, lesson_id)
+        """
+        with self._lock:
+            key = (user_id, lesson_id)
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = self._pending[key] = PendingProgress(user_id, lesson_id)
+            entry.apply(progress_percentage, completed_sections, time_spent)
+            self.recorded += 1
+            snapshot = entry.copy()
+            should_flush = len(self._pending) >= self.max_pending
+
+        if should_flush:
+            self._wakeup.set()
+        return snapshot
+
+    def pending_for_user(self, user_id: int) -> Dict[int, PendingProgress]:
+        """Unflushed entries of a student, keyed by lesson_id (for read-your-writes)"""
+        with self._lock:
+            entries = {
+                lesson_id: entry.copy()
+                for (entry_user_id, lesson_id), entry in self._inflight.items()
+                if entry_user_id == user_id
+            }
+            for (entry_user_id, lesson_id), entry in self._pending.items():
+                if entry_user_id != user_id:
+                    continue
+                newer = entry.copy()
+                if lesson_id in entries:
+                    newer.merge_older(entries[lesson_id])
+                entries[lesson_id] = newer
+            return entries
+
+    def flush(self) -> int:
+        """
+        Persist all pending entries
+        Returns:
+            Number of rows written
+        """
+        with self._flush_lock:
+            with self._lock:
+                # Still visible to pending_for_user until committed or requeued
+                self._inflight, self._pending = self._pending, {}
+                entries = list(self._inflight.values())
+
+            written = 0
+            try:
+                for start in range(0, len(entries), self.batch_size):
+                    batch = entries[start:start + self.batch_size]
+                    try:
+                        written += self._write_batch(batch)
+                    except SQLAlchemyError:
+                        # Database unavailable: keep everything not yet written for the next flush
+                        logger.exception("Progress flush failed, requeueing %d entries", len(entries) - start)
+                        self._requeue(entries[start:])
+                        break
+                    self._settle(batch)
+            finally:
+                with self._lock:
+                    self._inflight = {}
+
+            self.flushes += 1
+            self.rows_written += written
+            return written
+
+    def start(self) -> None:
+        """Start the background flush thread"""
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="progress-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flush thread and write everything still pending"""
+        if self._thread is not None:
+            self._stopping = True
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "recorded": self.recorded,
+            "rows_written": self.rows_written,
+            "flushes": self.flushes,
+            "dropped": self.dropped
+        }
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopping:
+                break
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Unexpected error while flushing progress")
+
+    def _settle(self, batch: List[PendingProgress]) -> None:
+        """Forget a batch's in-flight entries once they are committed or requeued"""
+        with self._lock:
+            for entry in batch:
+                self._inflight.pop((entry.user_id, entry.lesson_id), None)
+
+    def _requeue(self, entries: Iterable[PendingProgress]) -> None:
+        with self._lock:
+            for entry in entries:
+                key = (entry.user_id, entry.lesson_id)
+                self._inflight.pop(key, None)
+                newer = self._pending.get(key)
+                if newer is None:
+                    self._pending[key] = entry
+                else:
+                    newer.merge_older(entry)
+
+    def _write_batch(self, batch: List[PendingProgress]) -> int:
+        """
+        Upsert a batch, falling back to one row at a time if the database rejects it
+        Raises:
+            SQLAlchemyError: If the error is transient; the caller requeues the entries
+        """
+        db = self.session_factory()
+        try:
+            try:
+                upsert_progress(db, batch)
+                db.commit()
+                return len(batch)
+            except SQLAlchemyError as error:
+                db.rollback()
+                if _is_transient(error):
+                    raise
+
+            written = 0
+            for entry in batch:
+                try:
+                    upsert_progress(db, [entry])
+                    db.commit()
+                    written += 1
+                except SQLAlchemyError as error:
+                    db.rollback()
+                    if _is_transient(error):
+                        raise
+                    self._reject(entry, error)
+            return written
+        finally:
+            # Rollup deltas of whatever was committed, once for the whole batch
+            apply_committed_changes(db)
+            db.close()
+
+
+    def _reject(self, entry: PendingProgress, error: SQLAlchemyError) -> None:
+        """Requeue an entry the database rejected, or drop it if that will not change"""
+        if not isinstance(error, IntegrityError):
+            entry.failures += 1
+            if entry.failures < self.max_retries:
+                logger.warning(
+                    "Progress for user %s lesson %s rejected by database (%d of %d tries): %s",
+                    entry.user_id, entry.lesson_id, entry.failures, self.max_retries, error
+                )
+                self._requeue([entry])
+                return
+
+        # Logged in full so the write can be replayed by hand
+        logger.error(
+            "Dropping progress for user %s lesson %s, rejected by database: %s; entry: %s",
+            entry.user_id, entry.lesson_id, error,
+            {field: getattr(entry, field) for field in PendingProgress.__slots__}
+        )
+        with self._lock:
+            self.dropped += 1
+
+
+def upsert_progress(db: Session, entries: List[PendingProgress]) -> None:
+    """
+    Batched INSERT ... ON CONFLICT/DUPLICATE KEY UPDATE of progress rows
+
+    Keeps progress_percentage and completed_at monotonic against the stored
+    row. Relies on the unique (user_id, lesson_id) constraint. The affected
+    rows are locked and read first so the dashboard rollups get their deltas.
+    """
+    current = {
+        (row.user_id, row.lesson_id): ProgressState.of(row)
+        for row in db.query(
+            StudentProgress.user_id, StudentProgress.lesson_id, StudentProgress.progress_percentage,
+            StudentProgress.is_completed, StudentProgress.time_spent, StudentProgress.quiz_score
+        ).filter(
+            tuple_(StudentProgress.user_id, StudentProgress.lesson_id).in_(
+                [(entry.user_id, entry.lesson_id) for entry in entries]
+            )
+        ).with_for_update()
+    }
+    changes = []
+    for entry in entries:
+        old = current.get((entry.user_id, entry.lesson_id))
+        # Same merge as the upsert below
+        new = ProgressState(
+            max(old.progress_percentage if old else 0.0, entry.progress_percentage),
+            bool((old and old.is_completed) or entry.is_completed),
+            entry.time_spent if entry.time_spent is not None else (old.time_spent if old else 0),
+            old.quiz_score if old else None
+        )
+        changes.append(ProgressChange(entry.user_id, entry.lesson_id, old, new))
+
+    # Rows are grouped by which optional columns they carry, so a heartbeat
+    # without time_spent/completed_sections never overwrites the stored value
+    groups: Dict[Tuple[bool, bool], List[dict]] = {}
+    for entry in entries:
+        row = {
+            "user_id": entry.user_id,
+            "lesson_id": entry.lesson_id,
+            "progress_percentage": entry.progress_percentage,
+            "is_completed": entry.is_completed,
+            "completed_at": entry.completed_at,
+            "last_accessed": entry.last_accessed
+        }
+        if entry.completed_sections is not None:
+            row["completed_sections"] = json.dumps(entry.completed_sections)
+        if entry.time_spent is not None:
+            row["time_spent"] = entry.time_spent
+        shape = ("completed_sections" in row, "time_spent" in row)
+        groups.setdefault(shape, []).append(row)
+
+    dialect = db.get_bind().dialect.name
+    table = StudentProgress.__table__
+
+    for (has_sections, has_time), rows in groups.items():
+        if dialect == "mysql":
+            from sqlalchemy.dialects.mysql import insert
+            stmt = insert(table).values(rows)
+            new = stmt.inserted
+            greatest = func.greatest
+        elif dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+                greatest = func.greatest
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+                greatest = func.max
+            stmt = insert(table).values(rows)
+            new = stmt.excluded
+        else:
+            _merge_progress_orm(db, rows)
+            continue
+
+        updates = {
+            "progress_percentage": greatest(table.c.progress_percentage, new.progress_percentage),
+            "is_completed": greatest(table.c.is_completed, new.is_completed),
+            "completed_at": func.coalesce(table.c.completed_at, new.completed_at),
+            "last_accessed": new.last_accessed
+        }
+        if has_sections:
+            updates["completed_sections"] = new.completed_sections
+        if has_time:
+            updates["time_spent"] = new.time_spent
+
+        if dialect == "mysql":
+            stmt = stmt.on_duplicate_key_update(updates)
+        else:
+            stmt = stmt.on_conflict_do_update(index_elements=["user_id", "lesson_id"], set_=updates)
+        db.execute(stmt)
+
+    record_progress_changes(db, changes)
+
+
+def _merge_progress_orm(db: Session, rows: List[dict]) -> None:
+    """Portable fallback for dialects without an upsert statement"""
+    for row in rows:
+        progress = db.query(StudentProgress).filter(
+            StudentProgress.user_id == row["user_id"],
+            StudentProgress.lesson_id == row["lesson_id"]
+        ).first()
+        if not progress:
+            db.add(StudentProgress(**row))
+            continue
+        progress.progress_percentage = max(progress.progress_percentage or 0.0, row["progress_percentage"])
+        progress.is_completed = bool(progress.is_completed or row["is_completed"])
+        progress.completed_at = progress.completed_at or row["completed_at"]
+        progress.last_accessed = row["last_accessed"]
+        if "completed_sections" in row:
+            progress.completed_sections = row["completed_sections"]
+        if "time_spent" in row:
+            progress.time_spent = row["time_spent"]
+
+
+progress_buffer = ProgressBuffer(
+    flush_interval=settings.PROGRESS_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.PROGRESS_FLUSH_MAX_PENDING,
+    batch_size=settings.PROGRESS_FLUSH_BATCH_SIZE,
+    max_retries=settings.PROGRESS_FLUSH_MAX_RETRIES
+)
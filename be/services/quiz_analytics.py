@@ -0,0 +1,301 @@
+"""
+Item analysis over quiz attempts
+
+Per-question difficulty (p-value), discrimination (point-biserial correlation
+between answering correctly and the total score), distractor frequencies and
+the score distribution are served from counters instead of scanning attempts:
+
+- quiz_score_stats: attempt count, sum and sum of squares of scores
+- quiz_question_stats: responses, correct answers and score sum of the correct
+- quiz_option_stats: how often each option was chosen
+- quiz_score_buckets: 10-point score histogram
+
+Graded attempts add their increments in a short transaction right after the
+grading commit. `recompute` rebuilds everything from quiz_attempts with the
+same NumPy code, to repair drift or after a regrade.
+"""
+import logging
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import and_, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, selectinload
+
+from core.config import settings
+from entities.quiz import Quiz, QuizAttempt, QuizQuestion
+from entities.quiz_analytics import QuizScoreStats, QuizQuestionStats, QuizOptionStats, QuizScoreBucket
+from services.answer_key import AnswerKey
+from services.answer_matrix import NO_ANSWER, AnswerMatrixBuilder, correctness
+
+logger = logging.getLogger(__name__)
+
+SCORE_BUCKETS = 10
+
+GradedAttempt = Tuple[int, Optional[Dict[Any, Any]], float]  # (attempt_id, answers JSON, score)
+
+
+class AnalyticsDeltas:
+    """Counter increments accumulated from graded attempts of one quiz"""
+
+    def __init__(self, builder: AnswerMatrixBuilder):
+        self.builder = builder
+        self.quiz_id = builder.answer_key.quiz_id
+        questions = len(builder.question_ids)
+        self.attempt_count = 0
+        self.sum_score = 0.0
+        self.sum_score_sq = 0.0
+        self.response_count = np.zeros(questions, dtype=np.int64)
+        self.correct_count = np.zeros(questions, dtype=np.int64)
+        self.sum_score_correct = np.zeros(questions, dtype=np.float64)
+        self.option_counts: Dict[Tuple[int, int], int] = {}  # (question_id, answer_id) -> count
+        self.buckets = np.zeros(SCORE_BUCKETS, dtype=np.int64)
+        # Only real options of a question are counted (answers JSON is client input)
+        self._valid_options = [
+            np.array(question.answer_ids, dtype=np.int64) if builder.is_choice[column] else None
+            for column, question in enumerate(builder.answer_key.questions)
+        ]
+
+    def add(self, attempts: Sequence[GradedAttempt]) -> None:
+        """Encode a chunk of graded attempts and fold it into the increments"""
+        if not attempts:
+            return
+        matrix = self.builder.build([(attempt_id, answers) for attempt_id, answers, _ in attempts])
+        scores = np.array([score or 0.0 for _, _, score in attempts], dtype=np.float64)
+        self.add_matrix(matrix.responses, correctness(matrix), scores)
+
+    def add_matrix(self, responses: np.ndarray, correct: np.ndarray, scores: np.ndarray) -> None:
+        """Fold an already encoded chunk (responses, correctness, scores) into the increments"""
+        answered = responses != NO_ANSWER
+        self.attempt_count += len(scores)
+        self.sum_score += float(scores.sum())
+        self.sum_score_sq += float(scores @ scores)
+        self.response_count += answered.sum(axis=0)
+        self.correct_count += correct.sum(axis=0)
+        self.sum_score_correct += scores @ correct.astype(np.float64)
+
+        for column, valid in enumerate(self._valid_options):
+            if valid is None or not valid.size:
+                continue
+            chosen = responses[:, column]
+            chosen = chosen[np.isin(chosen, valid)]
+            if not chosen.size:
+                continue
+            question_id = self.builder.question_ids[column]
+            answer_ids, counts = np.unique(chosen, return_counts=True)
+            for answer_id, count in zip(answer_ids.tolist(), counts.tolist()):
+                key = (question_id, answer_id)
+                self.option_counts[key] = self.option_counts.get(key, 0) + count
+
+        buckets = np.clip((scores // (100 / SCORE_BUCKETS)).astype(np.int64), 0, SCORE_BUCKETS - 1)
+        self.buckets += np.bincount(buckets, minlength=SCORE_BUCKETS)
+
+
+def _increment(db: Session, table, rows: List[dict], keys: Tuple[str, ...], counters: Tuple[str, ...]) -> None:
+    """INSERT ... ON CONFLICT/DUPLICATE KEY UPDATE counter = counter + delta"""
+    if not rows:
+        return
+    # Fixed key order keeps concurrent writers from deadlocking on the counter rows
+    rows = sorted(rows, key=lambda row: tuple(row[key] for key in keys))
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        stmt = dialect_insert(table).values(rows)
+        stmt = stmt.on_duplicate_key_update({
+            counter: table.c[counter] + stmt.inserted[counter] for counter in counters
+        })
+    elif dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(index_elements=list(keys), set_={
+            counter: table.c[counter] + stmt.excluded[counter] for counter in counters
+        })
+    else:
+        # Portable fallback for dialects without an upsert statement
+        for row in rows:
+            match = and_(*(table.c[key] == row[key] for key in keys))
+            if db.execute(select(table.c[keys[0]]).where(match).with_for_update()).first():
+                db.execute(update(table).where(match).values({
+                    counter: table.c[counter] + row[counter] for counter in counters
+                }))
+            else:
+                db.execute(insert(table).values(row))
+        return
+    db.execute(stmt)
+
+
+class QuizAnalyticsService:
+    """Service for quiz item analysis"""
+
+    @staticmethod
+    def apply(db: Session, deltas: AnalyticsDeltas) -> None:
+        """Add accumulated increments to the counter tables (caller commits)"""
+        if not deltas.attempt_count:
+            return
+        quiz_id = deltas.quiz_id
+        question_ids = deltas.builder.question_ids
+
+        _increment(db, QuizScoreStats.__table__, [{
+            "quiz_id": quiz_id,
+            "attempt_count": deltas.attempt_count,
+            "sum_score": deltas.sum_score,
+            "sum_score_sq": deltas.sum_score_sq
+        }], ("quiz_id",), ("attempt_count", "sum_score", "sum_score_sq"))
+
+        _increment(db, QuizQuestionStats.__table__, [
+            {
+                "quiz_id": quiz_id,
+                "question_id": question_id,
+                "response_count": int(deltas.response_count[column]),
+                "correct_count": int(deltas.correct_count[column]),
+                "sum_score_correct": float(deltas.sum_score_correct[column])
+            }
+            for column, question_id in enumerate(question_ids)
+        ], ("quiz_id", "question_id"), ("response_count", "correct_count", "sum_score_correct"))
+
+        _increment(db, QuizOptionStats.__table__, [
+            {"quiz_id": quiz_id, "question_id": question_id, "answer_id": answer_id, "count": count}
+            for (question_id, answer_id), count in deltas.option_counts.items()
+        ], ("quiz_id", "question_id", "answer_id"), ("count",))
+
+        _increment(db, QuizScoreBucket.__table__, [
+            {"quiz_id": quiz_id, "bucket": bucket, "count": int(count)}
+            for bucket, count in enumerate(deltas.buckets) if count
+        ], ("quiz_id", "bucket"), ("count",))
+
+    @staticmethod
+    def record_attempts(db: Session, answer_key: AnswerKey, attempts: Sequence[GradedAttempt]) -> None:
+        """
+        Add freshly graded attempts of one quiz to its counters, in their own transaction
+        Runs after the grading commit; a failure only leaves the counters behind
+        until the next recompute.
+        """
+        try:
+            deltas = AnalyticsDeltas(AnswerMatrixBuilder(answer_key))
+            deltas.add(attempts)
+            QuizAnalyticsService.apply(db, deltas)
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            logger.exception("Could not update analytics of quiz %s", answer_key.quiz_id)
+
+    @staticmethod
+    def clear(db: Session, quiz_id: int) -> None:
+        """Remove all counters of a quiz (caller commits)"""
+        for entity in (QuizScoreStats, QuizQuestionStats, QuizOptionStats, QuizScoreBucket):
+            db.query(entity).filter(entity.quiz_id == quiz_id).delete(synchronize_session=False)
+
+    @staticmethod
+    def replace(db: Session, deltas: AnalyticsDeltas) -> None:
+        """Swap a quiz's counters for freshly computed totals in one transaction"""
+        QuizAnalyticsService.clear(db, deltas.quiz_id)
+        QuizAnalyticsService.apply(db, deltas)
+        db.commit()
+
+    @staticmethod
+    def recompute(db: Session, answer_key: AnswerKey, chunk_size: int = settings.REGRADE_CHUNK_SIZE) -> int:
+        """
+        Rebuild a quiz's counters from all of its completed attempts
+        Returns:
+            Number of attempts analysed
+        """
+        deltas = AnalyticsDeltas(AnswerMatrixBuilder(answer_key))
+        last_id = 0
+        while True:
+            rows = db.query(QuizAttempt.id, QuizAttempt.answers, QuizAttempt.score).filter(
+                QuizAttempt.quiz_id == answer_key.quiz_id,
+                QuizAttempt.is_completed == True,
+                QuizAttempt.id > last_id
+            ).order_by(QuizAttempt.id).limit(chunk_size).all()
+            if not rows:
+                break
+            deltas.add([(row.id, row.answers, row.score) for row in rows])
+            last_id = rows[-1].id
+
+        QuizAnalyticsService.replace(db, deltas)
+        return deltas.attempt_count
+
+    @staticmethod
+    def get_analytics(db: Session, quiz: Quiz) -> Dict[str, Any]:
+        """
+        Item analysis of a quiz, read from the counters
+        Cost depends on the number of questions and options, not on attempts.
+        """
+        score_stats = db.get(QuizScoreStats, quiz.id)
+        attempt_count = score_stats.attempt_count if score_stats else 0
+        mean = stddev = 0.0
+        if attempt_count:
+            mean = score_stats.sum_score / attempt_count
+            stddev = math.sqrt(max(score_stats.sum_score_sq / attempt_count - mean * mean, 0.0))
+
+        question_stats = {
+            row.question_id: row
+            for row in db.query(QuizQuestionStats).filter(QuizQuestionStats.quiz_id == quiz.id)
+        }
+        option_counts = {
+            (row.question_id, row.answer_id): row.count
+            for row in db.query(QuizOptionStats).filter(QuizOptionStats.quiz_id == quiz.id)
+        }
+        bucket_counts = {
+            row.bucket: row.count
+            for row in db.query(QuizScoreBucket).filter(QuizScoreBucket.quiz_id == quiz.id)
+        }
+        questions = db.query(QuizQuestion).options(selectinload(QuizQuestion.answers)).filter(
+            QuizQuestion.quiz_id == quiz.id
+        ).order_by(QuizQuestion.order, QuizQuestion.id).all()
+
+        items = []
+        for question in questions:
+            stats = question_stats.get(question.id)
+            response_count = stats.response_count if stats else 0
+            correct_count = stats.correct_count if stats else 0
+            p_value = correct_count / attempt_count if attempt_count else None
+
+            discrimination = None
+            if p_value is not None and 0 < p_value < 1 and stddev > 0:
+                mean_correct = stats.sum_score_correct / correct_count
+                discrimination = (mean_correct - mean) / stddev * math.sqrt(p_value / (1 - p_value))
+
+            items.append({
+                "question_id": question.id,
+                "question_text": question.question_text,
+                "question_type": question.question_type,
+                "response_count": response_count,
+                "skipped_count": attempt_count - response_count,
+                "correct_count": correct_count,
+                "p_value": round(p_value, 4) if p_value is not None else None,
+                "discrimination": round(discrimination, 4) if discrimination is not None else None,
+                "options": [
+                    {
+                        "answer_id": answer.id,
+                        "answer_text": answer.answer_text,
+                        "is_correct": answer.is_correct,
+                        "count": option_counts.get((question.id, answer.id), 0),
+                        "frequency": round(option_counts.get((question.id, answer.id), 0) / attempt_count, 4)
+                        if attempt_count else 0.0
+                    }
+                    for answer in sorted(question.answers, key=lambda answer: (answer.order, answer.id))
+                ]
+            })
+
+        width = 100 // SCORE_BUCKETS
+        return {
+            "quiz_id": quiz.id,
+            "attempt_count": attempt_count,
+            "average_score": round(mean, 2),
+            "score_stddev": round(stddev, 2),
+            "score_distribution": [
+                {
+                    "range_start": bucket * width,
+                    "range_end": 100 if bucket == SCORE_BUCKETS - 1 else (bucket + 1) * width,
+                    "count": bucket_counts.get(bucket, 0)
+                }
+                for bucket in range(SCORE_BUCKETS)
+            ],
+            "questions": items
+        }
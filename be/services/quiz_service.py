@@ -1,17 +1,59 @@
 """
 Quiz service - business logic for quiz operations
 """
-from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional, Dict, Any, NamedTuple, Tuple
 from datetime import datetime
+from itertools import groupby
+import hashlib
+import json
 import random
 
-from entities.quiz import Quiz, QuizQuestion, QuizAnswer, QuizAttempt
-from entities.student_progress import StudentProgress
+from core.config import settings
+from entities.quiz import Quiz, QuizQuestion, QuizAnswer, QuizAttempt, QuizUserStats
 from schemas.quiz import (
     QuizCreate, QuizUpdate, QuizResponse, QuizStudentResponse,
-    QuizSubmitRequest, QuizAttemptResponse
+    QuizSubmitRequest, QuizAttemptResponse, QuizQuestionCreate, QuizAnswerCreate
 )
+from services.answer_key import AnswerKey, QuestionKey, normalize_short_answer
+from services.dashboard_rollups import apply_committed_changes
+from services.quiz_analytics import QuizAnalyticsService
+from services.quiz_stats import record_graded_attempts
+from utils.cache import LRUCache
+from utils.singleflight import SingleFlight
+
+# Columns compared when diffing an edited quiz against the stored rows
+QUESTION_FIELDS = ("question_text", "question_type", "points", "order", "image_url")
+ANSWER_FIELDS = ("answer_text", "is_correct", "order")
+
+
+# quiz_id -> AnswerKey; entries are also checked against Quiz.version so a
+# stale key left behind by another worker process is never used for grading
+answer_key_cache = LRUCache(maxsize=settings.ANSWER_KEY_CACHE_SIZE, name="answer_keys")
+
+
+class StudentQuizView(NamedTuple):
+    """Immutable, pre-serialized student payload for one version of a quiz"""
+    quiz_id: int
+    version: Optional[int]
+    shuffle: bool
+    head: str  # Quiz fields as a JSON object without its closing brace
+    question_ids: Tuple[int, ...]
+    question_heads: Tuple[str, ...]  # Question fields, JSON without closing brace
+    answers: Tuple[Tuple[str, ...], ...]  # Pre-serialized answer objects per question
+
+
+# quiz_id -> StudentQuizView, version-checked like answer keys
+student_view_cache = LRUCache(maxsize=settings.STUDENT_VIEW_CACHE_SIZE, name="student_quiz_views")
+
+# Concurrent students opening the same lesson quiz share one lookup/build
+student_quiz_flight = SingleFlight(name="student_quiz_views", enabled=settings.SINGLE_FLIGHT_ENABLED)
+
+
+def _dumps(value: Any) -> str:
+    """Compact JSON encoding matching FastAPI's default response rendering"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
 
 
 class QuizService:
@@ -32,35 +74,68 @@ class QuizService:
             show_answers=quiz_data.show_answers
         )
         db.add(quiz)
-        db.flush()  # Get quiz ID
-
-        # Create questions and answers
-        for question_data in quiz_data.questions:
-            question = QuizQuestion(
-                quiz_id=quiz.id,
-                question_text=question_data.question_text,
-                question_type=question_data.question_type,
-                points=question_data.points,
-                order=question_data.order,
-                image_url=question_data.image_url
-            )
-            db.add(question)
-            db.flush()  # Get question ID
-
-            # Create answers
-            for answer_data in question_data.answers:
-                answer = QuizAnswer(
-                    question_id=question.id,
-                    answer_text=answer_data.answer_text,
-                    is_correct=answer_data.is_correct,
-                    order=answer_data.order
-                )
-                db.add(answer)
-
+        db.flush()
+        quiz_id = quiz.id
+        QuizService._insert_questions(db, quiz_id, quiz_data.questions)
         db.commit()
-        db.refresh(quiz)
+
+        # Reload the graph for the response in a fixed number of queries
+        quiz = db.query(Quiz).options(
+            selectinload(Quiz.questions).selectinload(QuizQuestion.answers)
+        ).filter(Quiz.id == quiz_id).populate_existing().one()
+        QuizService.invalidate_quiz_cache(quiz_id)
         return quiz
 
+    @staticmethod
+    def _insert_questions(db: Session, quiz_id: int, questions_data: List[QuizQuestionCreate]) -> None:
+        """
+        Insert the questions of a new quiz and their answers in three statements
+        MySQL has no INSERT ... RETURNING, so an ORM flush would send one INSERT
+        per question to learn its id. Instead all questions go in one multi-row
+        INSERT, their ids are read back with one SELECT, and all answers follow
+        in a second multi-row INSERT.
+        """
+        if not questions_data:
+            return
+        now = datetime.utcnow()
+        db.execute(insert(QuizQuestion).values([
+            {
+                "quiz_id": quiz_id,
+                "question_text": question_data.question_text,
+                "question_type": question_data.question_type,
+                "points": question_data.points,
+                "order": question_data.order,
+                "image_url": question_data.image_url,
+                "created_at": now,
+                "updated_at": now
+            }
+            for question_data in questions_data
+        ]))
+
+        # Auto-increment ids of one multi-row INSERT follow the row order, so
+        # the rows are matched by id rather than by "order", which may repeat
+        rows = db.execute(
+            select(QuizQuestion.id, QuizQuestion.order)
+            .where(QuizQuestion.quiz_id == quiz_id)
+            .order_by(QuizQuestion.id)
+        ).all()
+        if len(rows) != len(questions_data):
+            raise RuntimeError(f"Expected {len(questions_data)} questions for quiz {quiz_id}, found {len(rows)}")
+
+        answers = [
+            {
+                "question_id": row.id,
+                "answer_text": answer_data.answer_text,
+                "is_correct": answer_data.is_correct,
+                "order": answer_data.order,
+                "created_at": now
+            }
+            for row, question_data in zip(rows, questions_data)
+            for answer_data in question_data.answers
+        ]
+        if answers:
+            db.execute(insert(QuizAnswer).values(answers))
+
     @staticmethod
     def get_quiz_by_id(db: Session, quiz_id: int) -> Optional[Quiz]:
         """Get quiz by ID with all relationships"""
@@ -96,52 +171,96 @@ class QuizService:
             setattr(quiz, field, value)
 
         quiz.updated_at = datetime.utcnow()
+        quiz.version = Quiz.version + 1
 
-        # 2. XỬ LÝ CẬP NHẬT CÂU HỎI (Logic sửa lỗi FK)
-        # Ngay cả khi bạn chỉ sửa thời gian, nếu Frontend gửi kèm questions, ta vẫn thực hiện logic này
-        # để đảm bảo dữ liệu đồng bộ nhất.
+        # 2. Cập nhật câu hỏi theo kiểu diff: giữ nguyên ID của câu hỏi/đáp án cũ
+        # (QuizAttempt.answers tham chiếu tới các ID này)
         if quiz_data.questions is not None:
-            # Bước A: Lấy ID của các câu hỏi cũ đang có trong bài kiểm tra này
-            existing_questions = db.query(QuizQuestion).filter(QuizQuestion.quiz_id == quiz_id).all()
-            existing_question_ids = [q.id for q in existing_questions]
-
-            # Bước B: Xóa tất cả ĐÁP ÁN thuộc về các câu hỏi cũ này trước
-            # (Đây là bước quan trọng để fix lỗi "FK constraint")
-            if existing_question_ids:
-                db.query(QuizAnswer).filter(
-                    QuizAnswer.question_id.in_(existing_question_ids)
-                ).delete(synchronize_session=False)
-
-            # Bước C: Sau khi xóa hết đáp án, giờ có thể xóa CÂU HỎI an toàn
-            db.query(QuizQuestion).filter(QuizQuestion.quiz_id == quiz_id).delete(synchronize_session=False)
-            
-            # Bước D: Tạo lại câu hỏi và đáp án mới từ dữ liệu gửi lên
-            for question_data in quiz_data.questions:
-                question = QuizQuestion(
-                    quiz_id=quiz.id,
-                    question_text=question_data.question_text,
-                    question_type=question_data.question_type,
-                    points=question_data.points,
-                    order=question_data.order,
-                    image_url=question_data.image_url
-                )
-                db.add(question)
-                db.flush()  # Để lấy ID câu hỏi mới tạo
-
-                # Tạo câu trả lời cho câu hỏi này
-                for answer_data in question_data.answers:
-                    answer = QuizAnswer(
-                        question_id=question.id,
-                        answer_text=answer_data.answer_text,
-                        is_correct=answer_data.is_correct,
-                        order=answer_data.order
-                    )
-                    db.add(answer)
+            QuizService._sync_questions(db, quiz, quiz_data.questions)
 
         db.commit()
         db.refresh(quiz)
+        QuizService.invalidate_quiz_cache(quiz_id)
         return quiz
 
+    @staticmethod
+    def _sync_questions(db: Session, quiz: Quiz, questions_data: List[QuizQuestionCreate]) -> None:
+        """
+        Apply an edited question list as an id-aware diff
+        Questions/answers whose id belongs to this quiz are updated in place (only
+        changed columns), unknown or missing ids are inserted, and rows absent from
+        the payload are deleted. Everything is written by a single flush, which
+        batches the statements per table.
+        """
+        existing_questions = {
+            question.id: question
+            for question in db.query(QuizQuestion).options(
+                selectinload(QuizQuestion.answers)
+            ).filter(QuizQuestion.quiz_id == quiz.id)
+        }
+        kept_question_ids = set()
+
+        for question_data in questions_data:
+            question = existing_questions.get(question_data.id)
+            if question is None or question.id in kept_question_ids:
+                # New question (or a temporary client-side id)
+                question = QuizService._build_question(question_data)
+                question.quiz_id = quiz.id
+                db.add(question)
+                continue
+
+            kept_question_ids.add(question.id)
+            QuizService._assign_changed(question, question_data, QUESTION_FIELDS)
+
+            existing_answers = {answer.id: answer for answer in question.answers}
+            answers = []
+            for answer_data in question_data.answers:
+                answer = existing_answers.pop(answer_data.id, None)
+                if answer is None:
+                    answers.append(QuizService._build_answer(answer_data))
+                else:
+                    QuizService._assign_changed(answer, answer_data, ANSWER_FIELDS)
+                    answers.append(answer)
+
+            # Answers left out of the list are deleted by the delete-orphan cascade
+            if existing_answers or len(answers) != len(question.answers):
+                question.answers = answers
+
+        for question_id, question in existing_questions.items():
+            if question_id not in kept_question_ids:
+                db.delete(question)
+
+        db.flush()
+
+    @staticmethod
+    def _assign_changed(entity, data, fields) -> None:
+        """Set only the columns whose value actually changed"""
+        for field in fields:
+            value = getattr(data, field)
+            if getattr(entity, field) != value:
+                setattr(entity, field, value)
+
+    @staticmethod
+    def _build_question(question_data: QuizQuestionCreate) -> QuizQuestion:
+        """Build a question with its answers attached through the relationship"""
+        return QuizQuestion(
+            question_text=question_data.question_text,
+            question_type=question_data.question_type,
+            points=question_data.points,
+            order=question_data.order,
+            image_url=question_data.image_url,
+            answers=[QuizService._build_answer(answer_data) for answer_data in question_data.answers]
+        )
+
+    @staticmethod
+    def _build_answer(answer_data: QuizAnswerCreate) -> QuizAnswer:
+        """Build an answer option"""
+        return QuizAnswer(
+            answer_text=answer_data.answer_text,
+            is_correct=answer_data.is_correct,
+            order=answer_data.order
+        )
+
     @staticmethod
     def delete_quiz(db: Session, quiz_id: int) -> bool:
         """Delete a quiz"""
@@ -150,83 +269,244 @@ class QuizService:
             return False
 
         db.delete(quiz)
+        QuizAnalyticsService.clear(db, quiz_id)
         db.commit()
+        QuizService.invalidate_quiz_cache(quiz_id)
         return True
 
     @staticmethod
-    def get_quiz_for_student(db: Session, quiz_id: int, shuffle: bool = False) -> Optional[Quiz]:
-        """Get quiz formatted for students (hides correct answers)"""
-        quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
-        if not quiz:
-            return None
+    def invalidate_quiz_cache(quiz_id: int) -> None:
+        """Drop the cached answer key and student view of a quiz after it was changed"""
+        answer_key_cache.pop(quiz_id)
+        student_view_cache.pop(quiz_id)
 
-        # Shuffle questions if enabled
-        if shuffle and quiz.shuffle_questions:
-            random.shuffle(quiz.questions)
-            for question in quiz.questions:
-                random.shuffle(question.answers)
+    @staticmethod
+    def get_answer_key(db: Session, quiz: Quiz) -> AnswerKey:
+        """
+        Get the precompiled answer key for the current version of a quiz
+        Args:
+            db: Database session
+            quiz: Quiz entity (its version column identifies the version)
+        Returns:
+            Cached or freshly built AnswerKey
+        """
+        answer_key = answer_key_cache.get(quiz.id)
+        if answer_key is not None and answer_key.version == quiz.version:
+            return answer_key
 
-        return quiz
+        answer_key = QuizService._build_answer_key(db, quiz)
+        answer_key_cache.set(quiz.id, answer_key)
+        return answer_key
 
     @staticmethod
-    def submit_quiz(
-        db: Session,
-        user_id: int,
-        quiz_id: int,
-        submit_data: QuizSubmitRequest
-    ) -> tuple[QuizAttempt, bool, Optional[List[Dict]]]:
+    def _build_answer_key(db: Session, quiz: Quiz) -> AnswerKey:
+        """Build an answer key with one query over questions and their answers"""
+        rows = db.query(
+            QuizQuestion.id,
+            QuizQuestion.question_text,
+            QuizQuestion.question_type,
+            QuizQuestion.points,
+            QuizAnswer.id,
+            QuizAnswer.answer_text,
+            QuizAnswer.is_correct
+        ).outerjoin(
+            QuizAnswer, QuizAnswer.question_id == QuizQuestion.id
+        ).filter(
+            QuizQuestion.quiz_id == quiz.id
+        ).order_by(QuizQuestion.id, QuizAnswer.id).all()
+
+        questions = []
+        for question_id, question_rows in groupby(rows, key=lambda row: row[0]):
+            question_rows = list(question_rows)
+            _, question_text, question_type, points = question_rows[0][:4]
+            # Only the first correct answer of a question counts
+            correct = next((row for row in question_rows if row[6]), None)
+            correct_text = correct[5] if correct else None
+            questions.append(QuestionKey(
+                question_id=question_id,
+                question_text=question_text,
+                question_type=question_type,
+                points=points or 0.0,
+                correct_answer_id=correct[4] if correct else None,
+                correct_answer_text=correct_text,
+                normalized_answer_text=normalize_short_answer(correct_text) if correct_text is not None else None,
+                answer_ids=tuple(row[4] for row in question_rows if row[4] is not None)
+            ))
+
+        return AnswerKey(
+            quiz_id=quiz.id,
+            version=quiz.version,
+            lesson_id=quiz.lesson_id,
+            passing_score=quiz.passing_score,
+            show_answers=quiz.show_answers,
+            total_points=sum(q.points for q in questions),
+            questions=tuple(questions)
+        )
+
+    @staticmethod
+    def grade_answers(
+        answer_key: AnswerKey,
+        answers: Dict[int, Any]
+    ) -> Tuple[float, float, bool, List[Dict]]:
         """
-        Submit quiz answers and calculate score
-        Returns: (attempt, passed, correct_answers)
+        Grade submitted answers against an answer key (pure, no database access)
+        Returns: (score, earned_points, passed, correct_answers)
         """
-        quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
-        if not quiz:
-            raise ValueError("Quiz not found")
-
-        # Calculate score
-        total_points = 0.0
         earned_points = 0.0
         correct_answers_list = []
 
-        for question in quiz.questions:
-            total_points += question.points
-            user_answer = submit_data.answers.get((question.id))
-
-            # Find correct answer
-            correct_answer = None
-            for answer in question.answers:
-                if answer.is_correct:
-                    correct_answer = answer
-                    break
+        for question in answer_key.questions:
+            user_answer = answers.get(question.question_id)
 
-            # Check if answer is correct
             is_correct = False
-            if question.question_type == "multiple_choice":
-                is_correct = user_answer == correct_answer.id if correct_answer else False
-            elif question.question_type == "true_false":
-                is_correct = user_answer == correct_answer.id if correct_answer else False
+            if question.question_type in ("multiple_choice", "true_false"):
+                is_correct = question.correct_answer_id is not None and user_answer == question.correct_answer_id
             elif question.question_type == "short_answer":
-                # For short answer, compare text (case insensitive, trimmed)
-                if correct_answer and user_answer:
-                    is_correct = str(user_answer).strip().lower() == correct_answer.answer_text.strip().lower()
+                if question.normalized_answer_text is not None and user_answer:
+                    is_correct = normalize_short_answer(user_answer) == question.normalized_answer_text
 
             if is_correct:
                 earned_points += question.points
 
-            # Collect correct answer info
             correct_answers_list.append({
-                "question_id": question.id,
+                "question_id": question.question_id,
                 "question_text": question.question_text,
                 "user_answer": user_answer,
-                "correct_answer_id": correct_answer.id if correct_answer else None,
-                "correct_answer_text": correct_answer.answer_text if correct_answer else None,
+                "correct_answer_id": question.correct_answer_id,
+                "correct_answer_text": question.correct_answer_text,
                 "is_correct": is_correct,
                 "points": question.points if is_correct else 0
             })
 
-        # Calculate percentage score
+        total_points = answer_key.total_points
         score = (earned_points / total_points * 100) if total_points > 0 else 0
-        passed = score >= quiz.passing_score
+        passed = score >= answer_key.passing_score
+
+        return score, earned_points, passed, correct_answers_list
+
+    @staticmethod
+    def get_student_view(db: Session, quiz: Quiz) -> StudentQuizView:
+        """
+        Get the cached student payload for the current version of a quiz
+        Args:
+            db: Database session
+            quiz: Quiz entity (its version column identifies the version)
+        Returns:
+            Pre-serialized StudentQuizView (built once per quiz version)
+        """
+        view = student_view_cache.get(quiz.id)
+        if view is not None and view.version == quiz.version:
+            return view
+
+        view = QuizService._build_student_view(db, quiz.id)
+        student_view_cache.set(quiz.id, view)
+        return view
+
+    @staticmethod
+    def get_student_view_for_lesson(db: Session, lesson_id: int) -> Optional[StudentQuizView]:
+        """
+        Get the student payload of a lesson's active quiz
+        Concurrent identical requests share one in-flight load (the result is
+        immutable and session-independent).
+        Returns:
+            StudentQuizView, or None if the lesson has no active quiz
+        """
+        def load() -> Optional[StudentQuizView]:
+            quiz = QuizService.get_quiz_by_lesson(db, lesson_id)
+            if not quiz:
+                return None
+            return QuizService.get_student_view(db, quiz)
+
+        return student_quiz_flight.do(lesson_id, load)
+
+    @staticmethod
+    def _build_student_view(db: Session, quiz_id: int) -> StudentQuizView:
+        """Serialize a quiz for students (correct answers hidden) without touching session state"""
+        quiz = db.query(Quiz).options(
+            selectinload(Quiz.questions).selectinload(QuizQuestion.answers)
+        ).filter(Quiz.id == quiz_id).first()
+
+        payload = QuizStudentResponse.model_validate(quiz).model_dump(mode="json")
+        questions = payload.pop("questions")
+
+        question_heads = []
+        answers = []
+        for question in questions:
+            question_answers = question.pop("answers")
+            question_heads.append(_dumps(question)[:-1])
+            answers.append(tuple(_dumps(answer) for answer in question_answers))
+
+        return StudentQuizView(
+            quiz_id=quiz.id,
+            version=quiz.version,
+            shuffle=bool(quiz.shuffle_questions),
+            head=_dumps(payload)[:-1],
+            question_ids=tuple(question["id"] for question in questions),
+            question_heads=tuple(question_heads),
+            answers=tuple(answers)
+        )
+
+    @staticmethod
+    def student_permutation(view: StudentQuizView, user_id: int) -> Tuple[List[int], List[List[int]]]:
+        """
+        Deterministic question/answer order of a quiz version for one student
+        The RNG is seeded from (user, quiz, version), so reloading shows the same
+        order and the server can rebuild it later (e.g. at grading time).
+        Returns: (question index order, answer index order per original question)
+        """
+        question_order = list(range(len(view.question_heads)))
+        answer_orders = [list(range(len(answers))) for answers in view.answers]
+        if not view.shuffle:
+            return question_order, answer_orders
+
+        seed_source = f"{user_id}:{view.quiz_id}:{view.version or ''}"
+        rng = random.Random(int.from_bytes(hashlib.sha256(seed_source.encode()).digest()[:8], "big"))
+        rng.shuffle(question_order)
+        for answer_order in answer_orders:
+            rng.shuffle(answer_order)
+        return question_order, answer_orders
+
+    @staticmethod
+    def get_student_question_order(db: Session, quiz: Quiz, user_id: int) -> List[int]:
+        """Question ids in the order a student was shown them"""
+        view = QuizService.get_student_view(db, quiz)
+        question_order, _ = QuizService.student_permutation(view, user_id)
+        return [view.question_ids[index] for index in question_order]
+
+    @staticmethod
+    def render_student_quiz(view: StudentQuizView, user_id: int) -> str:
+        """Assemble the JSON payload for one student from the pre-serialized fragments"""
+        question_order, answer_orders = QuizService.student_permutation(view, user_id)
+        questions = [
+            view.question_heads[index]
+            + ',"answers":['
+            + ",".join(view.answers[index][answer] for answer in answer_orders[index])
+            + "]}"
+            for index in question_order
+        ]
+        return view.head + ',"questions":[' + ",".join(questions) + "]}"
+
+    @staticmethod
+    def submit_quiz(
+        db: Session,
+        user_id: int,
+        quiz_id: int,
+        submit_data: QuizSubmitRequest
+    ) -> tuple[QuizAttempt, bool, Optional[List[Dict]]]:
+        """
+        Submit quiz answers and calculate score
+        Returns: (attempt, passed, correct_answers)
+        """
+        quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+        if not quiz:
+            raise ValueError("Quiz not found")
+
+        # Grade against the cached answer key (no per-question answer loading)
+        answer_key = QuizService.get_answer_key(db, quiz)
+        score, earned_points, passed, correct_answers_list = QuizService.grade_answers(
+            answer_key, submit_data.answers
+        )
+        total_points = answer_key.total_points
 
         # Create quiz attempt
         attempt = QuizAttempt(
@@ -242,28 +522,138 @@ class QuizService:
         )
         db.add(attempt)
 
-        # Update student progress if passed
-        if passed:
-            progress = db.query(StudentProgress).filter(
-                StudentProgress.user_id == user_id,
-                StudentProgress.lesson_id == quiz.lesson_id
-            ).first()
-
-            if progress:
-                progress.quiz_score = score
-                if progress.average_score:
-                    progress.average_score = (progress.average_score + score) / 2
-                else:
-                    progress.average_score = score
+        # Per-student stats and lesson progress scores, in the same transaction
+        record_graded_attempts(db, [attempt])
 
         db.commit()
+        apply_committed_changes(db)
         db.refresh(attempt)
 
+        # Item-analysis counters are shared by the whole class: updated in their own short transaction
+        QuizAnalyticsService.record_attempts(db, answer_key, [(attempt.id, attempt.answers, attempt.score)])
+
         # Return correct answers only if show_answers is enabled
-        return_answers = correct_answers_list if quiz.show_answers else None
+        return_answers = correct_answers_list if answer_key.show_answers else None
 
         return attempt, passed, return_answers
 
+    @staticmethod
+    def create_pending_attempt(
+        db: Session,
+        user_id: int,
+        quiz_id: int,
+        submit_data: QuizSubmitRequest
+    ) -> QuizAttempt:
+        """
+        Persist raw answers for background grading (queued submission mode)
+        Returns: Attempt with is_completed=False until a grading worker picks it up
+        """
+        if not db.query(Quiz.id).filter(Quiz.id == quiz_id).first():
+            raise ValueError("Quiz not found")
+
+        attempt = QuizAttempt(
+            user_id=user_id,
+            quiz_id=quiz_id,
+            score=0.0,
+            points_earned=0.0,
+            total_points=0.0,
+            answers=submit_data.answers,
+            submitted_at=datetime.utcnow(),
+            time_spent=submit_data.time_spent,
+            is_completed=False
+        )
+        db.add(attempt)
+        db.commit()
+        db.refresh(attempt)
+        return attempt
+
+    @staticmethod
+    def grade_pending_attempts(db: Session, attempt_ids: List[int]) -> int:
+        """
+        Grade queued attempts and update progress in one transaction
+        Attempts already graded, or locked by another worker, are skipped.
+        Returns: Number of attempts graded
+        """
+        attempts = db.query(QuizAttempt).filter(
+            QuizAttempt.id.in_(attempt_ids),
+            QuizAttempt.is_completed == False
+        ).with_for_update(skip_locked=True).all()
+        if not attempts:
+            db.rollback()
+            return 0
+
+        quizzes = {
+            quiz.id: quiz
+            for quiz in db.query(Quiz).filter(Quiz.id.in_({attempt.quiz_id for attempt in attempts}))
+        }
+
+        graded: Dict[int, Tuple[AnswerKey, List[Tuple[int, Any, float]]]] = {}
+        for attempt in attempts:
+            answer_key = QuizService.get_answer_key(db, quizzes[attempt.quiz_id])
+            score, earned_points, _, _ = QuizService.grade_answers(
+                answer_key, QuizService._stored_answers(attempt)
+            )
+            attempt.score = score
+            attempt.points_earned = earned_points
+            attempt.total_points = answer_key.total_points
+            attempt.is_completed = True
+            graded.setdefault(attempt.quiz_id, (answer_key, []))[1].append(
+                (attempt.id, attempt.answers, score)
+            )
+
+        record_graded_attempts(db, attempts)
+        db.commit()
+        apply_committed_changes(db)
+
+        for answer_key, quiz_attempts in graded.values():
+            QuizAnalyticsService.record_attempts(db, answer_key, quiz_attempts)
+        return len(attempts)
+
+    @staticmethod
+    def mark_attempts_failed(db: Session, attempt_ids: List[int]) -> int:
+        """
+        Give up on grading pending attempts, so they are no longer retried
+        Returns: Number of attempts marked
+        """
+        marked = db.query(QuizAttempt).filter(
+            QuizAttempt.id.in_(attempt_ids),
+            QuizAttempt.is_completed == False
+        ).update({QuizAttempt.grading_failed: True}, synchronize_session=False)
+        db.commit()
+        return marked
+
+    @staticmethod
+    def get_submission_result(
+        db: Session,
+        attempt_id: int,
+        user_id: int
+    ) -> Optional[Tuple[QuizAttempt, bool, Optional[List[Dict]]]]:
+        """
+        Result of a submitted attempt for polling clients
+        Returns: (attempt, passed, correct_answers), with passed False while the
+        attempt is still pending, or None if the attempt does not exist
+        """
+        attempt = QuizService.get_attempt_by_id(db, attempt_id, user_id)
+        if not attempt:
+            return None
+        if not attempt.is_completed:
+            return attempt, False, None
+
+        quiz = db.query(Quiz).filter(Quiz.id == attempt.quiz_id).first()
+        answer_key = QuizService.get_answer_key(db, quiz)
+        passed = attempt.score >= answer_key.passing_score
+        correct_answers = None
+        if answer_key.show_answers:
+            _, _, _, correct_answers = QuizService.grade_answers(
+                answer_key, QuizService._stored_answers(attempt)
+            )
+        return attempt, passed, correct_answers
+
+    @staticmethod
+    def _stored_answers(attempt: QuizAttempt) -> Dict[int, Any]:
+        """Submitted answers as stored in JSON, with question ids turned back into ints"""
+        return {int(question_id): answer for question_id, answer in (attempt.answers or {}).items()}
+
     @staticmethod
     def get_user_attempts(db: Session, user_id: int, quiz_id: Optional[int] = None) -> List[QuizAttempt]:
         """Get all quiz attempts for a user"""
@@ -280,11 +670,15 @@ class QuizService:
             QuizAttempt.user_id == user_id
         ).first()
 
+    @staticmethod
+    def get_user_stats(db: Session, user_id: int, quiz_id: int) -> Optional[QuizUserStats]:
+        """Get attempt count, best, average and last score of a user on a quiz"""
+        return db.get(QuizUserStats, (user_id, quiz_id))
+
     @staticmethod
     def get_best_attempt(db: Session, user_id: int, quiz_id: int) -> Optional[QuizAttempt]:
         """Get the best attempt for a user on a specific quiz"""
-        return db.query(QuizAttempt).filter(
-            QuizAttempt.user_id == user_id,
-            QuizAttempt.quiz_id == quiz_id,
-            QuizAttempt.is_completed == True
-        ).order_by(QuizAttempt.score.desc()).first()
+        stats = QuizService.get_user_stats(db, user_id, quiz_id)
+        if not stats or stats.best_attempt_id is None:
+            return None
+        return db.get(QuizAttempt, stats.best_attempt_id)
@@ -0,0 +1,248 @@
+"""
+Materialized per-student quiz statistics
+
+quiz_user_stats keeps attempt count, score sum, best and last score per
+(user, quiz). Graded attempts are folded in with one upsert inside the
+grading transaction, so best-attempt, average and attempt-count reads are
+primary-key lookups instead of scans over quiz_attempts.
+"""
+from datetime import datetime
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import case, func, insert, or_, tuple_
+from sqlalchemy.orm import Session
+
+from entities.quiz import Quiz, QuizAttempt, QuizUserStats
+from entities.student_progress import StudentProgress
+from services.dashboard_rollups import ProgressChange, ProgressState, record_progress_changes
+
+StatsKey = Tuple[int, int]  # (user_id, quiz_id)
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def _aggregate(attempts: Iterable[QuizAttempt]) -> Dict[StatsKey, dict]:
+    """Collapse attempts into one stats delta per (user, quiz)"""
+    deltas: Dict[StatsKey, dict] = {}
+    for attempt in attempts:
+        key = (attempt.user_id, attempt.quiz_id)
+        at = attempt.submitted_at or datetime.utcnow()
+        delta = deltas.get(key)
+        if delta is None:
+            deltas[key] = {
+                "user_id": attempt.user_id,
+                "quiz_id": attempt.quiz_id,
+                "attempt_count": 1,
+                "sum_score": attempt.score,
+                "best_score": attempt.score,
+                "best_attempt_id": attempt.id,
+                "last_score": attempt.score,
+                "last_attempt_at": at
+            }
+            continue
+        delta["attempt_count"] += 1
+        delta["sum_score"] += attempt.score
+        if attempt.score > delta["best_score"]:
+            delta["best_score"] = attempt.score
+            delta["best_attempt_id"] = attempt.id
+        if at >= delta["last_attempt_at"]:
+            delta["last_score"] = attempt.score
+            delta["last_attempt_at"] = at
+    return deltas
+
+
+def upsert_quiz_user_stats(db: Session, attempts: List[QuizAttempt]) -> Set[StatsKey]:
+    """
+    Fold graded attempts (flushed, so they have ids) into quiz_user_stats
+    Returns:
+        The (user_id, quiz_id) keys that were touched
+    """
+    rows = list(_aggregate(attempts).values())
+    if not rows:
+        return set()
+
+    dialect = db.get_bind().dialect.name
+    table = QuizUserStats.__table__
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        stmt = dialect_insert(table).values(rows)
+        new = stmt.inserted
+        greatest = func.greatest
+    elif dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            greatest = func.greatest
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            greatest = func.max
+        stmt = dialect_insert(table).values(rows)
+        new = stmt.excluded
+    else:
+        _merge_stats_orm(db, rows)
+        return {(row["user_id"], row["quiz_id"]) for row in rows}
+
+    is_better = or_(table.c.best_score.is_(None), new.best_score > table.c.best_score)
+    is_later = or_(table.c.last_attempt_at.is_(None), new.last_attempt_at >= table.c.last_attempt_at)
+    # MySQL applies assignments left to right and later ones see earlier results,
+    # so the CASE columns must come before the columns they compare against
+    updates = [
+        ("attempt_count", table.c.attempt_count + new.attempt_count),
+        ("sum_score", table.c.sum_score + new.sum_score),
+        ("best_attempt_id", case((is_better, new.best_attempt_id), else_=table.c.best_attempt_id)),
+        ("best_score", func.coalesce(greatest(table.c.best_score, new.best_score), new.best_score)),
+        ("last_score", case((is_later, new.last_score), else_=table.c.last_score)),
+        ("last_attempt_at", case((is_later, new.last_attempt_at), else_=table.c.last_attempt_at)),
+    ]
+
+    if dialect == "mysql":
+        stmt = stmt.on_duplicate_key_update(updates)
+    else:
+        stmt = stmt.on_conflict_do_update(index_elements=["user_id", "quiz_id"], set_=dict(updates))
+    db.execute(stmt)
+    return {(row["user_id"], row["quiz_id"]) for row in rows}
+
+
+def _merge_stats_orm(db: Session, rows: List[dict]) -> None:
+    """Portable fallback for dialects without an upsert statement"""
+    for row in rows:
+        stats = db.get(QuizUserStats, (row["user_id"], row["quiz_id"]), with_for_update=True)
+        if not stats:
+            db.add(QuizUserStats(**row))
+            continue
+        stats.attempt_count += row["attempt_count"]
+        stats.sum_score += row["sum_score"]
+        if stats.best_score is None or row["best_score"] > stats.best_score:
+            stats.best_score = row["best_score"]
+            stats.best_attempt_id = row["best_attempt_id"]
+        if stats.last_attempt_at is None or row["last_attempt_at"] >= stats.last_attempt_at:
+            stats.last_score = row["last_score"]
+            stats.last_attempt_at = row["last_attempt_at"]
+
+
+def sync_progress_scores(db: Session, keys: Iterable[StatsKey]) -> None:
+    """Copy best and mean score from quiz_user_stats into the students' lesson progress"""
+    keys = list(keys)
+    if not keys:
+        return
+
+    stats_rows = db.query(QuizUserStats, Quiz.lesson_id).join(
+        Quiz, Quiz.id == QuizUserStats.quiz_id
+    ).filter(
+        tuple_(QuizUserStats.user_id, QuizUserStats.quiz_id).in_(keys)
+    ).populate_existing().all()
+    by_lesson = {(stats.user_id, lesson_id): stats for stats, lesson_id in stats_rows}
+    if not by_lesson:
+        return
+
+    progress_rows = db.query(StudentProgress).filter(
+        tuple_(StudentProgress.user_id, StudentProgress.lesson_id).in_(list(by_lesson))
+    ).with_for_update().populate_existing().all()
+    changes = []
+    for progress in progress_rows:
+        stats = by_lesson[(progress.user_id, progress.lesson_id)]
+        old_state = ProgressState.of(progress)
+        progress.quiz_score = stats.best_score
+        progress.average_score = stats.average_score
+        changes.append(ProgressChange(progress.user_id, progress.lesson_id, old_state, ProgressState.of(progress)))
+
+    # No row yet, e.g. the first heartbeats still wait in the progress buffer:
+    # create it with the scores; the buffer's upsert leaves the score columns alone
+    found = {(progress.user_id, progress.lesson_id) for progress in progress_rows}
+    missing = [
+        {
+            "user_id": user_id,
+            "lesson_id": lesson_id,
+            "progress_percentage": 0.0,
+            "is_completed": False,
+            "time_spent": 0,
+            "quiz_score": stats.best_score,
+            "average_score": stats.average_score
+        }
+        for (user_id, lesson_id), stats in sorted(by_lesson.items())
+        if (user_id, lesson_id) not in found
+    ]
+    if missing:
+        _insert_progress_scores(db, missing)
+        changes.extend(
+            ProgressChange(row["user_id"], row["lesson_id"], None, ProgressState(0.0, False, 0, row["quiz_score"]))
+            for row in missing
+        )
+    record_progress_changes(db, changes)
+
+
+def _insert_progress_scores(db: Session, rows: List[dict]) -> None:
+    """Insert progress rows carrying quiz scores, only setting the scores if a flush created the row meanwhile"""
+    dialect = db.get_bind().dialect.name
+    table = StudentProgress.__table__
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        stmt = dialect_insert(table).values(rows)
+        new = stmt.inserted
+    elif dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(table).values(rows)
+        new = stmt.excluded
+    else:
+        for row in rows:
+            db.add(StudentProgress(**row))
+        db.flush()
+        return
+
+    updates = {"quiz_score": new.quiz_score, "average_score": new.average_score}
+    if dialect == "mysql":
+        stmt = stmt.on_duplicate_key_update(updates)
+    else:
+        stmt = stmt.on_conflict_do_update(index_elements=["user_id", "lesson_id"], set_=updates)
+    db.execute(stmt)
+
+
+def record_graded_attempts(db: Session, attempts: List[QuizAttempt]) -> None:
+    """Update quiz_user_stats and lesson progress for attempts graded in this transaction"""
+    db.flush()
+    keys = upsert_quiz_user_stats(db, attempts)
+    sync_progress_scores(db, keys)
+
+
+def rebuild_quiz_user_stats(
+    db: Session,
+    quiz_id: Optional[int] = None,
+    user_ids: Optional[List[int]] = None
+) -> int:
+    """
+    Recompute quiz_user_stats from quiz_attempts (all rows, or one quiz / some users)
+    The caller commits.
+    Returns:
+        Number of stats rows written
+    """
+    def scoped(query, entity):
+        if quiz_id is not None:
+            query = query.filter(entity.quiz_id == quiz_id)
+        if user_ids is not None:
+            query = query.filter(entity.user_id.in_(user_ids))
+        return query
+
+    scoped(db.query(QuizUserStats), QuizUserStats).delete(synchronize_session=False)
+
+    # Attempts are read fully before inserting: a streamed result would keep the connection busy
+    attempts = scoped(db.query(
+        QuizAttempt.id, QuizAttempt.user_id, QuizAttempt.quiz_id,
+        QuizAttempt.score, QuizAttempt.submitted_at
+    ).filter(QuizAttempt.is_completed == True), QuizAttempt).order_by(
+        QuizAttempt.user_id, QuizAttempt.quiz_id, QuizAttempt.id
+    ).all()
+
+    rows = []
+    for _, group in groupby(attempts, key=lambda attempt: (attempt.user_id, attempt.quiz_id)):
+        rows.extend(_aggregate(group).values())
+
+    for start in range(0, len(rows), REBUILD_BATCH_SIZE):
+        db.execute(insert(QuizUserStats.__table__), rows[start:start + REBUILD_BATCH_SIZE])
+
+    keys = [(row["user_id"], row["quiz_id"]) for row in rows]
+    for start in range(0, len(keys), REBUILD_BATCH_SIZE):
+        sync_progress_scores(db, keys[start:start + REBUILD_BATCH_SIZE])
+    return len(rows)
@@ -0,0 +1,196 @@
+"""
+Batch regrading of existing attempts after an answer-key change
+
+Attempts of a quiz are read in id-ordered chunks, encoded into a response
+matrix and scored vectorized against the current answer key. Only attempts
+whose result changed are written back, with one bulk UPDATE by primary key
+per chunk. quiz_user_stats, lesson progress scores and the item-analysis
+counters are rebuilt at the end from the same matrices.
+"""
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+import numpy as np
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.database import SessionLocal
+from entities.quiz import Quiz, QuizAttempt
+from services.answer_matrix import AnswerMatrixBuilder, correctness, score_matrix
+from services.dashboard_rollups import apply_committed_changes
+from services.quiz_analytics import AnalyticsDeltas, QuizAnalyticsService
+from services.quiz_service import QuizService
+from services.quiz_stats import rebuild_quiz_user_stats
+from utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class RegradeJob:
+    """Progress of one regrade run"""
+
+    def __init__(self, quiz_id: int):
+        self.id = uuid.uuid4().hex
+        self.quiz_id = quiz_id
+        self.status = "queued"  # queued, running, completed, failed
+        self.total = 0
+        self.processed = 0
+        self.updated = 0
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def progress(self) -> float:
+        """Percentage of attempts processed"""
+        if self.status == "completed":
+            return 100.0
+        return round(self.processed / self.total * 100, 1) if self.total else 0.0
+
+
+# job id -> RegradeJob (recent jobs only, per worker process)
+regrade_jobs = LRUCache(maxsize=100)
+_running: Dict[int, RegradeJob] = {}  # quiz_id -> job in progress
+_running_lock = threading.Lock()
+
+
+class RegradeService:
+    """Service for regrading quiz attempts"""
+
+    @staticmethod
+    def start_regrade(quiz_id: int) -> RegradeJob:
+        """
+        Regrade all attempts of a quiz in a background thread
+        Returns:
+            The new job, or the job already running for this quiz
+        """
+        with _running_lock:
+            job = _running.get(quiz_id)
+            if job is not None:
+                return job
+            job = _running[quiz_id] = RegradeJob(quiz_id)
+        regrade_jobs.set(job.id, job)
+
+        thread = threading.Thread(
+            target=RegradeService._run_job, args=(job,), name=f"regrade-{quiz_id}", daemon=True
+        )
+        thread.start()
+        return job
+
+    @staticmethod
+    def get_job(job_id: str) -> Optional[RegradeJob]:
+        """Get a regrade job by id"""
+        return regrade_jobs.get(job_id)
+
+    @staticmethod
+    def regrade_quiz(
+        db: Session,
+        quiz_id: int,
+        job: Optional[RegradeJob] = None,
+        chunk_size: int = settings.REGRADE_CHUNK_SIZE,
+        on_chunk: Optional[Callable[[RegradeJob], None]] = None
+    ) -> RegradeJob:
+        """
+        Rescore every completed attempt of a quiz against its current answer key
+        Each chunk is committed on its own; stats are rebuilt once at the end.
+        Raises:
+            ValueError: If the quiz does not exist
+        """
+        job = job or RegradeJob(quiz_id)
+        quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+        if not quiz:
+            raise ValueError("Quiz not found")
+
+        answer_key = QuizService.get_answer_key(db, quiz)
+        builder = AnswerMatrixBuilder(answer_key)
+        analytics = AnalyticsDeltas(builder)
+        total_points = float(builder.points.sum())
+
+        job.total = db.query(func.count(QuizAttempt.id)).filter(
+            QuizAttempt.quiz_id == quiz_id,
+            QuizAttempt.is_completed == True
+        ).scalar()
+
+        last_id = 0
+        while True:
+            rows = db.query(
+                QuizAttempt.id, QuizAttempt.answers, QuizAttempt.score,
+                QuizAttempt.points_earned, QuizAttempt.total_points
+            ).filter(
+                QuizAttempt.quiz_id == quiz_id,
+                QuizAttempt.is_completed == True,
+                QuizAttempt.id > last_id
+            ).order_by(QuizAttempt.id).limit(chunk_size).all()
+            if not rows:
+                break
+
+            matrix = builder.build([(row.id, row.answers) for row in rows])
+            earned, scores = score_matrix(matrix)
+            analytics.add_matrix(matrix.responses, correctness(matrix), scores)
+
+            old_scores = np.array([row.score or 0.0 for row in rows], dtype=np.float64)
+            old_earned = np.array([row.points_earned or 0.0 for row in rows], dtype=np.float64)
+            old_totals = np.array([row.total_points or 0.0 for row in rows], dtype=np.float64)
+            changed = np.flatnonzero(
+                ~np.isclose(old_scores, scores)
+                | ~np.isclose(old_earned, earned)
+                | ~np.isclose(old_totals, total_points)
+            )
+
+            if changed.size:
+                db.execute(update(QuizAttempt), [
+                    {
+                        "id": int(matrix.attempt_ids[index]),
+                        "score": float(scores[index]),
+                        "points_earned": float(earned[index]),
+                        "total_points": total_points
+                    }
+                    for index in changed
+                ])
+            db.commit()
+
+            job.processed += len(rows)
+            job.updated += int(changed.size)
+            last_id = rows[-1].id
+            if on_chunk:
+                on_chunk(job)
+
+        rebuild_quiz_user_stats(db, quiz_id=quiz_id)
+        db.commit()
+        apply_committed_changes(db)
+        QuizAnalyticsService.replace(db, analytics)
+        return job
+
+    @staticmethod
+    def _run_job(job: RegradeJob) -> None:
+        db = SessionLocal()
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        started = time.perf_counter()
+        try:
+            RegradeService.regrade_quiz(db, job.quiz_id, job, on_chunk=RegradeService._log_progress)
+            job.status = "completed"
+            logger.info(
+                "Regraded quiz %s: %d attempts, %d changed in %.1fs",
+                job.quiz_id, job.processed, job.updated, time.perf_counter() - started
+            )
+        except Exception as e:
+            db.rollback()
+            job.status = "failed"
+            job.error = str(e)
+            logger.exception("Regrade of quiz %s failed", job.quiz_id)
+        finally:
+            job.finished_at = datetime.utcnow()
+            db.close()
+            with _running_lock:
+                _running.pop(job.quiz_id, None)
+
+    @staticmethod
+    def _log_progress(job: RegradeJob) -> None:
+        logger.info("Regrading quiz %s: %d/%d attempts", job.quiz_id, job.processed, job.total)
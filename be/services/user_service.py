@@ -1,13 +1,55 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import insert, or_
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
+from pydantic import ValidationError
+from typing import Any, Dict, List
+import csv
+import io
+import json
+import time
 from entities.user import User, UserRole
-from schemas.admin import StudentCreate, StudentUpdate
-from utils.security import get_password_hash
+from schemas.admin import StudentCreate, StudentFilters, StudentUpdate
+from utils.security import get_password_hash, hash_passwords
+from services.auth_service import AuthService
+from services.feedback_service import FeedbackService
+from utils.pagination import PageParams, keyset_page
+
+# Rows validated, checked for uniqueness, hashed and inserted together
+BULK_IMPORT_CHUNK_SIZE = 500
+
+# Columns of the admin student list and the sorts it accepts
+STUDENT_COLUMNS = ("id", "username", "email", "full_name", "grade", "class_name", "is_active", "created_at")
+STUDENT_SORTS = {
+    "created_at": User.created_at,
+    "full_name": User.full_name,
+    "username": User.username,
+    "id": User.id,
+}
 
 class UserService:
     @staticmethod
-    def get_all_students(db: Session):
-        return db.query(User).filter(User.role == UserRole.STUDENT).all()
+    def get_all_students(db: Session, filters: StudentFilters, page: PageParams):
+        query = db.query(
+            User.id, User.username, User.email, User.full_name,
+            User.grade, User.class_name, User.is_active, User.created_at
+        ).filter(User.role == UserRole.STUDENT)
+        if filters.class_name:
+            query = query.filter(User.class_name == filters.class_name)
+        if filters.grade is not None:
+            query = query.filter(User.grade == filters.grade)
+        if filters.is_active is not None:
+            query = query.filter(User.is_active == filters.is_active)
+        if filters.search:
+            query = query.filter(or_(
+                User.username.startswith(filters.search, autoescape=True),
+                User.full_name.startswith(filters.search, autoescape=True)
+            ))
+
+        return keyset_page(
+            query, page, STUDENT_SORTS, "created_at", User.id,
+            lambda row: {key: row._mapping[key] for key in STUDENT_COLUMNS}
+        )
 
     @staticmethod
     def create_student(db: Session, student_data: StudentCreate):
@@ -47,6 +89,7 @@ class UserService:
             setattr(user, field, value)
         db.commit()
         db.refresh(user)
+        AuthService.invalidate_principal(user.id)
         return user
 
     @staticmethod
@@ -54,5 +97,150 @@ class UserService:
         user = db.query(User).filter(User.id == student_id, User.role == UserRole.STUDENT).first()
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
+        # The student's feedbacks go with the user row; keep the lesson ratings in step
+        FeedbackService.remove_user_ratings(db, student_id)
         db.delete(user)
-        db.commit()
\ No newline at end of file
+        db.commit()
+        AuthService.invalidate_principal(student_id)
+
+    @staticmethod
+    def parse_student_rows(content: bytes, content_format: str) -> List[Dict[str, Any]]:
+        """
+        Parse a bulk import payload into raw row dicts
+        Args:
+            content: Request body or uploaded file content
+            content_format: "csv" or "json"
+        Returns:
+            List of rows (empty CSV cells become None)
+        """
+        text = content.decode("utf-8-sig")
+        if content_format == "csv":
+            reader = csv.DictReader(io.StringIO(text))
+            return [
+                {
+                    (key or "").strip(): (value.strip() or None) if isinstance(value, str) else value
+                    for key, value in row.items()
+                }
+                for row in reader
+            ]
+
+        try:
+            data = json.loads(text)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON payload")
+        if isinstance(data, dict):
+            data = data.get("students")
+        if not isinstance(data, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a JSON array of students or {\"students\": [...]}"
+            )
+        return data
+
+    @staticmethod
+    def bulk_create_students(db: Session, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Create many students at once
+        Each chunk costs one uniqueness query, one parallel hashing pass and
+        one multi-row INSERT. Invalid or conflicting rows are reported, not raised.
+        Args:
+            db: Database session
+            rows: Raw student rows (StudentCreate fields)
+        Returns:
+            Import summary with per-row errors and throughput
+        """
+        started = time.perf_counter()
+        errors = []
+        created = 0
+        seen_usernames = set()
+        seen_emails = set()
+
+        for chunk_start in range(0, len(rows), BULK_IMPORT_CHUNK_SIZE):
+            candidates = []
+            for offset, raw in enumerate(rows[chunk_start:chunk_start + BULK_IMPORT_CHUNK_SIZE]):
+                row_number = chunk_start + offset + 1
+                username = raw.get("username") if isinstance(raw, dict) else None
+                try:
+                    student = StudentCreate.model_validate(raw)
+                except ValidationError as e:
+                    detail = "; ".join(
+                        f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+                    )
+                    errors.append({"row": row_number, "username": username, "detail": detail})
+                    continue
+
+                if student.username in seen_usernames:
+                    errors.append({"row": row_number, "username": student.username, "detail": "Duplicate username in import"})
+                    continue
+                if student.email in seen_emails:
+                    errors.append({"row": row_number, "username": student.username, "detail": "Duplicate email in import"})
+                    continue
+                seen_usernames.add(student.username)
+                seen_emails.add(student.email)
+                candidates.append((row_number, student))
+
+            if not candidates:
+                continue
+
+            # One batched lookup for both unique columns of the chunk
+            existing = db.query(User.username, User.email).filter(or_(
+                User.username.in_([student.username for _, student in candidates]),
+                User.email.in_([student.email for _, student in candidates])
+            )).all()
+            taken_usernames = {row.username for row in existing}
+            taken_emails = {row.email for row in existing}
+
+            accepted = []
+            for row_number, student in candidates:
+                if student.username in taken_usernames:
+                    errors.append({"row": row_number, "username": student.username, "detail": "Username already exists"})
+                elif student.email in taken_emails:
+                    errors.append({"row": row_number, "username": student.username, "detail": "Email already exists"})
+                else:
+                    accepted.append((row_number, student))
+
+            if not accepted:
+                continue
+
+            hashed = hash_passwords([student.password for _, student in accepted])
+            values = [
+                {
+                    "username": student.username,
+                    "email": student.email,
+                    "full_name": student.full_name,
+                    "hashed_password": hashed_password,
+                    "role": UserRole.STUDENT,
+                    "grade": student.grade,
+                    "class_name": student.class_name,
+                    "is_active": True,
+                    "is_verified": True
+                }
+                for (_, student), hashed_password in zip(accepted, hashed)
+            ]
+
+            try:
+                db.execute(insert(User), values)
+                db.commit()
+                created += len(values)
+            except IntegrityError:
+                # A concurrent write took one of the names; retry row by row to isolate it
+                db.rollback()
+                for (row_number, student), row_values in zip(accepted, values):
+                    try:
+                        db.execute(insert(User), [row_values])
+                        db.commit()
+                        created += 1
+                    except IntegrityError:
+                        db.rollback()
+                        errors.append({"row": row_number, "username": student.username, "detail": "Username or email already exists"})
+
+        elapsed = time.perf_counter() - started
+        errors.sort(key=lambda error: error["row"])
+        return {
+            "total_rows": len(rows),
+            "created": created,
+            "failed": len(errors),
+            "errors": errors,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(len(rows) / elapsed, 1) if elapsed > 0 else 0.0
+        }
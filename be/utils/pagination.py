@@ -0,0 +1,142 @@
+"""
+Keyset (cursor) pagination for list endpoints
+
+Pages are ordered by a sort expression plus the row id as tie-breaker.
+The cursor is an opaque token holding the sort key and id of the last row
+of the previous page, so fetching page N costs the same as page 1 (no
+OFFSET scan). A cursor only stays valid for the sort it was issued for.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Query as OrmQuery
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class PageParams:
+    """Cursor, page size and sort query parameters (use as a dependency)"""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        sort: Optional[str] = Query(None, description="Sort field, endpoint specific"),
+        order: str = Query("desc", pattern="^(asc|desc)$"),
+        include_total: bool = Query(False, description="Also count all matching rows")
+    ):
+        self.cursor = cursor
+        self.limit = limit
+        self.sort = sort
+        self.order = order
+        self.include_total = include_total
+
+
+def encode_cursor(sort: str, order: str, value: Any, row_id: int) -> str:
+    """Build the opaque cursor pointing after the given row"""
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    payload = json.dumps({"s": sort, "o": order, "v": value, "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, order: str, python_type: Optional[type]) -> Tuple[Any, int]:
+    """
+    Read a cursor issued by encode_cursor
+    Raises:
+        HTTPException: If the cursor is malformed or was issued for another sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort or payload["o"] != order:
+            raise ValueError("sort changed")
+        value = payload["v"]
+        if value is not None and python_type is datetime:
+            value = datetime.fromisoformat(value)
+        elif value is not None and python_type is date:
+            value = date.fromisoformat(value)
+        return value, int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid or outdated cursor"
+        )
+
+
+def resolve_sort(page: PageParams, sort_fields: Dict[str, Any], default: str) -> Tuple[str, Any]:
+    """
+    Map the requested sort name to its column expression
+    Raises:
+        HTTPException: If the sort field is not allowed
+    """
+    name = page.sort or default
+    if name not in sort_fields:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported sort '{name}', expected one of: {', '.join(sort_fields)}"
+        )
+    return name, sort_fields[name]
+
+
+def keyset_page(
+    query: OrmQuery,
+    page: PageParams,
+    sort_fields: Dict[str, Any],
+    default_sort: str,
+    id_column: Any,
+    to_item: Callable[[Any], Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Fetch one page of a filtered query
+    Args:
+        query: Filtered query selecting the columns the items need
+        page: Cursor / limit / sort parameters
+        sort_fields: Allowed sort names -> non-null column expressions
+        default_sort: Sort name used when none is requested
+        id_column: Unique tie-breaker column (the primary key)
+        to_item: Builds a response item from a result row
+    Returns:
+        {"items": [...], "next_cursor": str or None, "total": int or None}
+    """
+    sort_name, sort_column = resolve_sort(page, sort_fields, default_sort)
+    descending = page.order == "desc"
+
+    total = None
+    if page.include_total:
+        total = query.order_by(None).with_entities(func.count(id_column)).scalar()
+
+    if page.cursor:
+        try:
+            python_type = sort_column.type.python_type
+        except NotImplementedError:
+            python_type = None
+        value, last_id = decode_cursor(page.cursor, sort_name, page.order, python_type)
+        if descending:
+            query = query.filter(or_(sort_column < value, and_(sort_column == value, id_column < last_id)))
+        else:
+            query = query.filter(or_(sort_column > value, and_(sort_column == value, id_column > last_id)))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    rows = query.add_columns(
+        sort_column.label("page_sort_key"),
+        id_column.label("page_row_id")
+    ).limit(page.limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor(sort_name, page.order, last["page_sort_key"], last["page_row_id"])
+
+    items: List[Dict[str, Any]] = [to_item(row) for row in rows]
+    return {"items": items, "next_cursor": next_cursor, "total": total}
@@ -3,14 +3,45 @@ Security utilities - password hashing and JWT tokens
 """
 from passlib.context import CryptContext
 from jose import JWTError, jwt
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from typing import Optional, Dict, List
+import asyncio
+import hashlib
+import os
+import threading
+import time
 
 from core.config import settings
+from utils.cache import LRUCache
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# sha256(token) -> verified payload, each entry expiring at the token's exp claim
+token_cache = LRUCache(maxsize=settings.TOKEN_CACHE_SIZE, name="tokens")
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing queue is full"""
+
+
+def _create_password_executor() -> Executor:
+    """Create the worker pool used for bcrypt (threads by default, bcrypt releases the GIL)"""
+    if settings.PASSWORD_HASH_EXECUTOR == "process":
+        return ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+    return ThreadPoolExecutor(
+        max_workers=settings.PASSWORD_HASH_WORKERS,
+        thread_name_prefix="password-hash"
+    )
+
+
+_password_executor = _create_password_executor()
+# Running + queued hash jobs; beyond this, callers are rejected instead of piling up
+_password_slots = threading.BoundedSemaphore(
+    settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
@@ -22,6 +53,49 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _submit_password_job(fn, *args) -> Future:
+    """Submit a hashing job to the bounded worker pool"""
+    if not _password_slots.acquire(blocking=False):
+        raise PasswordHasherBusy("Password hashing queue is full")
+    try:
+        future = _password_executor.submit(fn, *args)
+    except Exception:
+        _password_slots.release()
+        raise
+    future.add_done_callback(lambda _: _password_slots.release())
+    return future
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the worker pool without blocking the event loop"""
+    future = _submit_password_job(verify_password, plain_password, hashed_password)
+    return await asyncio.wrap_future(future)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the worker pool without blocking the event loop"""
+    future = _submit_password_job(get_password_hash, password)
+    return await asyncio.wrap_future(future)
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """
+    Hash many passwords in parallel (bcrypt releases the GIL, so threads use all cores)
+
+    Runs in a dedicated pool so bulk imports never starve interactive logins.
+    """
+    workers = min(len(passwords), os.cpu_count() or 1)
+    if workers <= 1:
+        return [get_password_hash(password) for password in passwords]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk-hash") as executor:
+        return list(executor.map(get_password_hash, passwords))
+
+
+def shutdown_password_executor() -> None:
+    """Stop the password hashing worker pool"""
+    _password_executor.shutdown(wait=True)
+
+
 def create_access_token(data: Dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create JWT access token
@@ -47,13 +121,26 @@ def create_access_token(data: Dict, expires_delta: Optional[timedelta] = None) -
 def decode_access_token(token: str) -> Optional[Dict]:
     """
     Decode JWT access token
+
+    Verified payloads are cached until their expiry, so a token reused across
+    requests is only signature-checked once. Invalid tokens are never cached.
     Args:
         token: JWT token string
     Returns:
         Decoded payload or None if invalid
     """
+    cache_key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(cache_key)
+    if payload is not None:
+        return dict(payload)
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return None
+
+    expires_at = payload.get("exp")
+    if isinstance(expires_at, (int, float)) and expires_at > time.time():
+        token_cache.set(cache_key, dict(payload), expires_at=float(expires_at))
+
+    return payload
@@ -0,0 +1,137 @@
+"""
+Single-flight request coalescing
+
+Concurrent calls with the same key share one in-flight execution and its
+result instead of each running the same database load. Results are handed
+to several requests, so the loaded function must return data that does not
+depend on the leader's session (pydantic models, tuples, serialized JSON),
+never ORM instances.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+# Named groups, exposed through the admin cache statistics endpoint
+_registry: Dict[str, "SingleFlight"] = {}
+
+
+class _Call:
+    """In-flight execution shared by threads"""
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical reads
+
+    `do` is for sync code running in worker threads, `do_async` for
+    coroutines on the event loop. The two keep separate in-flight tables.
+    """
+
+    def __init__(self, name: Optional[str] = None, enabled: bool = True):
+        self.name = name
+        self.enabled = enabled
+        self._calls: Dict[Hashable, _Call] = {}
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        if name:
+            _registry[name] = self
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn once for all threads concurrently asking for key"""
+        if not self.enabled:
+            return fn()
+
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn once for all coroutines concurrently asking for key"""
+        if not self.enabled:
+            return await fn()
+
+        with self._lock:
+            self.calls += 1
+
+        while True:
+            future = self._futures.get(key)
+            if future is None:
+                break
+            with self._lock:
+                self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leader was cancelled (e.g. client disconnected): retry the load
+                if future.cancelled():
+                    continue
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._futures[key] = future
+        with self._lock:
+            self.executions += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._futures.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call, execution and coalescing counters"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "in_flight": len(self._calls) + len(self._futures),
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "coalesced_rate": round(self.coalesced / self.calls, 4) if self.calls else 0.0
+            }
+
+
+def get_single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    """Return statistics of every named single-flight group"""
+    return {name: group.stats() for name, group in _registry.items()}
@@ -0,0 +1,29 @@
+"""
+Static file serving for uploads
+"""
+import re
+from pathlib import PurePosixPath
+
+from fastapi import HTTPException, status
+from fastapi.staticfiles import StaticFiles
+
+# For URLs whose content never changes: cache for a year, never revalidate
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# <sha256><ext>: the name changes whenever the content does
+CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+$")
+
+
+class UploadStaticFiles(StaticFiles):
+    """
+    StaticFiles that lets browsers cache content-addressed files forever
+    and hides dot-prefixed entries (partial uploads, upload sessions)
+    """
+
+    async def get_response(self, path: str, scope):
+        if any(part.startswith(".") for part in PurePosixPath(path).parts):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304) and CONTENT_ADDRESSED_NAME.match(PurePosixPath(path).name):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
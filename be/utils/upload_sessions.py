@@ -0,0 +1,244 @@
+"""
+Resumable chunked uploads
+
+A session lives in <directory>/.sessions/<id>/:
+- meta.json: owner, original filename and total size
+- data: the file, created sparse at its full size; each chunk is written
+  straight to its offset, so chunks can arrive in any order and in parallel
+- ranges/<start>-<end>: an empty marker per byte range stored
+- writers/<token>: an empty marker per chunk being written right now
+
+The markers make the received ranges visible to every worker process
+without locking. A chunk cut off by a dropped connection still records the
+bytes that reached the disk, so the client resumes from there instead of
+resending the chunk.
+
+Finalizing renames meta.json away before it hashes and stores the file. A
+chunk registers as a writer before it checks that meta.json is still there,
+and finalize waits for the writers to be gone after the rename, so no chunk
+can still be writing to the file once it is hashed.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import List, NamedTuple, Tuple
+
+import aiofiles
+from fastapi import HTTPException, Request, status
+from starlette.requests import ClientDisconnect
+
+SESSIONS_DIRNAME = ".sessions"
+SESSION_ID = re.compile(r"^[0-9a-f]{32}$")
+HASH_BLOCK_SIZE = 1024 * 1024
+WRITERS_POLL_SECONDS = 0.1
+
+Range = Tuple[int, int]  # [start, end)
+
+
+class UploadSession(NamedTuple):
+    """An unfinished resumable upload"""
+    id: str
+    directory: Path
+    user_id: int
+    filename: str  # Original name
+    size: int
+
+    @property
+    def data_path(self) -> Path:
+        return self.directory / "data"
+
+    @property
+    def ranges_dir(self) -> Path:
+        return self.directory / "ranges"
+
+    @property
+    def writers_dir(self) -> Path:
+        return self.directory / "writers"
+
+
+def _not_found() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+
+
+def sessions_root(directory: Path) -> Path:
+    return directory / SESSIONS_DIRNAME
+
+
+def create_session(directory: Path, user_id: int, filename: str, size: int) -> UploadSession:
+    """Create a session with an empty sparse file of the final size"""
+    upload_id = uuid.uuid4().hex
+    session = UploadSession(upload_id, sessions_root(directory) / upload_id, user_id, filename, size)
+    session.ranges_dir.mkdir(parents=True)
+    session.writers_dir.mkdir()
+    with open(session.data_path, "wb") as data:
+        data.truncate(size)
+    (session.directory / "meta.json").write_text(json.dumps(
+        {"user_id": user_id, "filename": filename, "size": size}
+    ))
+    return session
+
+
+def load_session(directory: Path, upload_id: str, user_id: int) -> UploadSession:
+    """
+    Get a session of the given user
+    Raises:
+        HTTPException: 404 if it does not exist, belongs to someone else or is being finalized
+    """
+    if not SESSION_ID.match(upload_id):
+        raise _not_found()
+    session_dir = sessions_root(directory) / upload_id
+    try:
+        meta = json.loads((session_dir / "meta.json").read_text())
+    except FileNotFoundError:
+        raise _not_found()
+    if meta["user_id"] != user_id:
+        raise _not_found()
+    return UploadSession(upload_id, session_dir, meta["user_id"], meta["filename"], meta["size"])
+
+
+def received_ranges(session: UploadSession) -> List[Range]:
+    """The byte ranges stored so far, merged and sorted"""
+    ranges = sorted(
+        tuple(int(bound) for bound in marker.name.split("-"))
+        for marker in session.ranges_dir.iterdir()
+    )
+    merged: List[List[int]] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def received_offset(ranges: List[Range]) -> int:
+    """Bytes received without a gap from the start of the file"""
+    return ranges[0][1] if ranges and ranges[0][0] == 0 else 0
+
+
+def format_ranges(ranges: List[Range]) -> str:
+    """Ranges as an Upload-Ranges header: start-end pairs with an inclusive end"""
+    return ",".join(f"{start}-{end - 1}" for start, end in ranges)
+
+
+async def write_chunk(session: UploadSession, request: Request, offset: int) -> int:
+    """
+    Stream a request body into the session file at offset
+    Returns:
+        The offset after the bytes written
+    Raises:
+        HTTPException: 400 if the chunk falls outside the file, 404 if the
+            session is being finalized
+    """
+    if not 0 <= offset < session.size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Upload-Offset must be between 0 and {session.size - 1}"
+        )
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and offset + int(declared) > session.size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Chunk runs past the end of the upload"
+        )
+
+    # Register first, then check: finalize renames meta.json first, then waits for writers
+    session.writers_dir.mkdir(exist_ok=True)
+    writer = session.writers_dir / uuid.uuid4().hex
+    writer.touch()
+    if not (session.directory / "meta.json").exists():
+        writer.unlink()
+        raise _not_found()
+
+    written = 0
+    try:
+        async with aiofiles.open(session.data_path, "r+b") as data:
+            await data.seek(offset)
+            async for chunk in request.stream():
+                if offset + written + len(chunk) > session.size:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Chunk runs past the end of the upload"
+                    )
+                await data.write(chunk)
+                written += len(chunk)
+    except ClientDisconnect:
+        pass  # Keep what arrived; nobody is left to answer
+    finally:
+        if written:
+            (session.ranges_dir / f"{offset}-{offset + written}").touch()
+        writer.unlink()
+    return offset + written
+
+
+def begin_finalize(session: UploadSession) -> None:
+    """
+    Take the session out of use so it is finalized only once
+    Raises:
+        HTTPException: 404 if another request is already finalizing it
+    """
+    try:
+        os.rename(session.directory / "meta.json", session.directory / "finalizing.json")
+    except FileNotFoundError:
+        raise _not_found()
+
+
+async def wait_for_writers(session: UploadSession, timeout: float) -> bool:
+    """
+    Wait for chunks still being written when finalize began
+    Returns:
+        False if some are still writing after timeout seconds
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while any(session.writers_dir.iterdir()):
+        if loop.time() >= deadline:
+            return False
+        await asyncio.sleep(WRITERS_POLL_SECONDS)
+    return True
+
+
+def abort_finalize(session: UploadSession) -> None:
+    """Put a session back in use after a failed finalize"""
+    os.rename(session.directory / "finalizing.json", session.directory / "meta.json")
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        while block := source.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def remove_session(session: UploadSession) -> None:
+    shutil.rmtree(session.directory, ignore_errors=True)
+
+
+def purge_expired_sessions(directory: Path, max_age_seconds: float) -> int:
+    """
+    Delete sessions untouched for max_age_seconds
+    Returns:
+        Number of sessions deleted
+    """
+    root = sessions_root(directory)
+    if not root.is_dir():
+        return 0
+    cutoff = time.time() - max_age_seconds
+    purged = 0
+    for session_dir in root.iterdir():
+        try:
+            # ranges/ changes with every chunk stored
+            if (session_dir / "ranges").stat().st_mtime < cutoff:
+                shutil.rmtree(session_dir, ignore_errors=True)
+                purged += 1
+        except FileNotFoundError:
+            continue
+    return purged
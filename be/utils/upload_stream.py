@@ -0,0 +1,187 @@
+"""
+Streaming multipart file uploads
+
+Starlette's UploadFile spools the whole request body before the handler
+runs, and writing it out with shutil blocks the event loop. Here the body
+is fed chunk by chunk through python-multipart's push parser, the file part
+is written with aiofiles as it arrives, and the upload is aborted with 413
+as soon as it crosses the size limit (or before reading anything, when the
+declared Content-Length is already too large). The SHA-256 of the file is
+computed on the way, so the caller can store it under its content address.
+"""
+import hashlib
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, List, NamedTuple, Optional
+
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException, Request, status
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import ClientDisconnect
+
+# Allowance for multipart boundaries and part headers on top of the file size
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class StreamedUpload(NamedTuple):
+    """A file received from a multipart request"""
+    path: Path  # Temporary file, removed when the receive_file block exits
+    original_filename: str
+    size: int
+    sha256: str  # Hex digest of the content
+
+
+class _FilePart:
+    """python-multipart callbacks collecting the data of one file field"""
+
+    def __init__(self, field_name: str):
+        self.field_name = field_name.encode()
+        self.filename: Optional[str] = None
+        self.pending: List[bytes] = []  # Data received but not yet written
+        self.size = 0
+        self.finished = False
+        self._active = False
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        }
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[bytes(self._header_field).lower()] = bytes(self._header_value)
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        filename = options.get(b"filename")
+        # Only the first file sent in the expected field is kept
+        if self.filename is None and options.get(b"name") == self.field_name and filename is not None:
+            self.filename = Path(filename.decode("utf-8", "replace")).name
+            self._active = True
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._active:
+            self.pending.append(data[start:end])
+            self.size += end - start
+
+    def _on_part_end(self) -> None:
+        if self._active:
+            self._active = False
+            self.finished = True
+
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail=f"File too large. Max size: {max_size / 1024 / 1024:g}MB",
+        # The rest of the body is never read, so the connection cannot be reused
+        headers={"Connection": "close"}
+    )
+
+
+@asynccontextmanager
+async def receive_file(
+    request: Request,
+    directory: Path,
+    allowed_extensions: Iterable[str],
+    max_size: int,
+    field_name: str = "file"
+) -> AsyncIterator[StreamedUpload]:
+    """
+    Stream the file field of a multipart/form-data request into a temporary
+    file in directory
+    Usage:
+        async with receive_file(request, directory, ...) as upload:
+            move upload.path to its final name
+    The temporary file is deleted on exit unless it was moved away.
+    Raises:
+        HTTPException: 400 for a malformed request, missing field or disallowed
+            extension; 413 as soon as the file exceeds max_size
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expected a multipart/form-data upload"
+        )
+
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > max_size + MULTIPART_OVERHEAD:
+        raise _too_large(max_size)
+
+    part = _FilePart(field_name)
+    parser = MultipartParser(boundary, part.callbacks())
+    temp_path = directory / f".{uuid.uuid4().hex}.part"
+    output = None
+    received = 0
+    digest = hashlib.sha256()
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            # Other fields are discarded, but still bound the body without a Content-Length
+            if received > max_size + MULTIPART_OVERHEAD:
+                raise _too_large(max_size)
+            parser.write(chunk)
+            if part.size > max_size:
+                raise _too_large(max_size)
+
+            if part.filename is not None and output is None:
+                if Path(part.filename).suffix.lower() not in allowed_extensions:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Invalid file type. Allowed: {', '.join(sorted(allowed_extensions))}"
+                    )
+                output = await aiofiles.open(temp_path, "wb")
+            if part.pending:
+                data = b"".join(part.pending)
+                part.pending.clear()
+                digest.update(data)
+                await output.write(data)
+        parser.finalize()
+
+        if not part.finished:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Missing '{field_name}' file field"
+            )
+        await output.close()
+        output = None
+    except MultipartParseError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed multipart body")
+    except ClientDisconnect:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Upload interrupted")
+    finally:
+        if output is not None:
+            await output.close()
+            await aiofiles.os.remove(temp_path)
+
+    try:
+        yield StreamedUpload(
+            path=temp_path, original_filename=part.filename, size=part.size, sha256=digest.hexdigest()
+        )
+    finally:
+        if await aiofiles.os.path.exists(temp_path):
+            await aiofiles.os.remove(temp_path)
@@ -8,20 +8,28 @@ const AcademicResults = () => {
   const [activeTab, setActiveTab] = useState('quiz'); // 'quiz' hoặc 'progress'
   const [quizAttempts, setQuizAttempts] = useState([]);
   const [lessonProgress, setLessonProgress] = useState([]);
+  // next_cursor of each list; null once the last page is loaded
+  const [quizCursor, setQuizCursor] = useState(null);
+  const [progressCursor, setProgressCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [exporting, setExporting] = useState(false);
 
 
   useEffect(() => {
     const fetchAllResults = async () => {
       try {
         setLoading(true);
-        const [quizData, progressData] = await Promise.all([
+        // Both lists come back newest first from the server
+        const [quizPage, progressPage] = await Promise.all([
           adminService.getQuizAttempts(),
           adminService.getLessonProgress(),
         ]);
 
-        setQuizAttempts(quizData.sort((a, b) => new Date(b.submitted_at) - new Date(a.submitted_at)));
-        setLessonProgress(progressData.sort((a, b) => new Date(b.last_updated) - new Date(a.last_updated)));
+        setQuizAttempts(quizPage.items);
+        setQuizCursor(quizPage.next_cursor);
+        setLessonProgress(progressPage.items);
+        setProgressCursor(progressPage.next_cursor);
       } catch (error) {
         console.error('Error fetching results:', error);
         toast.error('Không thể tải kết quả học tập');
@@ -32,6 +40,38 @@ const AcademicResults = () => {
     fetchAllResults();
   }, []);
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      if (activeTab === 'quiz') {
+        const page = await adminService.getQuizAttempts({ cursor: quizCursor });
+        setQuizAttempts((prev) => [...prev, ...page.items]);
+        setQuizCursor(page.next_cursor);
+      } else {
+        const page = await adminService.getLessonProgress({ cursor: progressCursor });
+        setLessonProgress((prev) => [...prev, ...page.items]);
+        setProgressCursor(page.next_cursor);
+      }
+    } catch (error) {
+      console.error('Error fetching results:', error);
+      toast.error('Không thể tải kết quả học tập');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+
+  const handleExport = async (format) => {
+    try {
+      setExporting(true);
+      await adminService.exportResults(activeTab === 'quiz' ? 'quiz-attempts' : 'lesson-progress', format);
+    } catch (error) {
+      console.error('Error exporting results:', error);
+      toast.error('Không thể xuất dữ liệu');
+    } finally {
+      setExporting(false);
+    }
+  };
 
   // ----- Helper Functions (tái sử dụng từ ResultsPage.jsx) -----
   const getScoreLabel = (score) => {
@@ -152,6 +192,14 @@ const AcademicResults = () => {
     <div className="lesson-management">
       <div className="management-header">
         <h2>📝 Kết quả học tập</h2>
+        <div className="header-actions">
+          <button className="btn-secondary" onClick={() => handleExport('csv')} disabled={exporting}>
+            ⬇️ Xuất CSV
+          </button>
+          <button className="btn-primary" onClick={() => handleExport('xlsx')} disabled={exporting}>
+            ⬇️ Xuất Excel
+          </button>
+        </div>
       </div>
 
       {/* Thanh Tabs */}
@@ -173,6 +221,13 @@ const AcademicResults = () => {
       {/* Nội dung Tab */}
       <div className="ar-tab-content">
         {activeTab === 'quiz' ? renderQuizTable() : renderProgressTable()}
+        {(activeTab === 'quiz' ? quizCursor : progressCursor) && (
+          <div className="load-more">
+            <button className="btn-secondary" onClick={loadMore} disabled={loadingMore}>
+              {loadingMore ? 'Đang tải...' : 'Xem thêm'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
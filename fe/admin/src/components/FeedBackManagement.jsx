@@ -4,7 +4,9 @@ import adminService from '../services/adminService';
 import { toast } from 'react-toastify';
 const FeedbackManagement = () => {
   const [feedbackList, setFeedbackList] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selectedFeedback, setSelectedFeedback] = useState(null);
   const [deleteId, setDeleteId] = useState(null);
   useEffect(() => {
@@ -14,10 +16,10 @@ const FeedbackManagement = () => {
   const fetchFeedback = async () => {
     try {
       setLoading(true);
-      // Gọi API lấy danh sách
-      const data = await adminService.getFeedback();
-      // Sắp xếp theo ngày mới nhất (created_at)
-      setFeedbackList(data.sort((a, b) => new Date(b.created_at) - new Date(a.created_at)));
+      // Gọi API lấy trang đầu (server trả về theo ngày mới nhất)
+      const page = await adminService.getFeedback();
+      setFeedbackList(page.items);
+      setNextCursor(page.next_cursor);
     } catch (error) {
       console.error('Error fetching feedback:', error);
       // Không alert lỗi để tránh spam nếu API đang lỗi nhẹ
@@ -26,6 +28,20 @@ const FeedbackManagement = () => {
     }
   };
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const page = await adminService.getFeedback({ cursor: nextCursor });
+      setFeedbackList((prev) => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error('Error fetching feedback:', error);
+      toast.error('Không thể tải thêm phản hồi');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
 
   const handleDeleteClick = (id) => {
     setDeleteId(id);
@@ -35,7 +51,8 @@ const FeedbackManagement = () => {
     try {
       await adminService.deleteFeedback(deleteId);
       toast.success('Xóa phản hồi thành công!');
-      fetchFeedback();
+      // Bỏ dòng đã xóa tại chỗ để giữ các trang đã tải
+      setFeedbackList((prev) => prev.filter((feedback) => feedback.id !== deleteId));
       if (selectedFeedback && selectedFeedback.id === deleteId) {
         setSelectedFeedback(null);
       }
@@ -206,6 +223,13 @@ const FeedbackManagement = () => {
             <p>Không có phản hồi nào.</p>
           </div>
         )}
+        {nextCursor && (
+          <div className="load-more">
+            <button className="btn-secondary" onClick={loadMore} disabled={loadingMore}>
+              {loadingMore ? 'Đang tải...' : 'Xem thêm'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
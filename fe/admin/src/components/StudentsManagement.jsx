@@ -5,7 +5,9 @@ import './StudentManagement.css';
 import { toast } from 'react-toastify';
 const StudentManagement = () => {
   const [students, setStudents] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [showForm, setShowForm] = useState(false);
   const [editingStudent, setEditingStudent] = useState(null);
   const [formData, setFormData] = useState({
@@ -19,12 +21,18 @@ const StudentManagement = () => {
   });
   const [deleteId, setDeleteId] = useState(null);
 
+  // Tải lại trang đầu (học sinh mới nhất trước)
+  const reloadStudents = async () => {
+    const page = await adminService.getStudents();
+    setStudents(page.items);
+    setNextCursor(page.next_cursor);
+  };
+
   useEffect(() => {
     const fetchStudents = async () => {
       try {
         setLoading(true);
-        const data = await adminService.getStudents();
-        setStudents(data);
+        await reloadStudents();
       } catch (error) {
         console.error('Error fetching students:', error);
         toast.error('Không thể tải danh sách học sinh');
@@ -35,6 +43,20 @@ const StudentManagement = () => {
     fetchStudents();
   }, []);
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const page = await adminService.getStudents({ cursor: nextCursor });
+      setStudents((prev) => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error('Error fetching students:', error);
+      toast.error('Không thể tải danh sách học sinh');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleInputChange = (e) => {
     const { name, value } = e.target;
     setFormData((prev) => ({
@@ -72,8 +94,7 @@ const StudentManagement = () => {
       setShowForm(false);
       setEditingStudent(null);
       resetForm();
-      const data = await adminService.getStudents();
-      setStudents(data);
+      await reloadStudents();
     } catch (error) {
       console.error('Error saving student:', error);
       toast.error(error.response?.data?.detail || 'Lỗi khi lưu thông tin học sinh');
@@ -102,8 +123,8 @@ const StudentManagement = () => {
     try {
       await adminService.deleteStudent(deleteId);
       toast.success('Xóa học sinh thành công!');
-      const data = await adminService.getStudents();
-      setStudents(data);
+      // Bỏ dòng đã xóa tại chỗ để giữ các trang đã tải
+      setStudents((prev) => prev.filter((student) => student.id !== deleteId));
     } catch (error) {
       console.error('Error deleting:', error);
       toast.error('Lỗi khi xóa học sinh');
@@ -335,6 +356,13 @@ const StudentManagement = () => {
             <p>Chưa có học sinh nào</p>
           </div>
         )}
+        {nextCursor && (
+          <div className="load-more">
+            <button className="btn-secondary" onClick={loadMore} disabled={loadingMore}>
+              {loadingMore ? 'Đang tải...' : 'Xem thêm'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -2,6 +2,7 @@ import { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
 import lessonService from '../services/lessonService';
+import adminService from '../services/adminService';
 import LessonManagement from '../components/LessonManagement';
 import StudentManagement from '../components/StudentsManagement';
 import AcademicResults from '../components/AcademicResults';
@@ -19,6 +20,7 @@ const AdminDashboard = () => {
     draftLessons: 0,
     totalStudents: 2, // Mock for now
   });
+  const [learning, setLearning] = useState(null); // overall figures of GET /admin/dashboard
 
   useEffect(() => {
     if (activeView === 'dashboard') {
@@ -38,6 +40,12 @@ const AdminDashboard = () => {
     } catch (error) {
       console.error('Error fetching stats:', error);
     }
+    try {
+      const dashboard = await adminService.getDashboard();
+      setLearning(dashboard.overall);
+    } catch (error) {
+      console.error('Error fetching dashboard:', error);
+    }
   };
 
   const handleLogout = async () => {
@@ -95,6 +103,31 @@ const AdminDashboard = () => {
               </div>
             </div>
 
+            {learning && (
+              <div className="stats-grid">
+                <div className="stat-card">
+                  <div className="stat-icon">🎯</div>
+                  <div className="stat-value">{learning.completion_rate}%</div>
+                  <div className="stat-label">Tỷ lệ hoàn thành</div>
+                </div>
+                <div className="stat-card">
+                  <div className="stat-icon">📊</div>
+                  <div className="stat-value">{learning.average_score ?? '—'}</div>
+                  <div className="stat-label">Điểm kiểm tra TB</div>
+                </div>
+                <div className="stat-card">
+                  <div className="stat-icon">⏱️</div>
+                  <div className="stat-value">{Math.round(learning.average_time_spent / 60)}p</div>
+                  <div className="stat-label">Thời gian học TB</div>
+                </div>
+                <div className="stat-card">
+                  <div className="stat-icon">⚠️</div>
+                  <div className="stat-value">{learning.at_risk}</div>
+                  <div className="stat-label">Cần hỗ trợ</div>
+                </div>
+              </div>
+            )}
+
             <div className="quick-actions">
               <h3>Thao tác nhanh</h3>
               <div className="action-buttons">
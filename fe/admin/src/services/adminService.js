@@ -4,9 +4,12 @@
 import api from './api';
 
 const adminService = {
+  // List endpoints are keyset-paginated: they return { items, next_cursor, total }.
+  // Pass the previous page's next_cursor as params.cursor to load the next one.
+
   // ----- STUDENT MANAGEMENT -----
-  async getStudents() {
-    const response = await api.get('/admin/students');
+  async getStudents(params = {}) {
+    const response = await api.get('/admin/students', { params });
     return response.data;
   },
   async createStudent(studentData) {
@@ -21,19 +24,41 @@ const adminService = {
     await api.delete(`/admin/students/${studentId}`);
   },
 
+  // ----- DASHBOARD -----
+  // Precomputed per-class / per-lesson figures; params: { class_name, lesson_id }
+  async getDashboard(params = {}) {
+    const response = await api.get('/admin/dashboard', { params });
+    return response.data;
+  },
+
   // ----- ACADEMIC RESULTS -----
-  async getLessonProgress() {
-    const response = await api.get('/admin/results/lesson-progress');
+  async getLessonProgress(params = {}) {
+    const response = await api.get('/admin/results/lesson-progress', { params });
     return response.data;
   },
-  async getQuizAttempts() {
-    const response = await api.get('/admin/results/quiz-attempts');
+  async getQuizAttempts(params = {}) {
+    const response = await api.get('/admin/results/quiz-attempts', { params });
     return response.data;
   },
+  // Download a result list as a spreadsheet; type: 'quiz-attempts' | 'lesson-progress', format: 'csv' | 'xlsx'
+  async exportResults(type, format = 'csv', filters = {}) {
+    const response = await api.get(`/admin/results/${type}/export`, {
+      params: { ...filters, format },
+      responseType: 'blob',
+    });
+    const disposition = response.headers['content-disposition'] || '';
+    const match = disposition.match(/filename="([^"]+)"/);
+    const url = URL.createObjectURL(response.data);
+    const link = document.createElement('a');
+    link.href = url;
+    link.download = match ? match[1] : `${type}.${format}`;
+    link.click();
+    URL.revokeObjectURL(url);
+  },
 
   // ----- FEEDBACK MANAGEMENT -----
-  async getFeedback() {
-    const response = await api.get('/admin/feedback');
+  async getFeedback(params = {}) {
+    const response = await api.get('/admin/feedback', { params });
     return response.data;
   },
   async markFeedbackRead(feedbackId) {
@@ -12,6 +12,10 @@ const getBaseURL = () => {
 
 const BASE_URL = getBaseURL();
 
+// Resumable video uploads: chunks sent at once, and retries per chunk
+const VIDEO_PARALLEL_CHUNKS = 3;
+const VIDEO_CHUNK_RETRIES = 5;
+
 const uploadService = {
   /**
    * Upload an image file
@@ -45,28 +49,85 @@ const uploadService = {
   },
 
   /**
-   * Upload a video file
+   * Upload a video file in resumable chunks
+   * Chunks are sent in parallel; a chunk cut off by a network error is
+   * resumed from the bytes the server already has instead of restarting
    * @param {File} file - Video file to upload
    * @param {Function} onProgress - Progress callback
    * @returns {Promise<Object>} Upload result with URL
    */
   async uploadVideo(file, onProgress) {
-    const formData = new FormData();
-    formData.append('file', file);
+    const { data: session } = await api.post('/upload/video/sessions', {
+      filename: file.name,
+      size: file.size,
+    });
+    const sessionPath = `/upload/video/sessions/${session.upload_id}`;
 
-    const response = await api.post('/upload/video', formData, {
-      headers: {
-        'Content-Type': 'multipart/form-data',
-      },
-      onUploadProgress: (progressEvent) => {
-        const percentCompleted = Math.round(
-          (progressEvent.loaded * 100) / progressEvent.total
-        );
-        if (onProgress) {
-          onProgress(percentCompleted);
+    // Bytes confirmed or in flight per chunk start
+    const loaded = new Map();
+    const reportProgress = () => {
+      if (!onProgress) return;
+      const total = [...loaded.values()].reduce((sum, bytes) => sum + bytes, 0);
+      onProgress(Math.round((total * 100) / file.size));
+    };
+
+    // End of the received range containing start, or start if none does
+    const receivedUpTo = async (start) => {
+      const response = await api.head(sessionPath);
+      const ranges = (response.headers['upload-ranges'] || '').split(',').filter(Boolean);
+      for (const range of ranges) {
+        const [first, last] = range.split('-').map(Number);
+        if (first <= start && start <= last + 1) return last + 1;
+      }
+      return start;
+    };
+
+    const sendChunk = async (start) => {
+      const end = Math.min(start + session.chunk_size, file.size);
+      let offset = start;
+      for (let attempt = 0; offset < end; attempt++) {
+        try {
+          await api.patch(sessionPath, file.slice(offset, end), {
+            headers: {
+              'Content-Type': 'application/offset+octet-stream',
+              'Upload-Offset': offset,
+            },
+            onUploadProgress: (progressEvent) => {
+              loaded.set(start, offset - start + progressEvent.loaded);
+              reportProgress();
+            },
+          });
+          offset = end;
+        } catch (error) {
+          // Only network errors and server errors are worth retrying
+          if (attempt >= VIDEO_CHUNK_RETRIES || (error.response && error.response.status < 500)) {
+            throw error;
+          }
+          await new Promise((resolve) => setTimeout(resolve, 1000 * 2 ** attempt));
+          offset = Math.min(await receivedUpTo(offset), end);
         }
-      },
-    });
+      }
+      loaded.set(start, end - start);
+      reportProgress();
+    };
+
+    const starts = [];
+    for (let start = 0; start < file.size; start += session.chunk_size) {
+      starts.push(start);
+    }
+    const worker = async () => {
+      while (starts.length > 0) {
+        await sendChunk(starts.shift());
+      }
+    };
+
+    try {
+      await Promise.all(Array.from({ length: VIDEO_PARALLEL_CHUNKS }, worker));
+    } catch (error) {
+      await api.delete(sessionPath).catch(() => {});
+      throw error;
+    }
+    const response = await api.post(`${sessionPath}/finalize`);
 
     // Return full URL (BASE_URL already excludes /api)
     return {
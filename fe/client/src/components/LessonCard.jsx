@@ -1,5 +1,5 @@
 import './LessonCard.css';
-import { getThumbnailURL } from '../utils/urlHelper';
+import { getThumbnailURL, getImageSrcSet } from '../utils/urlHelper';
 
 const LessonCard = ({ lesson }) => {
   const {
@@ -100,7 +100,13 @@ const LessonCard = ({ lesson }) => {
   return (
     <div className="lesson-card" onClick={handleCardClick}>
       <div className="card-thumbnail">
-        <img src={thumbnailURL} alt={title} />
+        <img
+          src={thumbnailURL}
+          srcSet={getImageSrcSet(thumbnailURL)}
+          sizes="(max-width: 768px) 100vw, 400px"
+          loading="lazy"
+          alt={title}
+        />
         <div className="thumbnail-overlay">
           <span>Xem chi tiết</span>
         </div>
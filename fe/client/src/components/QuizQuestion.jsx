@@ -1,4 +1,5 @@
 import React, { useState } from 'react';
+import { getImageSrcSet } from '../utils/urlHelper';
 import './QuizQuestion.css';
 
 const QuizQuestion = ({ question, questionNumber, selectedAnswer, onAnswerChange, showResult, correctAnswer }) => {
@@ -50,7 +51,13 @@ const QuizQuestion = ({ question, questionNumber, selectedAnswer, onAnswerChange
         <p className="question-text">{question_text}</p>
         {image_url && (
           <div className="question-image">
-            <img src={image_url} alt="Question illustration" />
+            <img
+              src={image_url}
+              srcSet={getImageSrcSet(image_url)}
+              sizes="(max-width: 640px) 100vw, 640px"
+              loading="lazy"
+              alt="Question illustration"
+            />
           </div>
         )}
       </div>
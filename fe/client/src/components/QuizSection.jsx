@@ -125,7 +125,14 @@ const QuizSection = ({ lessonId, onQuizComplete }) => {
       }
     } catch (err) {
       console.error('Error submitting quiz:', err);
-      toast.error('Không nộp được bài kiểm tra. Vui lòng thử lại');
+      if (err.code === 'GRADING_TIMEOUT') {
+        // The answers are saved; submitting again would create a second attempt
+        toast.info('Bài làm đã được nộp và đang được chấm. Xem kết quả trong lịch sử làm bài sau ít phút');
+      } else if (err.code === 'GRADING_FAILED') {
+        toast.error('Không chấm được bài kiểm tra. Vui lòng liên hệ giáo viên');
+      } else {
+        toast.error('Không nộp được bài kiểm tra. Vui lòng thử lại');
+      }
     } finally {
       setIsSubmitting(false);
     }
@@ -5,6 +5,7 @@ import lessonService from '../services/lessonService';
 import QuizSection from '../components/QuizSection';
 import GeoGebraInteractive from '../components/GeoGebraInteractive';
 import geogebraService from '../services/geogebraService';
+import { withResponsiveImages } from '../utils/urlHelper';
 import './LessonDetail.css';
 
 const LessonDetail = () => {
@@ -530,7 +531,7 @@ const LessonDetail = () => {
             <div className="block-divider"></div>
             <div
               className="block-content rich-content"
-              dangerouslySetInnerHTML={{ __html: section.content || '<p>Nội dung đang được cập nhật...</p>' }}
+              dangerouslySetInnerHTML={{ __html: withResponsiveImages(section.content, '(max-width: 900px) 100vw, 900px') || '<p>Nội dung đang được cập nhật...</p>' }}
             />
           </div>
         );
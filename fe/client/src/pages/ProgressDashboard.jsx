@@ -5,7 +5,7 @@ import { useAuth } from '../context/AuthContext';
 import lessonService from '../services/lessonService';
 import Header from '../components/Header';
 import Footer from '../components/Footer';
-import { getThumbnailURL } from '../utils/urlHelper';
+import { getThumbnailURL, getImageSrcSet } from '../utils/urlHelper';
 import { motion } from 'framer-motion'; // Import Animation
 import './ProgressDashboard.css';
 
@@ -172,7 +172,13 @@ const ProgressDashboard = () => {
                       onClick={() => navigate(`/lessons/${lesson.slug}`)}
                     >
                       <div className="lesson-thumb-wrapper">
-                        <img src={getThumbnailURL(lesson.thumbnail)} alt={lesson.title} />
+                        <img
+                          src={getThumbnailURL(lesson.thumbnail)}
+                          srcSet={getImageSrcSet(getThumbnailURL(lesson.thumbnail))}
+                          sizes="(max-width: 768px) 100vw, 400px"
+                          loading="lazy"
+                          alt={lesson.title}
+                        />
                         <span className={`difficulty-tag ${lesson.difficulty}`}>
                           {lesson.difficulty === 'easy' ? 'Dễ' : lesson.difficulty === 'medium' ? 'Vừa' : 'Khó'}
                         </span>
@@ -22,9 +22,41 @@ const quizService = {
    */
   async submitQuiz(quizId, submitData) {
     const response = await api.post(`/quizzes/${quizId}/submit`, submitData);
+    if (response.status === 202) {
+      // Queued grading: poll until the attempt has been graded
+      return this.waitForResult(response.data.attempt_id);
+    }
     return response.data;
   },
 
+  /**
+   * Poll the result of a queued submission, backing off between polls
+   * @param {number} attemptId
+   * @param {Object} options - { intervalMs, maxIntervalMs, maxWaitMs }
+   * @returns {Promise<QuizSubmitResponse>}
+   * @throws {Error} code GRADING_FAILED if grading gave up on the attempt,
+   *   GRADING_TIMEOUT if it is still pending after maxWaitMs
+   */
+  async waitForResult(attemptId, { intervalMs = 1000, maxIntervalMs = 8000, maxWaitMs = 120000 } = {}) {
+    const deadline = Date.now() + maxWaitMs;
+    let delay = intervalMs;
+    for (;;) {
+      const response = await api.get(`/quizzes/attempts/${attemptId}/result`);
+      if (response.data.status === 'graded') {
+        return response.data.result;
+      }
+      if (response.data.status === 'failed') {
+        throw Object.assign(new Error('Grading failed'), { code: 'GRADING_FAILED', attemptId });
+      }
+      if (Date.now() + delay > deadline) {
+        throw Object.assign(new Error('Grading is taking too long'), { code: 'GRADING_TIMEOUT', attemptId });
+      }
+      // Jitter keeps a class that submitted together from polling in lockstep
+      await new Promise((resolve) => setTimeout(resolve, delay * (0.75 + Math.random() * 0.5)));
+      delay = Math.min(delay * 2, maxIntervalMs);
+    }
+  },
+
   /**
    * Get all quiz attempts for current user
    * @param {number} quizId - Optional: filter by quiz
@@ -84,3 +84,39 @@ export const getThumbnailURL = (thumbnail) => {
   }
   return normalizeMediaURL(thumbnail);
 };
+
+// Widths of the resized copies the server makes of uploaded images
+// (keep in sync with IMAGE_VARIANT_WIDTHS in the backend settings)
+export const IMAGE_VARIANT_WIDTHS = [320, 640, 1280];
+
+/**
+ * Build a srcset of the resized WebP copies of an uploaded image
+ * @param {string} url - The image URL (relative or absolute)
+ * @returns {string|undefined} - The srcset, or undefined when the image has no variants
+ */
+export const getImageSrcSet = (url) => {
+  const baseURL = getBaseURL();
+  const match = url && url.match(/^(.*)\/uploads\/images\/([^/?#]+\.(?:jpe?g|png|webp))$/i);
+  // Only images uploaded to this server have variants
+  if (!match || (match[1] && match[1] !== baseURL)) return undefined;
+
+  return IMAGE_VARIANT_WIDTHS
+    .map((width) => `${baseURL}/api/upload/images/${match[2]}/w/${width}.webp ${width}w`)
+    .join(', ');
+};
+
+/**
+ * Add srcset and lazy loading to the uploaded images of lesson HTML content
+ * @param {string} html - The lesson content
+ * @param {string} sizes - The sizes attribute for the images
+ * @returns {string} - The content with responsive images
+ */
+export const withResponsiveImages = (html, sizes) => {
+  if (!html) return html;
+
+  return html.replace(/<img\b([^>]*?)\ssrc="([^"]+)"([^>]*)>/gi, (tag, before, src, after) => {
+    const srcSet = getImageSrcSet(src);
+    if (!srcSet || /\ssrcset=/i.test(tag)) return tag;
+    return `<img${before} src="${src}" srcset="${srcSet}" sizes="${sizes}" loading="lazy"${after}>`;
+  });
+};